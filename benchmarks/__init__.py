@@ -0,0 +1,12 @@
+"""
+Benchmark suite initialization.
+
+This package measures the throughput and peak memory of the scrape, load
+and export stages on synthetic pages of any size, replayed through the
+snapshot store so that no run touches the network. Run it with
+`python -m benchmarks.run`.
+"""
+
+from .generate import SIZES, generate_wikitable, parse_size
+
+__all__ = ["SIZES", "generate_wikitable", "parse_size"]
@@ -0,0 +1,85 @@
+"""
+Synthetic wikitable pages for the benchmarks.
+
+The generated pages mirror the layout of the Academy Award-winning films
+list: a sortable wikitable with a header row, italic linked titles, and
+the cell quirks the cleaners have to handle (footnote markers, ties such
+as "11 (1)" and split years such as "1927/28"). The same seed always
+produces the same bytes, so results are comparable across commits.
+"""
+
+import random
+
+# Row counts keyed by the names accepted on the command line
+SIZES = {"1k": 1_000, "100k": 100_000, "1m": 1_000_000}
+
+_HEADER = (
+    b"<html><head><title>List of Academy Award-winning films</title></head><body>\n"
+    b'<table class="wikitable sortable"><tbody>\n'
+    b"<tr><th>Film</th><th>Year</th><th>Awards</th><th>Nominations</th></tr>\n"
+)
+_FOOTER = b"</tbody></table></body></html>\n"
+
+
+def parse_size(value):
+    """
+    Convert a size name or a plain number into a row count.
+
+    Args:
+        value (str): One of the SIZES names, or a number of rows.
+
+    Returns:
+        int: The number of rows.
+
+    Raises:
+        ValueError: If the value is neither a known name nor a positive integer.
+    """
+    rows = SIZES[value.lower()] if value.lower() in SIZES else int(value)
+    if rows <= 0:
+        raise ValueError(f"The number of rows must be positive, got {value!r}.")
+    return rows
+
+
+def generate_row(index, rng):
+    """
+    Build the HTML of one film row.
+
+    Args:
+        index (int): Position of the row, used in the title and link.
+        rng (random.Random): Source of the cell values.
+
+    Returns:
+        str: The <tr> element.
+    """
+    year = rng.randint(1927, 2024)
+    nominations = rng.randint(1, 14)
+    awards = rng.randint(1, nominations)
+    year_cell = f"{year}/{(year + 1) % 100:02d}" if year < 1934 else str(year)
+    awards_cell = f"{awards} (1)" if rng.random() < 0.02 else str(awards)
+    nominations_cell = (
+        f'{nominations}<sup class="reference">[a]</sup>'
+        if rng.random() < 0.05
+        else str(nominations)
+    )
+    return (
+        f'<tr><td><i><a href="/wiki/Synthetic_Film_{index}" '
+        f'title="Synthetic Film {index}">Synthetic Film {index}</a></i></td>'
+        f'<td><a href="/wiki/{year}_in_film">{year_cell}</a></td>'
+        f"<td>{awards_cell}</td><td>{nominations_cell}</td></tr>\n"
+    )
+
+
+def generate_wikitable(rows, seed=0):
+    """
+    Build a synthetic Academy Award-winning films page.
+
+    Args:
+        rows (int): Number of film rows in the table.
+        seed (int): Seed of the random cell values.
+
+    Returns:
+        bytes: The page HTML, UTF-8 encoded.
+    """
+    rng = random.Random(seed)
+    body = "".join(generate_row(index, rng) for index in range(1, rows + 1))
+    return _HEADER + body.encode("utf-8") + _FOOTER
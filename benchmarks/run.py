@@ -0,0 +1,393 @@
+"""
+Benchmark runner for the scrape, load and export stages.
+
+Each size gets a synthetic page from benchmarks.generate, which is saved
+to a snapshot store and replayed through fetchPage, so the scrape stage
+runs the real code path without the network. Every stage is timed (best
+of --repeat runs) and then run once more under tracemalloc for its peak
+Python memory. Results are written as JSON and can be compared with a
+previous results file; metrics that grew by more than the threshold are
+reported as regressions and make the command exit with status 1.
+
+Usage:
+    python -m benchmarks.run --sizes 1k 100k --output data/benchmarks/results.json
+    python -m benchmarks.run --sizes 1k 100k --compare data/benchmarks/results.json
+"""
+
+import argparse
+import json
+import logging
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+from database import DATABASE_URL_ENV_VAR
+from database.operations import initDB
+from scripts.wikipedia_uuid import scrape_oscar_winning_films
+from wiki.export_functions import exportToCsv, exportToJson
+from wiki.parsing import DEFAULT_PARSER, PARSER_BACKENDS
+from wiki.records import FilmBatch
+from wiki.snapshots import SnapshotStore, configure_snapshots, get_snapshots
+from wiki.sources import OSCAR_FILMS_URL
+from wiki.utils import atomic_output
+
+from .generate import generate_wikitable, parse_size
+
+# Stages in the order they run
+STAGES = ("scrape", "load", "export_csv", "export_json")
+
+# Metrics compared against a baseline, all of which are better when lower
+COMPARED_METRICS = ("seconds", "peak_bytes")
+
+DEFAULT_OUTPUT = "./data/benchmarks/results.json"
+DEFAULT_THRESHOLD = 0.10
+
+
+def measure(function, *args, repeat=1, trace_memory=True, **kwargs):
+    """
+    Time a function and measure its peak memory.
+
+    The timed runs are made without tracemalloc, whose overhead would skew
+    the timings; the peak comes from one extra traced run.
+
+    Args:
+        function (callable): The stage to measure.
+        *args: Positional arguments of the function.
+        repeat (int): Number of timed runs, the fastest one being kept.
+        trace_memory (bool): Whether to make the traced run.
+        **kwargs: Keyword arguments of the function.
+
+    Returns:
+        tuple: The result of the last run, the best time in seconds and the
+               peak traced memory in bytes (None without trace_memory).
+    """
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function(*args, **kwargs)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+
+    peak = None
+    if trace_memory:
+        tracemalloc.start()
+        try:
+            result = function(*args, **kwargs)
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+    return result, best, peak
+
+
+def _stage_result(rows, seconds, peak):
+    """
+    Build the JSON entry of a measured stage.
+
+    Args:
+        rows (int): Number of rows the stage processed.
+        seconds (float): Best time of the stage.
+        peak (int or None): Peak traced memory in bytes.
+
+    Returns:
+        dict: The stage metrics.
+    """
+    return {
+        "rows": rows,
+        "seconds": round(seconds, 6),
+        "rows_per_second": round(rows / seconds, 1) if seconds else None,
+        "peak_bytes": peak,
+    }
+
+
+def run_size(
+    rows, work_dir, parser=DEFAULT_PARSER, repeat=1, trace_memory=True, seed=0
+):
+    """
+    Benchmark every stage on one synthetic page.
+
+    The load stage writes to the configured database with initDB(bulk=True),
+    which truncates the films table before every run.
+
+    Args:
+        rows (int): Number of rows in the synthetic page.
+        work_dir (str): Directory for the snapshot store and the exports.
+        parser (str): HTML parser backend, one of wiki.parsing.PARSER_BACKENDS.
+        repeat (int): Number of timed runs per stage.
+        trace_memory (bool): Whether to measure the peak memory of each stage.
+        seed (int): Seed of the synthetic page.
+
+    Returns:
+        dict: The page size in bytes and the metrics of each stage.
+    """
+    page = generate_wikitable(rows, seed)
+    store = SnapshotStore(os.path.join(work_dir, "snapshots"))
+    store.save(OSCAR_FILMS_URL, page)
+    logging.info(f"Generated a {len(page)} byte page with {rows} rows.")
+
+    stages = {}
+    previous = get_snapshots()
+    configure_snapshots(store, "replay")
+    try:
+        movies, seconds, peak = measure(
+            scrape_oscar_winning_films,
+            id_strategy="uuid5",
+            parser=parser,
+            repeat=repeat,
+            trace_memory=trace_memory,
+        )
+    finally:
+        configure_snapshots(*previous)
+    stages["scrape"] = _stage_result(len(movies), seconds, peak)
+
+    _, seconds, peak = measure(
+        initDB, movies, bulk=True, repeat=repeat, trace_memory=trace_memory
+    )
+    stages["load"] = _stage_result(len(movies), seconds, peak)
+
+    df = FilmBatch.from_records(movies).to_dataframe()
+    for stage, export, extension in (
+        ("export_csv", exportToCsv, "csv"),
+        ("export_json", exportToJson, "json"),
+    ):
+        _, seconds, peak = measure(
+            export,
+            df,
+            os.path.join(work_dir, f"output.{extension}"),
+            skip_unchanged=False,
+            repeat=repeat,
+            trace_memory=trace_memory,
+        )
+        stages[stage] = _stage_result(len(df), seconds, peak)
+    return {"page_bytes": len(page), "stages": stages}
+
+
+def _git_commit():
+    """
+    Return the commit the benchmarks run on.
+
+    Returns:
+        str or None: The hash of HEAD, or None outside a git checkout.
+    """
+    try:
+        completed = subprocess.run(
+            ["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return completed.stdout.strip()
+
+
+def run_benchmarks(
+    sizes, work_dir, parser=DEFAULT_PARSER, repeat=1, trace_memory=True, seed=0
+):
+    """
+    Benchmark every stage for each page size.
+
+    Args:
+        sizes (iterable): Numbers of rows of the synthetic pages.
+        work_dir (str): Directory for the snapshot store and the exports.
+        parser (str): HTML parser backend, one of wiki.parsing.PARSER_BACKENDS.
+        repeat (int): Number of timed runs per stage.
+        trace_memory (bool): Whether to measure the peak memory of each stage.
+        seed (int): Seed of the synthetic pages.
+
+    Returns:
+        dict: The run metadata and the results keyed by number of rows.
+    """
+    results = {
+        "commit": _git_commit(),
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "parser": parser,
+        "repeat": repeat,
+        "sizes": {},
+    }
+    for rows in sizes:
+        results["sizes"][str(rows)] = run_size(
+            rows, work_dir, parser, repeat, trace_memory, seed
+        )
+    return results
+
+
+def compare_results(baseline, current, threshold=DEFAULT_THRESHOLD):
+    """
+    Find the metrics that got worse than a baseline by more than a threshold.
+
+    Only the sizes and stages present in both results are compared.
+
+    Args:
+        baseline (dict): Results of an earlier run_benchmarks call.
+        current (dict): Results of the run being checked.
+        threshold (float): Allowed relative increase, e.g. 0.1 for 10%.
+
+    Returns:
+        list: One dict per regression, with the rows, stage, metric, baseline
+              and current values and the relative change.
+    """
+    regressions = []
+    for rows, size in current["sizes"].items():
+        baseline_stages = baseline.get("sizes", {}).get(rows, {}).get("stages", {})
+        for stage, metrics in size["stages"].items():
+            for metric in COMPARED_METRICS:
+                old = baseline_stages.get(stage, {}).get(metric)
+                new = metrics.get(metric)
+                if not old or new is None:
+                    continue
+                change = (new - old) / old
+                if change > threshold:
+                    regressions.append(
+                        {
+                            "rows": int(rows),
+                            "stage": stage,
+                            "metric": metric,
+                            "baseline": old,
+                            "current": new,
+                            "change": round(change, 4),
+                        }
+                    )
+    return regressions
+
+
+def format_results(results):
+    """
+    Render results as a plain text table.
+
+    Args:
+        results (dict): Results of run_benchmarks.
+
+    Returns:
+        str: One line per size and stage.
+    """
+    lines = [
+        f"{'rows':>9} {'stage':<12} {'seconds':>10} {'rows/s':>12} {'peak MiB':>9}"
+    ]
+    for rows, size in results["sizes"].items():
+        for stage, metrics in size["stages"].items():
+            peak = metrics["peak_bytes"]
+            peak = f"{peak / 2**20:9.1f}" if peak is not None else f"{'-':>9}"
+            lines.append(
+                f"{rows:>9} {stage:<12} {metrics['seconds']:>10.4f} "
+                f"{metrics['rows_per_second'] or 0:>12.0f} {peak}"
+            )
+    return "\n".join(lines)
+
+
+def parse_args(argv=None):
+    """
+    Parse the command line arguments of the benchmark runner.
+
+    Args:
+        argv (list, optional): Arguments to parse, defaults to sys.argv[1:].
+
+    Returns:
+        argparse.Namespace: The parsed arguments.
+    """
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument(
+        "--sizes",
+        nargs="+",
+        type=parse_size,
+        default=[parse_size("1k")],
+        help="page sizes to benchmark: 1k, 100k, 1m or a number of rows (default: 1k)",
+    )
+    parser.add_argument(
+        "--parser",
+        choices=PARSER_BACKENDS,
+        default=DEFAULT_PARSER,
+        help="HTML parser backend used for the wikitable",
+    )
+    parser.add_argument(
+        "--repeat", type=int, default=1, help="timed runs per stage, the best is kept"
+    )
+    parser.add_argument(
+        "--no-memory",
+        action="store_true",
+        help="skip the tracemalloc run measuring the peak memory of each stage",
+    )
+    parser.add_argument(
+        "--seed", type=int, default=0, help="seed of the synthetic pages"
+    )
+    parser.add_argument(
+        "--output",
+        default=DEFAULT_OUTPUT,
+        help="JSON file the results are written to (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--compare",
+        metavar="BASELINE",
+        help="results file of an earlier run to check for regressions",
+    )
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=DEFAULT_THRESHOLD,
+        help="allowed relative increase of a metric over the baseline (default: %(default)s)",
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    """
+    Run the benchmarks, write the results and compare them with a baseline.
+
+    Unless WIKI_DATABASE_URL is set, the load stage uses a temporary SQLite
+    database so the project database is never touched.
+
+    Args:
+        argv (list, optional): Arguments to parse, defaults to sys.argv[1:].
+
+    Returns:
+        int: 1 if a regression was found, otherwise 0.
+    """
+    args = parse_args(argv)
+    baseline = None
+    if args.compare:
+        # Read before running, since the output may overwrite the baseline
+        with open(args.compare) as f:
+            baseline = json.load(f)
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        if not os.environ.get(DATABASE_URL_ENV_VAR):
+            db_path = os.path.join(work_dir, "benchmark.db")
+            os.environ[DATABASE_URL_ENV_VAR] = f"sqlite:///{db_path}"
+        results = run_benchmarks(
+            args.sizes,
+            work_dir,
+            parser=args.parser,
+            repeat=args.repeat,
+            trace_memory=not args.no_memory,
+            seed=args.seed,
+        )
+
+    with atomic_output(args.output) as tmp_path:
+        with open(tmp_path, "w") as f:
+            json.dump(results, f, indent=2)
+    print(format_results(results))
+    print(f"Results written to {args.output}")
+
+    if baseline is None:
+        return 0
+    regressions = compare_results(baseline, results, args.threshold)
+    for regression in regressions:
+        print(
+            f"REGRESSION {regression['rows']} rows {regression['stage']} "
+            f"{regression['metric']}: {regression['baseline']} -> "
+            f"{regression['current']} (+{regression['change']:.1%})"
+        )
+    if not regressions:
+        print(f"No regression over {args.threshold:.0%} against {args.compare}.")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    logging.basicConfig(
+        level=logging.WARNING, format="%(asctime)s - %(levelname)s - %(message)s"
+    )
+    sys.exit(main())
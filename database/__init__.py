@@ -2,43 +2,129 @@ import logging
 import os
 
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 
-# Setup logging
-logging.basicConfig(
-    level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
-)
+from .pragmas import DEFAULT_PROFILE, PROFILE_ENV_VAR, apply_sqlite_profile
 
 # Define the path to the database file
 DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data")
 DB_PATH = os.path.join(DATA_DIR, "wiki_films.db")
 
-# Ensure data directory exists
-os.makedirs(DATA_DIR, exist_ok=True)
-logging.info(f"Ensured data directory exists at {DATA_DIR}")
+# Environment variable holding the engine URL, e.g. postgresql+psycopg://user@host/db
+DATABASE_URL_ENV_VAR = "WIKI_DATABASE_URL"
+DEFAULT_DATABASE_URL = f"sqlite:///{DB_PATH}"
+
+# Connection pool settings used for server databases
+POOL_SIZE = 5
+MAX_OVERFLOW = 10
+POOL_RECYCLE = 1800  # seconds
+
+# Created on first use by get_engine(), so importing the package has no side effects
+_engine = None
+
+
+def get_database_url():
+    """
+    Return the URL of the database, from WIKI_DATABASE_URL or the SQLite default.
+
+    Returns:
+        str: The SQLAlchemy engine URL.
+    """
+    return os.environ.get(DATABASE_URL_ENV_VAR) or DEFAULT_DATABASE_URL
+
+
+def engine_options(url):
+    """
+    Build the create_engine() keyword arguments suited to a database URL.
+
+    Server databases get a bounded connection pool whose connections are
+    checked before use and recycled before servers or proxies drop them.
+    SQLite keeps SQLAlchemy's defaults.
+
+    Args:
+        url (str): The SQLAlchemy engine URL.
+
+    Returns:
+        dict: The keyword arguments.
+    """
+    if make_url(url).get_backend_name() == "sqlite":
+        return {}
+    return {
+        "pool_size": POOL_SIZE,
+        "max_overflow": MAX_OVERFLOW,
+        "pool_pre_ping": True,
+        "pool_recycle": POOL_RECYCLE,
+    }
+
+
+def get_engine():
+    """
+    Return the database engine, creating it on first use.
+
+    The SQLite default also gets its data directory created and the PRAGMA
+    profile selected with WIKI_DB_PROFILE.
+
+    Returns:
+        sqlalchemy.engine.Engine: The shared engine.
+    """
+    global _engine
+    if _engine is None:
+        url = get_database_url()
+        if url == DEFAULT_DATABASE_URL:
+            # Ensure data directory exists
+            os.makedirs(DATA_DIR, exist_ok=True)
+            logging.info(f"Ensured data directory exists at {DATA_DIR}")
+
+        _engine = create_engine(url, **engine_options(url))
+        logging.info(f"Created database engine for {_engine.url!r}")
+
+        # Apply the connection settings selected with WIKI_DB_PROFILE ("safe" or "fast")
+        apply_sqlite_profile(_engine, os.environ.get(PROFILE_ENV_VAR, DEFAULT_PROFILE))
+    return _engine
+
+
+class _LazySessionmaker(sessionmaker):
+    """
+    sessionmaker that binds itself to get_engine() when the first session is made.
+    """
+
+    def __call__(self, **local_kw):
+        if self.kw.get("bind") is None:
+            self.configure(bind=get_engine())
+        return super().__call__(**local_kw)
+
+
+def __getattr__(name):
+    # Keep `database.engine` working without creating the engine at import time
+    if name == "engine":
+        return get_engine()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
-# Create engine with the updated path
-engine = create_engine(f"sqlite:///{DB_PATH}")
-logging.info(f"Created database engine for {DB_PATH}")
 
 # Create a configured "Session" class
-Session = sessionmaker(bind=engine)
+Session = _LazySessionmaker()
 
 # Create a base class for declarative class definitions
 Base = declarative_base()
 
 # Import operations and schema after engine and Base are defined
-from .operations import initDB, insertRow
-from .schema import AcademyAwardWinningFilms, TestTable
+from .operations import BatchedRowWriter, initDB, insertRow, save_film_articles
+from .schema import AcademyAwardWinningFilms, FilmArticle, TestTable
 
 # Expose commonly used functions and classes
 __all__ = [
     "engine",
+    "get_engine",
+    "get_database_url",
     "Session",
     "Base",
     "initDB",
     "insertRow",
+    "BatchedRowWriter",
+    "save_film_articles",
     "AcademyAwardWinningFilms",
+    "FilmArticle",
     "TestTable",
 ]
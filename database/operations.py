@@ -5,29 +5,116 @@ This module provides functions for initializing the database schema,
 checking table existence, inserting records into the database, and truncating tables.
 """
 
+import csv
+import io
 import logging
 
-from sqlalchemy import MetaData, Table, inspect
+from sqlalchemy import (
+    BigInteger,
+    Column,
+    MetaData,
+    Table,
+    Text,
+    bindparam,
+    inspect,
+    select,
+    text,
+)
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.orm import Session
+from sqlalchemy.schema import CreateIndex
+
+from . import Session, get_engine
+from .schema import AcademyAwardWinningFilms, FilmArticle, TestTable, UUIDString
+
+# Column order of the tuples produced by the scraper
+FILM_COLUMNS = ("id", "film", "year", "awards", "nominations")
+
+# Number of rows sent per executemany() call by the bulk loader
+DEFAULT_CHUNK_SIZE = 500
+
+# INSERT constructs supporting ON CONFLICT DO UPDATE, by dialect name
+UPSERT_INSERTS = {"sqlite": sqlite_insert, "postgresql": postgresql_insert}
+
+# Number of rows committed together by BatchedRowWriter
+DEFAULT_COMMIT_EVERY = 100
+
+# FTS5 index over the film titles, kept in sync by triggers
+TITLE_SEARCH_TABLE = "academy_award_winning_films_fts"
+TITLE_SEARCH_DDL = (
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS {TITLE_SEARCH_TABLE} USING fts5("
+    "film, content='academy_award_winning_films', content_rowid='rowid')",
+    "CREATE TRIGGER IF NOT EXISTS academy_award_winning_films_fts_insert "
+    "AFTER INSERT ON academy_award_winning_films BEGIN "
+    f"INSERT INTO {TITLE_SEARCH_TABLE}(rowid, film) VALUES (new.rowid, new.film); END",
+    "CREATE TRIGGER IF NOT EXISTS academy_award_winning_films_fts_delete "
+    "AFTER DELETE ON academy_award_winning_films BEGIN "
+    f"INSERT INTO {TITLE_SEARCH_TABLE}({TITLE_SEARCH_TABLE}, rowid, film) "
+    "VALUES ('delete', old.rowid, old.film); END",
+    "CREATE TRIGGER IF NOT EXISTS academy_award_winning_films_fts_update "
+    "AFTER UPDATE OF film ON academy_award_winning_films BEGIN "
+    f"INSERT INTO {TITLE_SEARCH_TABLE}({TITLE_SEARCH_TABLE}, rowid, film) "
+    "VALUES ('delete', old.rowid, old.film); "
+    f"INSERT INTO {TITLE_SEARCH_TABLE}(rowid, film) VALUES (new.rowid, new.film); END",
+)
 
-from . import Base, Session, engine
-from .schema import AcademyAwardWinningFilms, TestTable
+# Whether check_tables_exist() has already seen the required tables
+_tables_verified = False
 
-# Setup logging
-logging.basicConfig(
-    level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
-)
+
+def invalidate_schema_cache():
+    """
+    Forget the cached result of check_tables_exist(), so the next call inspects
+    the database again.
+    """
+    global _tables_verified
+    _tables_verified = False
+
+
+def create_title_search(engine):
+    """
+    Create the FTS5 title index and the triggers keeping it in sync, then
+    rebuild it from the existing rows.
+
+    Args:
+        engine (sqlalchemy.engine.Engine): The SQLite engine.
+
+    Returns:
+        bool: True if the index exists, False if SQLite was built without FTS5.
+    """
+    try:
+        with engine.begin() as connection:
+            for statement in TITLE_SEARCH_DDL:
+                connection.execute(text(statement))
+            connection.execute(
+                text(
+                    f"INSERT INTO {TITLE_SEARCH_TABLE}({TITLE_SEARCH_TABLE}) "
+                    "VALUES ('rebuild')"
+                )
+            )
+    except SQLAlchemyError as e:
+        logging.warning(f"Full-text title search is not available: {str(e)}")
+        return False
+    logging.info("Full-text title search index is ready.")
+    return True
 
 
-def initialize_schema():
+def initialize_schema(title_search=False):
     """
-    Initialize the database schema by creating required tables.
+    Initialize the database schema by creating required tables and indexes.
+
+    Args:
+        title_search (bool): Whether to also create the FTS5 title index used
+                             by database.queries.search_title (SQLite only).
 
     Raises:
         SQLAlchemyError: If there's an error during schema initialization.
     """
+    invalidate_schema_cache()
     try:
+        engine = get_engine()
         metadata = MetaData()
         # Explicitly define tables
         Table(
@@ -36,8 +123,20 @@ def initialize_schema():
             *[c.copy() for c in AcademyAwardWinningFilms.__table__.columns],
         )
         Table("TestTable", metadata, *[c.copy() for c in TestTable.__table__.columns])
+        Table(
+            "film_articles",
+            metadata,
+            *[c.copy() for c in FilmArticle.__table__.columns],
+        )
         # Create tables
         metadata.create_all(engine)
+        # Create the lookup indexes declared on the models; IF NOT EXISTS because
+        # reflection cannot see the expression index checkfirst would look for
+        with engine.begin() as connection:
+            for index in AcademyAwardWinningFilms.__table__.indexes:
+                connection.execute(CreateIndex(index, if_not_exists=True))
+        if title_search and engine.dialect.name == "sqlite":
+            create_title_search(engine)
         logging.info("Database schema initialized successfully.")
 
         # Verify tables
@@ -54,17 +153,28 @@ def initialize_schema():
         raise
 
 
-def check_tables_exist():
+def check_tables_exist(refresh=False):
     """
     Check if required tables exist in the database.
 
+    Once the tables have been found the result is cached, so repeated checks
+    do not query the database catalogue. initialize_schema() clears the cache.
+
+    Args:
+        refresh (bool): Whether to inspect the database even if the tables
+                        were already found.
+
     Returns:
         bool: True if all required tables exist, False otherwise.
     """
-    inspector = inspect(engine)
+    global _tables_verified
+    if _tables_verified and not refresh:
+        return True
+    inspector = inspect(get_engine())
     existing_tables = inspector.get_table_names()
     required_tables = ["academy_award_winning_films", "TestTable"]
-    return all(table in existing_tables for table in required_tables)
+    _tables_verified = all(table in existing_tables for table in required_tables)
+    return _tables_verified
 
 
 def truncate_tables(session):
@@ -106,12 +216,300 @@ def insert_records(session, records, commit=True):
         raise
 
 
-def initDB(records):
+def _as_row_dict(record):
+    """
+    Convert a film record to a dictionary of column values.
+
+    Args:
+        record (tuple or dict): A tuple in FILM_COLUMNS order or a dict keyed by column name.
+
+    Returns:
+        dict: Column values keyed by column name.
+    """
+    if isinstance(record, dict):
+        return {column: record.get(column) for column in FILM_COLUMNS}
+    return dict(zip(FILM_COLUMNS, record))
+
+
+def _row_dicts(records):
+    """
+    Iterate over film records as dictionaries of column values.
+
+    Columnar batches such as wiki.records.FilmBatch convert their rows a
+    chunk at a time with iter_params().
+
+    Args:
+        records (iterable): Tuples in FILM_COLUMNS order, dicts keyed by column
+                            name, or an object with an iter_params() method.
+
+    Returns:
+        iterator: Column values keyed by column name, one dict per record.
+    """
+    iter_params = getattr(records, "iter_params", None)
+    if iter_params is not None:
+        return iter_params()
+    return (_as_row_dict(record) for record in records)
+
+
+def _chunked(iterable, size):
+    """
+    Split an iterable into lists of at most `size` items.
+
+    Args:
+        iterable: The items to split.
+        size (int): Maximum number of items per chunk.
+
+    Yields:
+        list: The next chunk of items.
+    """
+    chunk = []
+    for item in iterable:
+        chunk.append(item)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def copy_rows(dbapi_connection, table_name, columns, rows):
+    """
+    Load rows with PostgreSQL's COPY ... FROM STDIN.
+
+    Works with psycopg (3), whose cursors have copy(), and psycopg2, whose
+    cursors have copy_expert().
+
+    Args:
+        dbapi_connection: The DBAPI connection of the current transaction.
+        table_name (str): The table to load.
+        columns (sequence): The column names, in row order.
+        rows (list): Dicts keyed by column name.
+    """
+    column_list = ", ".join(f'"{column}"' for column in columns)
+    sql = f'COPY "{table_name}" ({column_list}) FROM STDIN'
+    cursor = dbapi_connection.cursor()
+    try:
+        if hasattr(cursor, "copy"):
+            with cursor.copy(sql) as copy:
+                for row in rows:
+                    copy.write_row([row[column] for column in columns])
+        else:
+            # Unquoted empty fields are read back as NULL
+            buffer = io.StringIO()
+            writer = csv.writer(buffer)
+            for row in rows:
+                writer.writerow([row[column] for column in columns])
+            buffer.seek(0)
+            cursor.copy_expert(f"{sql} WITH (FORMAT csv)", buffer)
+    finally:
+        cursor.close()
+
+
+def insert_records_bulk(session, records, chunk_size=DEFAULT_CHUNK_SIZE, commit=True):
+    """
+    Insert film records with batched Core INSERT statements.
+
+    Unlike insert_records, rows are not turned into ORM objects; each chunk is
+    sent to the database as a single executemany() call, or streamed with COPY
+    on PostgreSQL.
+
+    Args:
+        session (Session): SQLAlchemy session object.
+        records (iterable): Tuples in FILM_COLUMNS order or dicts keyed by column name.
+        chunk_size (int): Number of rows sent per executemany() call.
+        commit (bool): Whether to commit the session after insertion.
+
+    Returns:
+        int: The number of rows inserted.
+
+    Raises:
+        ValueError: If chunk_size is not a positive integer.
+        SQLAlchemyError: If there's an error during record insertion.
+    """
+    if chunk_size < 1:
+        raise ValueError("chunk_size must be a positive integer.")
+
+    table = AcademyAwardWinningFilms.__table__
+    statement = table.insert()
+    use_copy = session.get_bind().dialect.name == "postgresql"
+    inserted = 0
+    try:
+        for chunk in _chunked(_row_dicts(records), chunk_size):
+            if use_copy:
+                dbapi_connection = session.connection().connection
+                copy_rows(dbapi_connection, table.name, FILM_COLUMNS, chunk)
+            else:
+                session.execute(statement, chunk)
+            inserted += len(chunk)
+        if commit:
+            session.commit()
+        logging.info(f"{inserted} records bulk inserted successfully.")
+        return inserted
+    except SQLAlchemyError as e:
+        if commit:
+            session.rollback()
+        logging.error(f"Error bulk inserting records: {str(e)}")
+        raise
+
+
+def upsert_insert(session, table):
+    """
+    Build an INSERT for the session's database that supports ON CONFLICT DO UPDATE.
+
+    Args:
+        session (Session): SQLAlchemy session object.
+        table (sqlalchemy.Table): The table to insert into.
+
+    Returns:
+        sqlalchemy.sql.Insert: The dialect-specific INSERT construct.
+
+    Raises:
+        NotImplementedError: If the database does not support the upsert.
+    """
+    dialect = session.get_bind().dialect.name
+    if dialect not in UPSERT_INSERTS:
+        raise NotImplementedError(f"Upserts are not supported on {dialect}.")
+    return UPSERT_INSERTS[dialect](table)
+
+
+def film_key(row):
+    """
+    Compute the content-based key identifying a film across scrapes.
+
+    Args:
+        row (dict): Column values keyed by column name.
+
+    Returns:
+        tuple: The (film, year) pair.
+    """
+    return (row["film"], row["year"])
+
+
+def sync_records(session, records, chunk_size=DEFAULT_CHUNK_SIZE, commit=True):
+    """
+    Synchronize the films table with the given records without reloading it.
+
+    Records are matched to existing rows by film_key. New and changed rows are
+    written with INSERT ... ON CONFLICT DO UPDATE, and rows whose key is no
+    longer present are deleted. A matched row whose id differs from the
+    record's is updated to the record's id, so the table always holds the ids
+    the caller exports and links against; use stable ids (uuid5) to keep
+    reruns from rewriting every row.
+
+    Args:
+        session (Session): SQLAlchemy session object.
+        records (iterable): Tuples in FILM_COLUMNS order or dicts keyed by column name.
+        chunk_size (int): Number of rows looked up and upserted per statement.
+        commit (bool): Whether to commit the session after synchronization.
+
+    Returns:
+        dict: Counts of "inserted", "updated", "deleted" and "unchanged" rows.
+
+    Raises:
+        ValueError: If chunk_size is not a positive integer.
+        SQLAlchemyError: If there's an error during synchronization.
+    """
+    if chunk_size < 1:
+        raise ValueError("chunk_size must be a positive integer.")
+
+    table = AcademyAwardWinningFilms.__table__
+    counts = {"inserted": 0, "updated": 0, "deleted": 0, "unchanged": 0}
+    seen_keys = set()
+    kept_ids = set()
+    # Moves a matched row to the record's id, e.g. from uuid4 to uuid5 ids
+    rekey = (
+        table.update()
+        .where(table.c.id == bindparam("current_id"))
+        .values({column: bindparam(f"new_{column}") for column in FILM_COLUMNS})
+    )
+    try:
+        for chunk in _chunked(_row_dicts(records), chunk_size):
+            existing = {}
+            films = {row["film"] for row in chunk}
+            for row in session.execute(select(table).where(table.c.film.in_(films))):
+                existing[film_key(row._mapping)] = dict(row._mapping)
+
+            changed = []
+            rekeyed = []
+            for row in chunk:
+                # Ids are compared as the strings the id column stores
+                row = dict(row, id=str(row["id"]))
+                key = film_key(row)
+                if key in seen_keys:
+                    logging.warning(f"Skipping duplicate film record: {key}")
+                    continue
+                seen_keys.add(key)
+                kept_ids.add(row["id"])
+
+                current = existing.get(key)
+                if current is None:
+                    counts["inserted"] += 1
+                    changed.append(row)
+                elif row["id"] != str(current["id"]):
+                    counts["updated"] += 1
+                    rekeyed.append(
+                        dict(
+                            {f"new_{column}": row[column] for column in FILM_COLUMNS},
+                            current_id=current["id"],
+                        )
+                    )
+                elif row == dict(current, id=row["id"]):
+                    counts["unchanged"] += 1
+                else:
+                    counts["updated"] += 1
+                    changed.append(row)
+
+            if rekeyed:
+                session.execute(rekey, rekeyed)
+
+            if changed:
+                statement = upsert_insert(session, table)
+                statement = statement.on_conflict_do_update(
+                    index_elements=[table.c.id],
+                    set_={
+                        column: statement.excluded[column]
+                        for column in FILM_COLUMNS
+                        if column != "id"
+                    },
+                )
+                session.execute(statement, changed)
+
+        stale_ids = [
+            film_id
+            for film_id in session.execute(select(table.c.id)).scalars()
+            if str(film_id) not in kept_ids
+        ]
+        for chunk in _chunked(stale_ids, chunk_size):
+            session.execute(table.delete().where(table.c.id.in_(chunk)))
+        counts["deleted"] = len(stale_ids)
+
+        if commit:
+            session.commit()
+        logging.info(f"Films table synchronized: {counts}")
+        return counts
+    except SQLAlchemyError as e:
+        if commit:
+            session.rollback()
+        logging.error(f"Error synchronizing records: {str(e)}")
+        raise
+
+
+def initDB(records, bulk=False, chunk_size=DEFAULT_CHUNK_SIZE, sync=False):
     """
     Initialize the database by creating schema, truncating existing tables, and inserting initial records.
 
+    With sync=True the films table is not truncated; it is brought in line with
+    the records through sync_records, so unchanged rows are never rewritten.
+
     Args:
         records (list): List of record objects to be inserted after schema creation.
+                        With bulk=True or sync=True, plain tuples or dicts as returned by the scraper.
+        bulk (bool): Whether to load the records with batched Core inserts instead of the ORM.
+        chunk_size (int): Number of rows per batch when bulk or sync is True.
+        sync (bool): Whether to incrementally synchronize instead of truncating and reloading.
+
+    Returns:
+        dict or None: The sync_records counts when sync is True, otherwise None.
 
     Raises:
         Exception: If an unexpected error occurs during database initialization.
@@ -127,11 +525,22 @@ def initDB(records):
 
         session = Session()
         try:
+            if sync:
+                # TestTable only holds scratch rows, so it is still cleared
+                session.query(TestTable).delete()
+                counts = sync_records(session, records, chunk_size, commit=False)
+                session.commit()
+                logging.info("Database synchronized successfully with new records.")
+                return counts
+
             # Truncate existing tables
             truncate_tables(session)
 
             # Insert new records without committing
-            insert_records(session, records, commit=False)
+            if bulk:
+                insert_records_bulk(session, records, chunk_size, commit=False)
+            else:
+                insert_records(session, records, commit=False)
 
             # Commit all changes in a single transaction
             session.commit()
@@ -149,6 +558,110 @@ def initDB(records):
         raise
 
 
+def save_film_articles(articles, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Replace the contents of the film_articles table with freshly crawled articles.
+
+    Args:
+        articles (list): Dicts with the FilmArticle column values, as returned
+                         by wiki.crawler.crawl_film_articles.
+        chunk_size (int): Number of rows sent per executemany() call.
+
+    Returns:
+        int: The number of articles saved.
+
+    Raises:
+        SQLAlchemyError: If there's an error while saving the articles.
+    """
+    table = FilmArticle.__table__
+    session = Session()
+    try:
+        session.execute(table.delete())
+        for chunk in _chunked(articles, chunk_size):
+            session.execute(table.insert(), chunk)
+        session.commit()
+        logging.info(f"{len(articles)} film articles saved successfully.")
+        return len(articles)
+    except SQLAlchemyError as e:
+        session.rollback()
+        logging.error(f"Error saving film articles: {str(e)}")
+        raise
+    finally:
+        session.close()
+
+
+def create_records_table(table_name, columns, numeric_columns=()):
+    """
+    Create a table for scraped records unless it already exists.
+
+    Tables of sources other than the films table have no ORM model, so
+    they are declared from the record columns: an indexed id column first,
+    BIGINT numeric columns and TEXT for the rest.
+
+    Args:
+        table_name (str): Name of the table.
+        columns (sequence): The column names, in record order, the id first.
+        numeric_columns (sequence): Columns holding integers.
+
+    Raises:
+        SQLAlchemyError: If the table cannot be created.
+    """
+    id_column, *value_columns = columns
+    table = Table(
+        table_name,
+        MetaData(),
+        Column(id_column, UUIDString, index=True),
+        *(
+            Column(name, BigInteger if name in numeric_columns else Text)
+            for name in value_columns
+        ),
+    )
+    try:
+        table.create(get_engine(), checkfirst=True)
+    except SQLAlchemyError as e:
+        logging.error(f"Error creating the {table_name} table: {str(e)}")
+        raise
+
+
+def replace_table_rows(table_name, columns, records, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Replace the contents of an existing table with the given records.
+
+    The table is reflected from the database, so any table created outside
+    the ORM models can be loaded.
+
+    Args:
+        table_name (str): Name of the table.
+        columns (sequence): The column names, in record order.
+        records (iterable): Tuples of values in column order.
+        chunk_size (int): Number of rows sent per executemany() call.
+
+    Returns:
+        int: The number of rows inserted.
+
+    Raises:
+        SQLAlchemyError: If the table does not exist or the rows cannot be saved.
+    """
+    session = Session()
+    try:
+        table = Table(table_name, MetaData(), autoload_with=session.get_bind())
+        session.execute(table.delete())
+        inserted = 0
+        rows = (dict(zip(columns, record)) for record in records)
+        for chunk in _chunked(rows, chunk_size):
+            session.execute(table.insert(), chunk)
+            inserted += len(chunk)
+        session.commit()
+        logging.info(f"{inserted} rows saved to {table_name}.")
+        return inserted
+    except SQLAlchemyError as e:
+        session.rollback()
+        logging.error(f"Error saving rows to {table_name}: {str(e)}")
+        raise
+    finally:
+        session.close()
+
+
 def insertRow(row):
     """
     Insert a single row into the database.
@@ -174,3 +687,81 @@ def insertRow(row):
         raise
     finally:
         session.close()
+
+
+class BatchedRowWriter:
+    """
+    Context manager inserting single rows through one session, committing
+    every `commit_every` rows and once more when the context exits.
+
+    The tables are checked once on entry rather than for every row. If the
+    context exits with an exception, the rows added since the last commit
+    are rolled back.
+    """
+
+    def __init__(self, commit_every=DEFAULT_COMMIT_EVERY):
+        """
+        Initialize a BatchedRowWriter instance.
+
+        Args:
+            commit_every (int): Number of rows committed together.
+
+        Raises:
+            ValueError: If commit_every is smaller than 1.
+        """
+        if commit_every < 1:
+            raise ValueError("commit_every must be at least 1.")
+        self.commit_every = commit_every
+        self.rows_written = 0
+        self._pending = 0
+        self._session = None
+
+    def __enter__(self):
+        if not check_tables_exist():
+            logging.error("Tables do not exist. Cannot insert rows.")
+            raise Exception("Tables do not exist. Cannot insert rows.")
+        self._session = Session()
+        return self
+
+    def add(self, row):
+        """
+        Add a row, committing the pending rows once commit_every is reached.
+
+        Args:
+            row: The row object to be inserted.
+
+        Raises:
+            SQLAlchemyError: If there's an error during the commit.
+        """
+        self._session.add(row)
+        self._pending += 1
+        if self._pending >= self.commit_every:
+            self.commit()
+
+    def commit(self):
+        """
+        Commit the pending rows.
+
+        Raises:
+            SQLAlchemyError: If there's an error during the commit.
+        """
+        if not self._pending:
+            return
+        try:
+            self._session.commit()
+        except SQLAlchemyError as e:
+            self._session.rollback()
+            logging.error(f"Error inserting rows: {str(e)}")
+            raise
+        self.rows_written += self._pending
+        logging.info(f"{self._pending} rows inserted successfully.")
+        self._pending = 0
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        try:
+            if exc_type is None:
+                self.commit()
+            else:
+                self._session.rollback()
+        finally:
+            self._session.close()
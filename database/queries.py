@@ -0,0 +1,286 @@
+"""
+Database queries module.
+
+This module provides the read queries used by the dashboard. Each one is
+served by an index declared on academy_award_winning_films: the year and
+awards indexes, and the lower(film) expression index, or the FTS5 title
+index when initialize_schema(title_search=True) has created it.
+load_films_dataframe() reads the table into a typed DataFrame instead, for
+analysis code that would otherwise re-read the CSV export.
+"""
+
+import string
+import sys
+
+from sqlalchemy import func, select, text
+
+from . import Session
+from .operations import TITLE_SEARCH_TABLE
+from .schema import AcademyAwardWinningFilms
+
+# Default number of films returned by the ranked queries
+DEFAULT_LIMIT = 20
+
+# SQLite's lower() only folds the ASCII letters
+ASCII_LOWER = str.maketrans(string.ascii_uppercase, string.ascii_lowercase)
+
+# Column dtypes of load_films_dataframe for each dtype backend
+FILM_DTYPES = {
+    "numpy_nullable": {
+        "id": "string",
+        "film": "string",
+        "year": "Int64",
+        "awards": "Int64",
+        "nominations": "Int64",
+    },
+    "pyarrow": {
+        "id": "string[pyarrow]",
+        "film": "string[pyarrow]",
+        "year": "int64[pyarrow]",
+        "awards": "int64[pyarrow]",
+        "nominations": "int64[pyarrow]",
+    },
+}
+DTYPE_BACKENDS = tuple(FILM_DTYPES)
+
+
+def films_by_year(year):
+    """
+    Get the films awarded in a given year.
+
+    Args:
+        year (int): Year of the award.
+
+    Returns:
+        list: AcademyAwardWinningFilms objects ordered by title.
+    """
+    statement = (
+        select(AcademyAwardWinningFilms)
+        .where(AcademyAwardWinningFilms.year == year)
+        .order_by(AcademyAwardWinningFilms.film)
+    )
+    with Session() as session:
+        return list(session.scalars(statement))
+
+
+def top_by_awards(limit=DEFAULT_LIMIT, year=None):
+    """
+    Get the films with the most awards.
+
+    Args:
+        limit (int): Maximum number of films returned.
+        year (int, optional): Only rank the films awarded in this year.
+
+    Returns:
+        list: AcademyAwardWinningFilms objects, most awarded first, ties broken
+              by the number of nominations.
+    """
+    statement = select(AcademyAwardWinningFilms).where(
+        AcademyAwardWinningFilms.awards.is_not(None)
+    )
+    if year is not None:
+        statement = statement.where(AcademyAwardWinningFilms.year == year)
+    statement = statement.order_by(
+        AcademyAwardWinningFilms.awards.desc(),
+        AcademyAwardWinningFilms.nominations.desc(),
+    ).limit(limit)
+    with Session() as session:
+        return list(session.scalars(statement))
+
+
+def _has_title_search(session):
+    """
+    Check whether the FTS5 title index exists.
+
+    Args:
+        session (Session): SQLAlchemy session object.
+
+    Returns:
+        bool: True if the index exists.
+    """
+    found = session.execute(
+        text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"),
+        {"name": TITLE_SEARCH_TABLE},
+    )
+    return found.first() is not None
+
+
+def _match_expression(query):
+    """
+    Build an FTS5 query matching every word of a search, the last as a prefix.
+
+    Args:
+        query (str): The words searched for.
+
+    Returns:
+        str: The MATCH expression, with each word quoted as a string.
+    """
+    words = ['"' + word.replace('"', '""') + '"' for word in query.split()]
+    return " ".join(words) + "*"
+
+
+def _fold_prefix(prefix, dialect_name):
+    """
+    Lowercase a title prefix the way the database's lower() folds the titles.
+
+    Args:
+        prefix (str): The start of the title searched for.
+        dialect_name (str): Name of the database dialect, e.g. "sqlite".
+
+    Returns:
+        str: The prefix, with only its ASCII letters lowered on SQLite.
+    """
+    if dialect_name == "sqlite":
+        return prefix.translate(ASCII_LOWER)
+    return prefix.lower()
+
+
+def _prefix_upper_bound(prefix):
+    """
+    Find the smallest string above every string starting with a prefix.
+
+    Args:
+        prefix (str): A non-empty prefix.
+
+    Returns:
+        str or None: The bound, or None if the prefix only holds the highest
+                     code point, so that no bound is needed.
+    """
+    prefix = prefix.rstrip(chr(sys.maxunicode))
+    if not prefix:
+        return None
+    code_point = ord(prefix[-1]) + 1
+    if 0xD800 <= code_point <= 0xDFFF:
+        # Surrogates cannot be encoded, the next character is U+E000
+        code_point = 0xE000
+    return prefix[:-1] + chr(code_point)
+
+
+def search_title(query, limit=DEFAULT_LIMIT):
+    """
+    Search films by title.
+
+    With the FTS5 title index, films containing every word of the query (the
+    last one as a prefix) are returned by relevance. Without it, the search
+    falls back to a prefix match on the lower(film) index: a range of
+    lowered titles on SQLite, which compares strings byte by byte, and an
+    escaped LIKE on PostgreSQL, whose locale collations would let other
+    titles into the range. That match is case-insensitive for every letter
+    on PostgreSQL, but only for the ASCII letters on SQLite, whose lower()
+    leaves the others as they are: "amélie" finds "Amélie" but "AMÉLIE"
+    does not.
+
+    Args:
+        query (str): The words searched for.
+        limit (int): Maximum number of films returned.
+
+    Returns:
+        list: Matching AcademyAwardWinningFilms objects.
+    """
+    if not query.strip():
+        return []
+    with Session() as session:
+        if session.get_bind().dialect.name == "sqlite" and _has_title_search(session):
+            statement = select(AcademyAwardWinningFilms).from_statement(
+                text(
+                    "SELECT films.* FROM academy_award_winning_films AS films "
+                    f"JOIN {TITLE_SEARCH_TABLE} "
+                    f"ON {TITLE_SEARCH_TABLE}.rowid = films.rowid "
+                    f"WHERE {TITLE_SEARCH_TABLE} MATCH :match "
+                    f"ORDER BY {TITLE_SEARCH_TABLE}.rank LIMIT :limit"
+                )
+            )
+            params = {"match": _match_expression(query), "limit": limit}
+            return list(session.scalars(statement, params))
+
+        dialect_name = session.get_bind().dialect.name
+        prefix = _fold_prefix(query.strip(), dialect_name)
+        title = func.lower(AcademyAwardWinningFilms.film)
+        statement = select(AcademyAwardWinningFilms)
+        if dialect_name == "postgresql":
+            # A range is only a prefix match under byte-order collation, which
+            # Postgres databases rarely use; text_pattern_ops indexes LIKE
+            statement = statement.where(title.startswith(prefix, autoescape=True))
+        else:
+            # A range rather than LIKE, so SQLite can use the expression index
+            statement = statement.where(title >= prefix)
+            upper_bound = _prefix_upper_bound(prefix)
+            if upper_bound is not None:
+                statement = statement.where(title < upper_bound)
+        statement = statement.order_by(title).limit(limit)
+        return list(session.scalars(statement))
+
+
+def _read_chunks(statement, chunksize, dtype):
+    """
+    Read the rows of a query into DataFrames of at most `chunksize` rows.
+
+    The session stays open until the chunks are exhausted or the generator
+    is closed, so only one chunk of rows is held in memory at a time.
+
+    Args:
+        statement (Select): The query.
+        chunksize (int): Maximum number of rows per DataFrame.
+        dtype (dict): Column dtypes keyed by column name.
+
+    Yields:
+        pd.DataFrame: The next chunk of rows.
+    """
+    import pandas as pd
+
+    with Session() as session:
+        yield from pd.read_sql_query(
+            statement, session.connection(), chunksize=chunksize, dtype=dtype
+        )
+
+
+def load_films_dataframe(columns=None, chunksize=None, dtype_backend="numpy_nullable"):
+    """
+    Read the films table into a typed DataFrame.
+
+    Only the requested columns are selected, so a projection reads no more
+    of the database than it needs. Every column gets a fixed dtype whatever
+    the rows hold, so chunks with only missing values keep the same dtypes
+    as the others: nullable string and Int64 columns, or their Arrow-backed
+    equivalents, which pyarrow and Arrow-based tools use without a copy.
+
+    Args:
+        columns (list, optional): Columns to read, in order; all of them by default.
+        chunksize (int, optional): Read the rows in DataFrames of at most this
+                                   many rows instead of all at once.
+        dtype_backend (str): "numpy_nullable" or "pyarrow", see DTYPE_BACKENDS.
+
+    Returns:
+        pd.DataFrame or iterator: The films ordered by id, or an iterator of
+                                  DataFrames when chunksize is given.
+
+    Raises:
+        ValueError: If no column or an unknown one is requested, the dtype
+                    backend is unknown, or chunksize is not a positive integer.
+    """
+    import pandas as pd
+
+    if dtype_backend not in FILM_DTYPES:
+        raise ValueError(
+            f"Unknown dtype backend {dtype_backend!r}, expected one of {DTYPE_BACKENDS}."
+        )
+    if chunksize is not None and chunksize < 1:
+        raise ValueError("chunksize must be a positive integer.")
+    table = AcademyAwardWinningFilms.__table__
+    columns = list(table.columns.keys() if columns is None else columns)
+    if not columns:
+        raise ValueError("At least one column must be read.")
+    unknown = [name for name in columns if name not in table.columns]
+    if unknown:
+        raise ValueError(
+            f"Unknown columns {unknown}, expected some of {table.columns.keys()}."
+        )
+
+    statement = select(*(table.columns[name] for name in columns)).order_by(
+        table.columns.id
+    )
+    dtype = {name: FILM_DTYPES[dtype_backend][name] for name in columns}
+    if chunksize is not None:
+        return _read_chunks(statement, chunksize, dtype)
+    with Session() as session:
+        return pd.read_sql_query(statement, session.connection(), dtype=dtype)
@@ -4,11 +4,15 @@ Database schema module.
 This module defines the SQLAlchemy ORM models for the database tables.
 """
 
-from sqlalchemy import CheckConstraint, Column, Integer, String
+from sqlalchemy import CheckConstraint, Column, Index, Integer, String, func
+from sqlalchemy.dialects import postgresql
 from sqlalchemy.ext.declarative import declarative_base
 
 Base = declarative_base()
 
+# UUID strings, stored in the native UUID type on Postgres
+UUIDString = String(36).with_variant(postgresql.UUID(as_uuid=False), "postgresql")
+
 
 class AcademyAwardWinningFilms(Base):
     """
@@ -17,13 +21,24 @@ class AcademyAwardWinningFilms(Base):
 
     __tablename__ = "academy_award_winning_films"
 
-    id = Column(String(36), primary_key=True)
+    id = Column(UUIDString, primary_key=True)
     film = Column(String(255), nullable=False)
     year = Column(Integer, nullable=True)
     awards = Column(Integer, nullable=True)
     nominations = Column(Integer, nullable=True)
 
-    __table_args__ = (CheckConstraint("year >= 1888", name="check_year"),)
+    __table_args__ = (
+        CheckConstraint("year >= 1888", name="check_year"),
+        Index("ix_academy_award_winning_films_year", "year"),
+        Index("ix_academy_award_winning_films_awards", "awards"),
+        # Case-insensitive title lookups; SQLite's lower() only folds ASCII letters.
+        # text_pattern_ops lets Postgres serve LIKE 'prefix%' under any collation
+        Index(
+            "ix_academy_award_winning_films_title",
+            func.lower(film).label("lower_film"),
+            postgresql_ops={"lower_film": "text_pattern_ops"},
+        ),
+    )
 
     def __init__(self, id: str, film: str, year=None, awards=None, nominations=None):
         """
@@ -50,7 +65,7 @@ class TestTable(Base):
 
     __tablename__ = "TestTable"
 
-    id = Column(String(36), primary_key=True)
+    id = Column(UUIDString, primary_key=True)
     text = Column(String(255), nullable=False)
 
     def __init__(self, id: str, text: str):
@@ -63,3 +78,48 @@ class TestTable(Base):
         """
         self.id = id
         self.text = text
+
+
+class FilmArticle(Base):
+    """
+    SQLAlchemy ORM model for the film_articles table.
+
+    Holds the enrichment fields crawled from each film's Wikipedia article,
+    keyed by the id of the film in academy_award_winning_films.
+    """
+
+    __tablename__ = "film_articles"
+
+    film_id = Column(UUIDString, primary_key=True)
+    url = Column(String(255), nullable=False)
+    directed_by = Column(String(255), nullable=True)
+    running_time = Column(Integer, nullable=True)
+    country = Column(String(255), nullable=True)
+    language = Column(String(255), nullable=True)
+
+    def __init__(
+        self,
+        film_id: str,
+        url: str,
+        directed_by=None,
+        running_time=None,
+        country=None,
+        language=None,
+    ):
+        """
+        Initialize a FilmArticle instance.
+
+        Args:
+            film_id (str): Id of the film the article belongs to.
+            url (str): URL of the film's article.
+            directed_by (str, optional): Director(s) of the film.
+            running_time (int, optional): Running time in minutes.
+            country (str, optional): Country or countries of production.
+            language (str, optional): Original language(s) of the film.
+        """
+        self.film_id = film_id
+        self.url = url
+        self.directed_by = directed_by
+        self.running_time = running_time
+        self.country = country
+        self.language = language
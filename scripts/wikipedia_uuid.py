@@ -1,116 +1,618 @@
 """
 Wikipedia Oscar-winning films scraper and database population script.
 This script scrapes data about Academy Award-winning films from Wikipedia,
-stores it in a database, and exports it to CSV and JSON formats.
+stores it in a database, and exports it to CSV, JSON, Parquet and Feather formats.
 """
 
+import argparse
 import logging
 import uuid
 
-import pandas as pd
-from database import AcademyAwardWinningFilms, Session, TestTable, initDB, insertRow
-from database.operations import check_tables_exist, initialize_schema
+from database import (
+    AcademyAwardWinningFilms,
+    TestTable,
+    initDB,
+    insertRow,
+    save_film_articles,
+)
+from database.operations import (
+    check_tables_exist,
+    create_records_table,
+    initialize_schema,
+    replace_table_rows,
+)
 from sqlalchemy.exc import SQLAlchemyError
-from wiki import BeautifulSoup as bs
-from wiki import fetchPage, requests
-from wiki.export_functions import exportToCsv, exportToJson
-from wiki.utils import clean_numeric
+from wiki import ResponseCache, SnapshotStore, configure_snapshots, fetchPage
+from wiki.crawler import (
+    DEFAULT_MAX_WORKERS,
+    DEFAULT_REQUESTS_PER_SECOND,
+    crawl_film_articles,
+)
+from wiki.export_functions import (
+    CsvExportWriter,
+    JsonExportWriter,
+    exportToCsv,
+    exportToFeather,
+    exportToJson,
+    exportToParquet,
+)
+from wiki.metrics import DEFAULT_METRICS_PATH, configure_metrics, get_recorder, span
+from wiki.parsing import DEFAULT_PARSER, PARSER_BACKENDS, iter_wikitable_rows
+from wiki.pipeline import DEFAULT_CHECKPOINT_DIR
+from wiki.pipeline import DEFAULT_MAX_WORKERS as DEFAULT_PIPELINE_WORKERS
+from wiki.pipeline import Pipeline, Stage, StopPipeline
+from wiki.records import FilmBatch
+from wiki.snapshots import DEFAULT_SNAPSHOT_DIR
+from wiki.sources import DEFAULT_MAX_WORKERS as DEFAULT_SOURCE_WORKERS
+from wiki.sources import (
+    OSCAR_FILMS_URL,
+    OSCAR_WINNING_FILMS,
+    SOURCES,
+    iter_source_records,
+    parse_film_batch,
+    parse_source_page,
+    scrape_sources,
+)
+from wiki.utils import DEFAULT_BATCH_SIZE, fan_out
 
+# Id strategy used by main(); content-derived ids keep primary keys stable across runs
+ID_STRATEGY = "uuid5"
 
-def scrape_oscar_winning_films():
+# Size of the chunks read from the response by stream_oscar_winning_films
+STREAM_CHUNK_SIZE = 64 * 1024
+
+
+def iter_film_rows(
+    rows, id_strategy="uuid4", include_links=False, batch_size=DEFAULT_BATCH_SIZE
+):
+    """
+    Turn parsed wikitable rows into film tuples.
+    The numeric columns are cleaned a batch of rows at a time with
+    wiki.utils.clean_numeric_column, so years, awards and nominations are
+    always integers or None.
+    Args:
+    rows (iterable): (cells, href) tuples as returned by wiki.parsing.
+    id_strategy (str): How row ids are generated, one of wiki.utils.ID_STRATEGIES.
+    include_links (bool): Whether to append the absolute URL of each film's article
+    (None when the row has no link) to the tuples.
+    batch_size (int): Number of rows cleaned together.
+    Yields:
+    tuple: Film data (id, film, year, awards, nominations), plus the URL if include_links.
+    """
+    return iter_source_records(
+        OSCAR_WINNING_FILMS, rows, id_strategy, include_links, batch_size
+    )
+
+
+def scrape_oscar_winning_films(
+    id_strategy="uuid4",
+    cache=None,
+    skip_unchanged=False,
+    include_links=False,
+    parser=DEFAULT_PARSER,
+):
     """
     Scrape Oscar-winning films data from Wikipedia.
+    Args:
+    id_strategy (str): How row ids are generated, one of wiki.utils.ID_STRATEGIES.
+    cache (ResponseCache, optional): Cache used to make the page request conditional.
+    skip_unchanged (bool): Whether to stop without parsing when the page is not modified.
+    include_links (bool): Whether to append the absolute URL of each film's article
+    (None when the row has no link) to the tuples.
+    parser (str): HTML parser backend, one of wiki.parsing.PARSER_BACKENDS.
     Returns:
-    list: A list of tuples containing film data (id, film, year, awards, nominations).
+    FilmBatch: The films as a columnar batch, which iterates as FilmRecord tuples
+    (id, film, year, awards, nominations); with include_links, a list of tuples
+    with the URL appended. None if skip_unchanged is set and the page has not
+    changed since it was cached.
     Raises:
     Exception: If the page structure has changed and data cannot be scraped.
     """
-    url = "https://en.wikipedia.org/wiki/List_of_Academy_Award%E2%80%93winning_films"
+    url = OSCAR_FILMS_URL
     try:
-        response = fetchPage(url)
-        if response is None:
-            raise Exception("Failed to fetch the Wikipedia page")
+        with span("fetch") as stage:
+            response = fetchPage(url, cache=cache)
+            if response is None:
+                raise Exception("Failed to fetch the Wikipedia page")
+            if response.status_code != 304:
+                stage.add(bytes_fetched=len(response.content))
 
-        soup = bs(response.content, features="html.parser")
-        logging.info("Created the soup.")
-
-        table = soup.find("table", class_="wikitable")
-        if not table:
-            raise Exception("Unable to find the wikitable on the page.")
-
-        trs = table.find("tbody").find_all("tr")
-        logging.info("Successfully found elements in the soup.")
-
-        movies = []
-        for tr in trs[1:]:  # Skip the header row
-            tds = tr.find_all("td")
-            if len(tds) >= 4:  # Ensure the row has enough columns
-                id = str(uuid.uuid4())
-                film = tds[0].text.strip()
-                year = clean_numeric(tds[1].text.strip())
-                awards = clean_numeric(tds[2].text.strip())
-                nominations = clean_numeric(tds[3].text.strip())
-                movies.append((id, film, year, awards, nominations))
-            else:
-                logging.warning("Didn't manage to find 4 necessary columns in the row.")
-
-        if not movies:
-            raise Exception("No movie data was scraped from the page.")
+        if skip_unchanged and response.status_code == 304:
+            logging.info("The Wikipedia page has not changed since the last run.")
+            return None
 
+        with span("parse") as stage:
+            if include_links:
+                movies = parse_source_page(
+                    OSCAR_WINNING_FILMS,
+                    response.content,
+                    id_strategy,
+                    include_links,
+                    parser,
+                )
+            else:
+                movies = parse_film_batch(response.content, id_strategy, parser)
+            stage.add(rows_parsed=len(movies))
         return movies
     except Exception as e:
         logging.error(f"Error scraping Oscar-winning films: {str(e)}")
         raise
 
 
-def main():
+def stream_oscar_winning_films(
+    id_strategy="uuid4", cache=None, skip_unchanged=False, include_links=False
+):
     """
-    Main function to orchestrate the scraping, database population, and data export process.
+    Scrape Oscar-winning films data from Wikipedia as a stream of rows.
+    The page is requested up front; its body is then downloaded and parsed
+    incrementally while the returned generator is consumed, so neither the
+    page nor the rows are ever held in memory as a whole.
+    Args:
+    id_strategy (str): How row ids are generated, one of wiki.utils.ID_STRATEGIES.
+    cache (ResponseCache, optional): Cache used to make the page request conditional.
+    skip_unchanged (bool): Whether to stop without parsing when the page is not modified.
+    include_links (bool): Whether to append the article URL to the tuples.
+    Returns:
+    generator: Film tuples as produced by iter_film_rows, or None if skip_unchanged
+    is set and the page has not changed since it was cached.
+    Raises:
+    Exception: If the page cannot be fetched. Parsing errors are raised while iterating.
     """
-    try:
+    with span("fetch"):
+        response = fetchPage(OSCAR_FILMS_URL, cache=cache, stream=True)
+        if response is None:
+            raise Exception("Failed to fetch the Wikipedia page")
+    if skip_unchanged and response.status_code == 304:
+        logging.info("The Wikipedia page has not changed since the last run.")
+        response.close()
+        return None
+
+    def generate():
+        # The body is downloaded while parsing, so the bytes count towards the parse stage
+        with span("parse") as stage:
+            try:
+                chunks = stage.count(
+                    response.iter_content(STREAM_CHUNK_SIZE), "bytes_fetched", len
+                )
+                yield from stage.count(
+                    iter_film_rows(
+                        iter_wikitable_rows(chunks), id_strategy, include_links
+                    )
+                )
+                if not stage.counters["rows_parsed"]:
+                    raise Exception("No movie data was scraped from the page.")
+            finally:
+                response.close()
 
-        # Initialize the database schema
-        initialize_schema()
+    return generate()
 
-        # Verify tables exist
-        if not check_tables_exist():
-            logging.error("Tables do not exist after schema initialization. Exiting.")
-            return
 
-        movies_data = scrape_oscar_winning_films()
+def split_links(movies, links):
+    """
+    Strip the article URL from film tuples produced with include_links.
+    Args:
+    movies (iterable): (id, film, year, awards, nominations, url) tuples.
+    links (dict): Filled with the URLs keyed by film id as rows pass through.
+    Yields:
+    tuple: Film data (id, film, year, awards, nominations).
+    """
+    for movie in movies:
+        links[movie[0]] = movie[5]
+        yield movie[:5]
 
-        # Create AcademyAwardWinningFilms objects
-        movies = [AcademyAwardWinningFilms(*movie) for movie in movies_data]
 
-        # Initialize the database and insert all movies
-        initDB(movies)
+def rows_synced(counts):
+    """
+    Count the rows a sync actually wrote to the films table.
+    Args:
+    counts (dict or None): The counts returned by initDB(sync=True).
+    Returns:
+    int: The inserted, updated and deleted rows; unchanged rows are not written.
+    """
+    if not counts:
+        return 0
+    return counts["inserted"] + counts["updated"] + counts["deleted"]
 
-        # Verify tables exist again
-        if not check_tables_exist():
-            logging.error("Tables do not exist after initDB. Exiting.")
-            return
 
-        # Test inserting individual rows
-        new_film = AcademyAwardWinningFilms(str(uuid.uuid4()), "Test Film", 2023, 1, 5)
-        new_test = TestTable(str(uuid.uuid4()), "Test entry")
-        insertRow(new_film)
-        print("Inserted new film.")
-        insertRow(new_test)
-        print("Inserted test entry.")
-
-        # Create DataFrame for CSV and JSON export
-        df = pd.DataFrame(
-            movies_data, columns=["id", "film", "year", "awards", "nominations"]
+def run_sources(
+    sources=None,
+    max_workers=DEFAULT_SOURCE_WORKERS,
+    parser=DEFAULT_PARSER,
+    parse_workers=None,
+):
+    """
+    Scrape registered sources in parallel and load each into its target table.
+    The records of every source targeting the films table are synchronized
+    with initDB together, since a sync deletes the rows it is not given; the
+    sync is skipped if one of those sources failed. Other target tables are
+    created from the record columns if needed and have their contents replaced.
+    Args:
+    sources (iterable, optional): ScrapeSource objects, all registered sources by default.
+    max_workers (int): Maximum number of pages fetched at once.
+    parser (str): HTML parser backend, one of wiki.parsing.PARSER_BACKENDS.
+    parse_workers (int, optional): Number of parsing processes, one per CPU by default.
+    Returns:
+    dict: Number of records loaded keyed by source name.
+    """
+    sources = list(SOURCES.values() if sources is None else sources)
+    initialize_schema()
+    results = scrape_sources(
+        sources,
+        max_workers=max_workers,
+        parse_workers=parse_workers,
+        id_strategy=ID_STRATEGY,
+        parser=parser,
+    )
+    loaded = {}
+    film_sources = []
+    for source in sources:
+        if source.target_table == AcademyAwardWinningFilms.__tablename__:
+            film_sources.append(source)
+            continue
+        records = results.get(source.name)
+        if records is None:
+            continue
+        try:
+            create_records_table(
+                source.target_table, source.record_columns, source.numeric_columns
+            )
+            replace_table_rows(source.target_table, source.record_columns, records)
+        except SQLAlchemyError as e:
+            logging.error(f"Failed to load {source.name}: {str(e)}")
+            continue
+        loaded[source.name] = len(records)
+
+    missing = [source.name for source in film_sources if source.name not in results]
+    if missing:
+        # Syncing without them would delete the rows they loaded last time
+        logging.error(f"Not synchronizing the films table, {missing} failed.")
+    elif film_sources:
+        records = [record for source in film_sources for record in results[source.name]]
+        try:
+            initDB(records, sync=True)
+        except SQLAlchemyError as e:
+            names = [source.name for source in film_sources]
+            logging.error(f"Failed to load {names}: {str(e)}")
+        else:
+            for source in film_sources:
+                loaded[source.name] = len(results[source.name])
+    return loaded
+
+
+def parse_args(argv=None):
+    """
+    Parse the command line arguments of the script.
+
+    Args:
+    argv (list, optional): Arguments to parse, defaults to sys.argv[1:].
+    Returns:
+    argparse.Namespace: The parsed arguments.
+    """
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--cache",
+        action="store_true",
+        help="use the HTTP response cache and skip the run if the page is unchanged",
+    )
+    parser.add_argument(
+        "--parser",
+        choices=PARSER_BACKENDS,
+        default=DEFAULT_PARSER,
+        help="HTML parser backend used for the wikitable",
+    )
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="stream rows from the page to the database and exports in batches",
+    )
+    parser.add_argument(
+        "--all-sources",
+        action="store_true",
+        help="scrape every registered source in parallel into its target table",
+    )
+    parser.add_argument(
+        "--parse-workers",
+        type=int,
+        default=None,
+        help="number of processes parsing pages with --all-sources (default: CPU count)",
+    )
+    snapshots = parser.add_mutually_exclusive_group()
+    snapshots.add_argument(
+        "--record-snapshots",
+        action="store_true",
+        help="save every fetched page to the snapshot archive",
+    )
+    snapshots.add_argument(
+        "--replay-snapshots",
+        action="store_true",
+        help="serve every page from the snapshot archive without using the network",
+    )
+    parser.add_argument(
+        "--snapshot-dir",
+        default=DEFAULT_SNAPSHOT_DIR,
+        help="directory of the snapshot archive (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--metrics-jsonl",
+        default=DEFAULT_METRICS_PATH,
+        help="file each stage's metrics are appended to as JSON lines (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--metrics-prom",
+        metavar="PATH",
+        help="Prometheus textfile rewritten with the stage metrics after each run",
+    )
+    parser.add_argument(
+        "--checkpoint-dir",
+        default=DEFAULT_CHECKPOINT_DIR,
+        help="directory where finished stages are checkpointed (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--no-checkpoints",
+        action="store_true",
+        help="neither resume from nor save stage checkpoints",
+    )
+    parser.add_argument(
+        "--pipeline-workers",
+        type=int,
+        default=DEFAULT_PIPELINE_WORKERS,
+        help="maximum number of stages running at once",
+    )
+    parser.add_argument(
+        "--crawl",
+        action="store_true",
+        help="follow each film's article and store the infobox details",
+    )
+    parser.add_argument(
+        "--crawl-workers",
+        type=int,
+        default=DEFAULT_MAX_WORKERS,
+        help="maximum number of articles fetched concurrently",
+    )
+    parser.add_argument(
+        "--crawl-rate",
+        type=float,
+        default=DEFAULT_REQUESTS_PER_SECOND,
+        help="maximum article requests per second to each host (default: %(default)s)",
+    )
+    return parser.parse_args(argv)
+
+
+def build_pipeline(
+    cache=None,
+    crawl_articles=False,
+    crawl_workers=DEFAULT_MAX_WORKERS,
+    crawl_rate=DEFAULT_REQUESTS_PER_SECOND,
+    parser=DEFAULT_PARSER,
+    stream=False,
+    batch_size=DEFAULT_BATCH_SIZE,
+    checkpoint_dir=None,
+    max_workers=DEFAULT_PIPELINE_WORKERS,
+):
+    """
+    Build the stage graph of a run.
+    Scraping runs alongside the schema initialization. Once the films are
+    scraped, the database load and each file export run concurrently; the
+    single-row inserts and the article crawl wait for the load. When
+    streaming, one stage feeds the database and the CSV/JSON exports as the
+    page is parsed. See main() for the arguments.
+    Returns:
+    wiki.pipeline.Pipeline: The pipeline, checkpointed in checkpoint_dir if given.
+    """
+
+    def schema():
+        with span("schema"):
+            # Initialize the database schema
+            initialize_schema()
+
+            # Verify tables exist
+            if not check_tables_exist():
+                logging.error(
+                    "Tables do not exist after schema initialization. Exiting."
+                )
+                raise StopPipeline("tables missing after schema initialization")
+
+    def scrape():
+        movies_data = scrape_oscar_winning_films(
+            id_strategy=ID_STRATEGY,
+            cache=cache,
+            skip_unchanged=cache is not None,
+            include_links=crawl_articles,
+            parser=parser,
         )
-        exportToCsv(df)
-        exportToJson(df)
-        print("CSV and JSON files created successfully.")
+        if movies_data is None:
+            print("Wikipedia page unchanged, nothing to do.")
+            raise StopPipeline("page unchanged")
+        links = {}
+        if crawl_articles:
+            movies_data = list(split_links(movies_data, links))
+        return movies_data, links
 
-    except SQLAlchemyError as e:
-        logging.error(f"A database error occurred: {str(e)}")
-    except Exception as e:
-        logging.error(f"An unexpected error occurred: {str(e)}")
+    def load(_, scraped):
+        movies_data, links = scraped
+        # Initialize the database and sync the movies, rewriting only changed rows
+        with span("load") as stage:
+            counts = initDB(movies_data, sync=True)
+            stage.add(rows_written=rows_synced(counts))
+
+            # Verify tables exist again
+            if not check_tables_exist():
+                logging.error("Tables do not exist after initDB. Exiting.")
+                raise StopPipeline("tables missing after initDB")
+        return links
+
+    def stream_load(_):
+        movies_data = stream_oscar_winning_films(
+            id_strategy=ID_STRATEGY,
+            cache=cache,
+            skip_unchanged=cache is not None,
+            include_links=crawl_articles,
+        )
+        if movies_data is None:
+            print("Wikipedia page unchanged, nothing to do.")
+            raise StopPipeline("page unchanged")
+        links = {}
+        if crawl_articles:
+            movies_data = split_links(movies_data, links)
+
+        with span("load") as stage:
+            # Each batch reaches both exporters before the database loader takes it
+            with CsvExportWriter() as csv_writer, JsonExportWriter() as json_writer:
+                sinks = [csv_writer.write_batch, json_writer.write_batch]
+                counts = initDB(fan_out(movies_data, sinks, batch_size), sync=True)
+            stage.add(rows_written=rows_synced(counts))
+
+            if not check_tables_exist():
+                logging.error("Tables do not exist after initDB. Exiting.")
+                raise StopPipeline("tables missing after initDB")
+        return links
+
+    def crawl(links):
+        with span("crawl") as stage:
+            articles = crawl_film_articles(
+                links, max_workers=crawl_workers, requests_per_second=crawl_rate
+            )
+            save_film_articles(articles)
+            stage.add(rows_written=len(articles))
+        print(f"Crawled {len(articles)} film articles.")
+
+    def insert_rows(_):
+        # Test inserting individual rows
+        with span("insert_rows") as stage:
+            new_film = AcademyAwardWinningFilms(
+                str(uuid.uuid4()), "Test Film", 2023, 1, 5
+            )
+            new_test = TestTable(str(uuid.uuid4()), "Test entry")
+            insertRow(new_film)
+            print("Inserted new film.")
+            insertRow(new_test)
+            print("Inserted test entry.")
+            stage.add(rows_written=2)
+
+    def dataframe(scraped):
+        # Create DataFrame for CSV and JSON export, sharing the batch arrays
+        return FilmBatch.from_records(scraped[0]).to_dataframe()
+
+    def export_stage(name, export):
+        def run_export(df):
+            with span(name) as stage:
+                if export(df):
+                    stage.add(rows_written=len(df))
+
+        return Stage(name, run_export, requires=("dataframe",))
+
+    stages = [Stage("schema", schema, checkpoint=False)]
+    if stream:
+        stages.append(Stage("load", stream_load, requires=("schema",)))
+    else:
+        stages += [
+            Stage("scrape", scrape),
+            Stage("load", load, requires=("schema", "scrape")),
+            Stage("dataframe", dataframe, requires=("scrape",), checkpoint=False),
+            export_stage("export_csv", exportToCsv),
+            export_stage("export_json", exportToJson),
+            export_stage("export_parquet", exportToParquet),
+            export_stage("export_feather", exportToFeather),
+        ]
+    stages.append(Stage("insert_rows", insert_rows, requires=("load",)))
+    if crawl_articles:
+        stages.append(Stage("crawl", crawl, requires=("load",)))
+
+    # Checkpoints of a run are only reused by a run with the same settings
+    key = f"stream={stream},crawl={crawl_articles},parser={parser},ids={ID_STRATEGY}"
+    return Pipeline(stages, checkpoint_dir, key, max_workers)
+
+
+def main(
+    use_cache=False,
+    crawl_articles=False,
+    crawl_workers=DEFAULT_MAX_WORKERS,
+    crawl_rate=DEFAULT_REQUESTS_PER_SECOND,
+    parser=DEFAULT_PARSER,
+    stream=False,
+    batch_size=DEFAULT_BATCH_SIZE,
+    checkpoint_dir=None,
+    pipeline_workers=DEFAULT_PIPELINE_WORKERS,
+):
+    """
+    Main function to orchestrate the scraping, database population, and data export process.
+    The stages run as the dependency graph built by build_pipeline(), so the
+    exports no longer wait for the database load.
+    Args:
+    use_cache (bool): Whether to make the page request conditional and stop early
+    when the page has not changed since the previous successful run.
+    crawl_articles (bool): Whether to crawl each film's article into film_articles.
+    crawl_workers (int): Maximum number of articles fetched concurrently.
+    crawl_rate (float): Maximum article requests per second to each host.
+    parser (str): HTML parser backend, one of wiki.parsing.PARSER_BACKENDS.
+    stream (bool): Whether to stream rows from the page to the database and the
+    CSV/JSON exports in batches instead of scraping the whole list first.
+    The streaming parser is always used and the columnar exports are skipped.
+    batch_size (int): Number of rows handed to the exporters at a time when streaming.
+    checkpoint_dir (str, optional): Directory where finished stages are checkpointed,
+    so a failed run resumes without refetching; None disables checkpoints.
+    pipeline_workers (int): Maximum number of stages running at once.
+    Every stage is measured as a wiki.metrics span, reported to the recorder
+    set up with configure_metrics().
+    """
+    cache = ResponseCache() if use_cache else None
+    recorder = get_recorder()
+    with recorder.run() as run:
+        try:
+            pipeline = build_pipeline(
+                cache=cache,
+                crawl_articles=crawl_articles,
+                crawl_workers=crawl_workers,
+                crawl_rate=crawl_rate,
+                parser=parser,
+                stream=stream,
+                batch_size=batch_size,
+                checkpoint_dir=checkpoint_dir,
+                max_workers=pipeline_workers,
+            )
+            pipeline.run()
+            if pipeline.stopped:
+                return
+            if not stream:
+                print("Parquet and Feather files created successfully.")
+            print("CSV and JSON files created successfully.")
+
+        except SQLAlchemyError as e:
+            run.status = "error"
+            logging.error(f"A database error occurred: {str(e)}")
+            if cache is not None:
+                # Refetch on the next run rather than skipping a page that never loaded
+                cache.invalidate(OSCAR_FILMS_URL)
+        except Exception as e:
+            run.status = "error"
+            logging.error(f"An unexpected error occurred: {str(e)}")
+            if cache is not None:
+                cache.invalidate(OSCAR_FILMS_URL)
 
 
 if __name__ == "__main__":
-    main()
+    # Setup logging
+    logging.basicConfig(
+        level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
+    )
+    args = parse_args()
+    configure_metrics(args.metrics_jsonl, args.metrics_prom)
+    if args.record_snapshots or args.replay_snapshots:
+        configure_snapshots(
+            SnapshotStore(args.snapshot_dir),
+            "replay" if args.replay_snapshots else "record",
+        )
+    if args.all_sources:
+        loaded = run_sources(parser=args.parser, parse_workers=args.parse_workers)
+        print(f"Loaded {sum(loaded.values())} records from {len(loaded)} sources.")
+    else:
+        main(
+            use_cache=args.cache,
+            crawl_articles=args.crawl,
+            crawl_workers=args.crawl_workers,
+            crawl_rate=args.crawl_rate,
+            parser=args.parser,
+            stream=args.stream,
+            checkpoint_dir=None if args.no_checkpoints else args.checkpoint_dir,
+            pipeline_workers=args.pipeline_workers,
+        )
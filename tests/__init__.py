@@ -1,28 +1,209 @@
+import json
 import os
+import pickle
 import sys
+import tempfile
+import threading
 import unittest
 import uuid
+from http.server import BaseHTTPRequestHandler, HTTPServer
 from unittest.mock import MagicMock, patch
 
+import database
+import numpy as np
 import pandas as pd
 import requests
+from benchmarks import generate_wikitable, parse_size
+from benchmarks.run import STAGES, compare_results, run_size
+from database import DATABASE_URL_ENV_VAR, engine_options
 from database.operations import (
+    BatchedRowWriter,
     check_tables_exist,
-    engine,
+    copy_rows,
+    create_title_search,
     initDB,
     initialize_schema,
     insert_records,
+    insert_records_bulk,
     insertRow,
+    invalidate_schema_cache,
+    replace_table_rows,
+    save_film_articles,
+    sync_records,
+    upsert_insert,
 )
-from database.schema import AcademyAwardWinningFilms, TestTable
-from scripts.wikipedia_uuid import main, scrape_oscar_winning_films
+from database.pragmas import apply_sqlite_profile
+from database.queries import (
+    films_by_year,
+    load_films_dataframe,
+    search_title,
+    top_by_awards,
+)
+from database.schema import AcademyAwardWinningFilms, FilmArticle, TestTable
+from scripts.wikipedia_uuid import (
+    iter_film_rows,
+    main,
+    parse_args,
+    run_sources,
+    scrape_oscar_winning_films,
+    stream_oscar_winning_films,
+)
+from sqlalchemy import create_engine
+from sqlalchemy.dialects import postgresql
 from sqlalchemy.exc import SQLAlchemyError
-from wiki import BeautifulSoup, fetchPage
-from wiki.export_functions import exportToCsv, exportToJson
-from wiki.utils import clean_numeric, create_data_folder, uuid_to_str
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.schema import CreateIndex, CreateTable
+from wiki import (
+    BeautifulSoup,
+    ResponseCache,
+    SnapshotStore,
+    configure_session,
+    configure_snapshots,
+    fetchPage,
+)
+from wiki.crawler import HostRateLimiter, crawl_film_articles, parse_film_article
+from wiki.export_functions import (
+    CsvExportWriter,
+    JsonExportWriter,
+    exportToCsv,
+    exportToFeather,
+    exportToJson,
+    exportToParquet,
+)
+from wiki.http import get_timeout
+from wiki.metrics import MetricsRecorder, Span, configure_metrics, get_recorder, timed
+from wiki.parsing import (
+    PARSER_BACKENDS,
+    iter_wikitable_rows,
+    parse_pages,
+    parse_wikitable_rows,
+)
+from wiki.pipeline import Pipeline, Stage, StopPipeline
+from wiki.records import FilmBatch, FilmRecord
+from wiki.sources import (
+    HIGHEST_GROSSING_FILMS,
+    OSCAR_WINNING_FILMS,
+    SOURCES,
+    ScrapeSource,
+    parse_film_batch,
+    parse_source_page,
+    register_source,
+    scrape_sources,
+)
+from wiki.utils import (
+    atomic_output,
+    batched,
+    clean_numeric,
+    clean_numeric_column,
+    create_data_folder,
+    fan_out,
+    make_film_id,
+    normalize_title,
+    uuid_to_str,
+    write_digest,
+)
 
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
+SAMPLE_PAGE = b"""<html><body><table class="wikitable sortable"><tbody>
+<tr><th>Film</th><th>Year</th><th>Awards</th><th>Nominations</th></tr>
+<tr><td><i><a href="/wiki/Film_1">Film 1</a></i></td><td>2021</td><td>1</td><td>3</td></tr>
+<tr><td><i><a href="/wiki/Film_2">Film 2</a></i></td><td>2022</td><td>2</td><td>5</td></tr>
+</tbody></table></body></html>"""
+
+BOX_OFFICE_PAGE = b"""<html><body><table class="wikitable"><tbody>
+<tr><th>Film</th></tr><tr><td>Not this table</td></tr></tbody></table>
+<table class="wikitable boxoffice"><tbody>
+<tr><th>Rank</th><th>Film</th><th>Gross</th></tr>
+<tr><td>1</td><td>Avatar</td><td>$2,923,706,026[a]</td></tr>
+</tbody></table></body></html>"""
+
+HIGHEST_GROSSING_PAGE = b"""<html><body>
+<table class="wikitable sortable plainrowheaders"><tbody>
+<tr><th scope="col">Rank</th><th scope="col">Peak</th><th scope="col">Title</th>
+<th scope="col">Worldwide gross</th><th scope="col">Year</th><th scope="col">Ref.</th></tr>
+<tr><td>1</td><td>1</td><th scope="row"><i><a href="/wiki/Avatar_(2009_film)">Avatar</a></i></th>
+<td>$2,923,706,026</td><td>2009</td><td><sup>[1]</sup></td></tr>
+<tr><td>2</td><td>1</td><th scope="row"><i><a href="/wiki/Titanic">Titanic</a></i></th>
+<td>$2,257,844,554</td><td>1997</td><td><sup>[2]</sup></td></tr>
+</tbody></table></body></html>"""
+
+SAMPLE_ARTICLE = b"""<html><body><table class="infobox vevent"><tbody>
+<tr><th colspan="2">Film 1</th></tr>
+<tr><th>Directed by</th><td><a href="/wiki/Jane_Doe">Jane Doe</a></td></tr>
+<tr><th>Running time</th><td>128 minutes<sup>[1]</sup></td></tr>
+<tr><th>Countries</th><td><ul><li>United States</li><li>France</li></ul></td></tr>
+<tr><th>Language</th><td>English</td></tr>
+</tbody></table></body></html>"""
+
+
+class StubPageHandler(BaseHTTPRequestHandler):
+    """Serves SAMPLE_PAGE with an ETag and honours If-None-Match."""
+
+    etag = '"v1"'
+
+    def do_GET(self):
+        if self.headers.get("If-None-Match") == self.etag:
+            self.send_response(304)
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header("ETag", self.etag)
+        self.send_header("Content-Length", str(len(SAMPLE_PAGE)))
+        self.end_headers()
+        self.wfile.write(SAMPLE_PAGE)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class FlakyPageHandler(StubPageHandler):
+    """Answers the first request with 503 and a Retry-After header."""
+
+    requests_seen = 0
+
+    def do_GET(self):
+        FlakyPageHandler.requests_seen += 1
+        if FlakyPageHandler.requests_seen == 1:
+            self.send_response(503)
+            self.send_header("Retry-After", "0")
+            self.end_headers()
+            return
+        super().do_GET()
+
+
+_temp_database = {}
+
+
+def setUpModule():
+    # Code reaching get_engine() gets a throwaway database, never data/wiki_films.db
+    tmp_dir = tempfile.TemporaryDirectory()
+    _temp_database.update(
+        tmp_dir=tmp_dir,
+        url=os.environ.get(DATABASE_URL_ENV_VAR),
+        engine=database._engine,
+        bind=database.Session.kw.get("bind"),
+    )
+    os.environ[DATABASE_URL_ENV_VAR] = (
+        f"sqlite:///{os.path.join(tmp_dir.name, 'wiki_films.db')}"
+    )
+    database._engine = None
+    database.Session.kw["bind"] = None
+    invalidate_schema_cache()
+
+
+def tearDownModule():
+    if database._engine is not None:
+        database._engine.dispose()
+    if _temp_database["url"] is None:
+        os.environ.pop(DATABASE_URL_ENV_VAR, None)
+    else:
+        os.environ[DATABASE_URL_ENV_VAR] = _temp_database["url"]
+    database._engine = _temp_database["engine"]
+    database.Session.kw["bind"] = _temp_database["bind"]
+    invalidate_schema_cache()
+    _temp_database.pop("tmp_dir").cleanup()
+
 
 class WikiFilmDataTestResult(unittest.TextTestResult):
     def __init__(self, stream, descriptions, verbosity):
@@ -48,7 +229,7 @@ class WikiFilmDataTestResult(unittest.TextTestResult):
 
 
 class TestWikiFunctions(unittest.TestCase):
-    @patch("requests.get")
+    @patch("requests.Session.get")
     def test_fetchPage(self, mock_get):
         mock_response = MagicMock()
         mock_response.status_code = 200
@@ -56,16 +237,376 @@ class TestWikiFunctions(unittest.TestCase):
         response = fetchPage("https://google.com")
         self.assertEqual(response.status_code, 200)
 
-    @patch("requests.get")
+    @patch("requests.Session.get")
     def test_fetchPage_exception(self, mock_get):
         mock_get.side_effect = Exception("Network error")
         with self.assertRaises(Exception):
             fetchPage("https://google.com")
 
 
+class TestHttpSession(unittest.TestCase):
+    def tearDown(self):
+        configure_session()
+
+    def test_configure_session(self):
+        session = configure_session(pool_size=4, retries=2, timeout=(1, 2))
+        adapter = session.get_adapter("https://en.wikipedia.org")
+        self.assertEqual(adapter._pool_maxsize, 4)
+        self.assertEqual(adapter.max_retries.total, 2)
+        self.assertIn(429, adapter.max_retries.status_forcelist)
+        self.assertTrue(adapter.max_retries.respect_retry_after_header)
+        self.assertEqual(get_timeout(), (1, 2))
+
+    def test_fetchPage_retries_server_errors(self):
+        FlakyPageHandler.requests_seen = 0
+        server = HTTPServer(("127.0.0.1", 0), FlakyPageHandler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        try:
+            configure_session(backoff_factor=0)
+            response = fetchPage(f"http://127.0.0.1:{server.server_port}/wiki/List")
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(FlakyPageHandler.requests_seen, 2)
+        finally:
+            server.shutdown()
+            server.server_close()
+
+
+class TestResponseCache(unittest.TestCase):
+    def setUp(self):
+        self.server = HTTPServer(("127.0.0.1", 0), StubPageHandler)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.url = f"http://127.0.0.1:{self.server.server_port}/wiki/List"
+        self.cache_dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        self.cache_dir.cleanup()
+
+    def test_fetchPage_conditional_cache(self):
+        cache = ResponseCache(self.cache_dir.name)
+        first = fetchPage(self.url, cache=cache)
+        self.assertEqual(first.status_code, 200)
+        self.assertEqual(cache.conditional_headers(self.url), {"If-None-Match": '"v1"'})
+
+        second = fetchPage(self.url, cache=cache)
+        self.assertEqual(second.status_code, 304)
+        self.assertEqual(second.content, SAMPLE_PAGE)
+
+        cache.invalidate(self.url)
+        self.assertIsNone(cache.get(self.url))
+        self.assertEqual(fetchPage(self.url, cache=cache).status_code, 200)
+
+    def test_fetchPage_not_modified_without_cached_copy(self):
+        cache = ResponseCache(self.cache_dir.name)
+        # The entry disappears between building the headers and the 304 reply
+        with patch.object(
+            cache, "conditional_headers", return_value={"If-None-Match": '"v1"'}
+        ):
+            response = fetchPage(self.url, cache=cache)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.content, SAMPLE_PAGE)
+        self.assertEqual(cache.get(self.url)["content"], SAMPLE_PAGE)
+
+
+class TestSnapshots(unittest.TestCase):
+    def setUp(self):
+        self.server = HTTPServer(("127.0.0.1", 0), StubPageHandler)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.url = f"http://127.0.0.1:{self.server.server_port}/wiki/List"
+        self.snapshot_dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        configure_snapshots()
+        self.server.shutdown()
+        self.server.server_close()
+        self.snapshot_dir.cleanup()
+
+    def test_record_and_replay(self):
+        store = SnapshotStore(self.snapshot_dir.name)
+        configure_snapshots(store, "record")
+        fetchPage(self.url)
+        fetchPage(self.url + "?copy")
+        self.assertIn(self.url, store)
+        self.assertEqual(store.load(self.url), SAMPLE_PAGE)
+        # Identical bodies are stored once
+        objects = os.listdir(os.path.join(self.snapshot_dir.name, "objects"))
+        self.assertEqual(len(objects), 1)
+
+        configure_snapshots(store, "replay")
+        with patch("wiki.http.get_session", side_effect=AssertionError):
+            response = fetchPage(self.url)
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response.content, SAMPLE_PAGE)
+            with self.assertRaises(Exception):
+                fetchPage(self.url + "?missing")
+
+    def test_configure_snapshots_invalid(self):
+        with self.assertRaises(ValueError):
+            configure_snapshots(SnapshotStore(self.snapshot_dir.name), "rewind")
+        with self.assertRaises(ValueError):
+            configure_snapshots(None, "replay")
+
+
+class TestMetrics(unittest.TestCase):
+    def tearDown(self):
+        configure_metrics()
+
+    def test_metrics_recorder(self):
+        with tempfile.TemporaryDirectory() as metrics_dir:
+            jsonl_path = os.path.join(metrics_dir, "metrics.jsonl")
+            prom_path = os.path.join(metrics_dir, "wiki.prom")
+            recorder = MetricsRecorder(jsonl_path, prom_path)
+            with self.assertRaises(RuntimeError):
+                with recorder.run():
+                    with recorder.span("parse") as stage:
+                        rows = list(stage.count(iter(["a", "b"])))
+                        stage.add(bytes_fetched=10)
+                    with recorder.span("load"):
+                        raise RuntimeError("database is locked")
+
+            with open(jsonl_path) as f:
+                entries = [json.loads(line) for line in f]
+            with open(prom_path) as f:
+                prometheus = f.read()
+
+            # A reused recorder only reports the current run
+            first_run_id = recorder.run_id
+            with recorder.run():
+                with recorder.span("load"):
+                    pass
+        self.assertNotEqual(recorder.run_id, first_run_id)
+        self.assertEqual(list(recorder.summary()), ["load", "run"])
+        self.assertEqual(recorder.summary()["load"]["success"], 1)
+        self.assertEqual(rows, ["a", "b"])
+        self.assertEqual([e["stage"] for e in entries], ["parse", "load", "run"])
+        self.assertEqual([e["status"] for e in entries], ["ok", "error", "error"])
+        self.assertEqual(entries[0]["rows_parsed"], 2)
+        self.assertEqual(entries[0]["bytes_fetched"], 10)
+        self.assertEqual({e["run_id"] for e in entries}, {first_run_id})
+        self.assertIn('wiki_stage_rows_parsed{stage="parse"} 2', prometheus)
+        self.assertIn('wiki_stage_success{stage="load"} 0', prometheus)
+        self.assertIn("wiki_stage_process_peak_rss_bytes", prometheus)
+        with self.assertRaises(ValueError):
+            Span("parse").add(rows_read=1)
+
+    def test_timed(self):
+        recorder = configure_metrics()
+
+        @timed("double")
+        def double(value):
+            return value * 2
+
+        self.assertEqual(double(2), 4)
+        self.assertIs(get_recorder(), recorder)
+        self.assertEqual(recorder.summary()["double"]["success"], 1)
+
+
+class TestPipeline(unittest.TestCase):
+    def test_pipeline_runs_independent_stages_concurrently(self):
+        # Each export waits for the other, so they only finish if run together
+        barrier = threading.Barrier(2, timeout=5)
+
+        def export(rows):
+            barrier.wait()
+            return len(rows)
+
+        pipeline = Pipeline(
+            [
+                Stage("scrape", lambda: [1, 2, 3]),
+                Stage("export_csv", export, requires=("scrape",)),
+                Stage("export_json", export, requires=("scrape",)),
+                Stage("report", lambda a, b: a + b, ("export_csv", "export_json")),
+            ]
+        )
+        outputs = pipeline.run()
+        self.assertEqual(outputs["report"], 6)
+        self.assertFalse(pipeline.stopped)
+
+    def test_pipeline_resumes_from_checkpoints(self):
+        calls = []
+
+        def stage(name, fail=False):
+            def run(*inputs):
+                calls.append(name)
+                if fail:
+                    raise RuntimeError(f"{name} failed")
+                return name
+
+            return run
+
+        with tempfile.TemporaryDirectory() as checkpoint_dir:
+            failing = Pipeline(
+                [
+                    Stage("fetch", stage("fetch")),
+                    Stage("load", stage("load", fail=True), requires=("fetch",)),
+                ],
+                checkpoint_dir,
+                key="v1",
+            )
+            with self.assertRaises(RuntimeError):
+                failing.run()
+
+            stages = [
+                Stage("fetch", stage("fetch")),
+                Stage("load", stage("load"), requires=("fetch",)),
+            ]
+            outputs = Pipeline(stages, checkpoint_dir, key="v1").run()
+            self.assertEqual(outputs, {"fetch": "fetch", "load": "load"})
+            self.assertEqual(calls, ["fetch", "load", "load"])
+            # A complete run leaves nothing to resume
+            self.assertEqual(os.listdir(checkpoint_dir), [])
+
+            with self.assertRaises(RuntimeError):
+                failing.run()
+            Pipeline(stages, checkpoint_dir, key="v2").run()
+            self.assertEqual(calls[-2:], ["fetch", "load"])
+
+    def test_pipeline_stop_and_validation(self):
+        def unchanged():
+            raise StopPipeline("page unchanged")
+
+        load = MagicMock()
+        pipeline = Pipeline(
+            [Stage("scrape", unchanged), Stage("load", load, ("scrape",))]
+        )
+        pipeline.run()
+        self.assertTrue(pipeline.stopped)
+        load.assert_not_called()
+
+        with self.assertRaises(ValueError):
+            Pipeline([Stage("a", load, ("b",)), Stage("b", load, ("a",))])
+        with self.assertRaises(ValueError):
+            Pipeline([Stage("a", load, ("missing",))])
+
+
+class TestParsing(unittest.TestCase):
+    def test_parse_wikitable_rows(self):
+        page = SAMPLE_PAGE.replace(
+            b"<td>2022</td>", b"<td>2022<sup>[a]</sup></td>"
+        ).replace(b"</tbody>", b"<tr><td>Short row</td></tr></tbody>")
+        for backend in PARSER_BACKENDS:
+            if backend == "lxml":
+                try:
+                    import lxml  # noqa: F401
+                except ImportError:
+                    continue
+            with self.subTest(backend=backend):
+                self.assertEqual(
+                    parse_wikitable_rows(page, backend=backend),
+                    [
+                        (["Film 1", "2021", "1", "3"], "/wiki/Film_1"),
+                        (["Film 2", "2022[a]", "2", "5"], "/wiki/Film_2"),
+                        (["Short row"], None),
+                    ],
+                )
+                with self.assertRaises(Exception):
+                    parse_wikitable_rows(b"<html><body></body></html>", backend=backend)
+
+    def test_parse_wikitable_rows_row_headers(self):
+        for backend in PARSER_BACKENDS:
+            if backend == "lxml":
+                try:
+                    import lxml  # noqa: F401
+                except ImportError:
+                    continue
+            with self.subTest(backend=backend):
+                self.assertEqual(
+                    parse_wikitable_rows(HIGHEST_GROSSING_PAGE, backend=backend),
+                    [
+                        (["1", "1", "Avatar", "$2,923,706,026", "2009", "[1]"], None),
+                        (["2", "1", "Titanic", "$2,257,844,554", "1997", "[2]"], None),
+                    ],
+                )
+
+    def test_iter_wikitable_rows_stops_after_table(self):
+        pieces = [SAMPLE_PAGE[i : i + 7] for i in range(0, len(SAMPLE_PAGE), 7)]
+        consumed = []
+
+        def chunks():
+            for piece in pieces:
+                consumed.append(piece)
+                yield piece
+
+        rows = iter_wikitable_rows(chunks())
+        self.assertEqual(next(rows), (["Film 1", "2021", "1", "3"], "/wiki/Film_1"))
+        self.assertEqual(list(rows), [(["Film 2", "2022", "2", "5"], "/wiki/Film_2")])
+        self.assertLess(len(consumed), len(pieces))
+
+    def test_parse_wikitable_rows_unknown_backend(self):
+        with self.assertRaises(ValueError):
+            parse_wikitable_rows(SAMPLE_PAGE, backend="regex")
+
+
+class TestCrawler(unittest.TestCase):
+    def test_parse_pages(self):
+        pages = [SAMPLE_PAGE, b"<html></html>", BOX_OFFICE_PAGE]
+        table_class = ["wikitable", "wikitable", "boxoffice"]
+        parsed = parse_pages(
+            pages, workers=2, table_class=table_class, return_exceptions=True
+        )
+        self.assertEqual(
+            parsed[0],
+            [
+                (("Film 1", "2021", "1", "3"), "/wiki/Film_1"),
+                (("Film 2", "2022", "2", "5"), "/wiki/Film_2"),
+            ],
+        )
+        self.assertIsInstance(parsed[1], Exception)
+        self.assertEqual(parsed[2], [(("1", "Avatar", "$2,923,706,026[a]"), None)])
+        self.assertEqual(parse_pages([SAMPLE_PAGE], workers=1), parsed[:1])
+        with self.assertRaises(Exception):
+            parse_pages(pages, workers=2)
+
+    def test_parse_film_article(self):
+        self.assertEqual(
+            parse_film_article(SAMPLE_ARTICLE),
+            {
+                "directed_by": "Jane Doe",
+                "running_time": 128,
+                "country": "United States, France",
+                "language": "English",
+            },
+        )
+        self.assertIsNone(parse_film_article(b"<html></html>")["directed_by"])
+
+    @patch("wiki.crawler.time.sleep")
+    def test_host_rate_limiter(self, mock_sleep):
+        limiter = HostRateLimiter(requests_per_second=2)
+        limiter.wait("https://en.wikipedia.org/wiki/A")
+        limiter.wait("https://other.org/wiki/B")
+        mock_sleep.assert_not_called()
+        limiter.wait("https://en.wikipedia.org/wiki/C")
+        mock_sleep.assert_called_once()
+        self.assertTrue(0 < mock_sleep.call_args[0][0] <= 0.5)
+
+        with self.assertRaises(ValueError):
+            HostRateLimiter(requests_per_second=0)
+        self.assertEqual(parse_args([]).crawl_rate, 12.0)
+        self.assertEqual(parse_args(["--crawl", "--crawl-rate", "0.2"]).crawl_rate, 0.2)
+
+    @patch("wiki.crawler.fetchPage")
+    def test_crawl_film_articles(self, mock_fetchPage):
+        def fake_fetch(url):
+            if url.endswith("Broken"):
+                return MagicMock(status_code=404)
+            return MagicMock(status_code=200, content=SAMPLE_ARTICLE)
+
+        mock_fetchPage.side_effect = fake_fetch
+        links = {
+            "id1": "https://en.wikipedia.org/wiki/Film_1",
+            "id2": "https://en.wikipedia.org/wiki/Broken",
+            "id3": None,
+        }
+        articles = crawl_film_articles(links, max_workers=2, requests_per_second=1000)
+        self.assertEqual(len(articles), 1)
+        self.assertEqual(articles[0]["film_id"], "id1")
+        self.assertEqual(articles[0]["running_time"], 128)
+        self.assertEqual(mock_fetchPage.call_count, 2)
+
+
 class TestExportFunctions(unittest.TestCase):
-    @patch("pandas.DataFrame.to_csv")
-    def test_exportToCsv(self, mock_to_csv):
+    def test_exportToCsv(self):
         data = {
             "id": ["test-id"],
             "name": ["Test Movie"],
@@ -74,24 +615,322 @@ class TestExportFunctions(unittest.TestCase):
             "nominations": [3],
         }
         df = pd.DataFrame(data)
-        exportToCsv(df, "test.csv")
-        mock_to_csv.assert_called_once_with("test.csv", index=False)
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            filename = os.path.join(tmp_dir, "test.csv")
+            self.assertTrue(exportToCsv(df, filename))
+            pd.testing.assert_frame_equal(pd.read_csv(filename), df)
+            self.assertTrue(os.path.exists(filename + ".sha256"))
+
+            # An unchanged dataset leaves the file alone, a changed one replaces it
+            mtime = os.stat(filename).st_mtime_ns
+            with patch("pandas.DataFrame.to_csv") as mock_to_csv:
+                self.assertFalse(exportToCsv(df, filename))
+            mock_to_csv.assert_not_called()
+            self.assertEqual(os.stat(filename).st_mtime_ns, mtime)
+            df.loc[0, "awards"] = 2
+            self.assertTrue(exportToCsv(df, filename))
+            self.assertEqual(pd.read_csv(filename)["awards"].tolist(), [2])
+            self.assertEqual(
+                sorted(os.listdir(tmp_dir)), ["test.csv", "test.csv.sha256"]
+            )
 
-    @patch("json.dump")
-    def test_exportToJson(self, mock_json_dump):
+    def test_exportToJson(self):
+        film_id = uuid.uuid4()
         data = {
-            "id": ["test-id"],
-            "name": ["Test Movie"],
-            "year": [2023],
-            "awards": [1],
-            "nominations": [3],
+            "id": [film_id, "test-id"],
+            "name": ["Test Movie", "Other Movie"],
+            "year": [2023, 2024],
+            "awards": [1, 2],
+            "nominations": [3, 4],
         }
         df = pd.DataFrame(data)
-        exportToJson(df, "test.json")
-        mock_json_dump.assert_called_once()
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            filename = os.path.join(tmp_dir, "test.json")
+            exportToJson(df, filename, batch_size=1)
+            records = [
+                dict(zip(data, [str(film_id), "Test Movie", 2023, 1, 3])),
+                dict(zip(data, ["test-id", "Other Movie", 2024, 2, 4])),
+            ]
+            with open(filename) as f:
+                self.assertEqual(f.read(), json.dumps(records, indent=2))
+
+    def test_exportToJson_compact_and_ndjson(self):
+        df = pd.DataFrame({"id": [uuid.uuid4(), uuid.uuid4()], "year": [2023, 2024]})
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            filename = os.path.join(tmp_dir, "test.json")
+
+            exportToJson(df, filename, compact=True)
+            with open(filename) as f:
+                content = f.read()
+            lines = content.splitlines()
+            self.assertEqual((lines[0], lines[-1]), ("[", "]"))
+            self.assertEqual(lines[1], f'{{"id":"{df["id"][0]}","year":2023}},')
+            self.assertEqual(json.loads(content)[1]["year"], 2024)
+
+            exportToJson(df, filename, ndjson=True)
+            with open(filename) as f:
+                lines = f.read().splitlines()
+            self.assertEqual(
+                [json.loads(line)["id"] for line in lines], [str(v) for v in df["id"]]
+            )
+
+
+class TestColumnarExports(unittest.TestCase):
+    def setUp(self):
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError:
+            self.skipTest("pyarrow is not installed")
+        self.tmp_dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_columnar_exports(self):
+        df = pd.DataFrame(
+            [
+                (uuid.uuid4(), "Film 1", "1927/28", 1, None),
+                ("id2", "Film 2", 2022, 2, 5),
+            ],
+            columns=["id", "film", "year", "awards", "nominations"],
+        )
+        for export, read in [
+            (exportToParquet, pd.read_parquet),
+            (exportToFeather, pd.read_feather),
+        ]:
+            with self.subTest(export=export.__name__):
+                filename = os.path.join(self.tmp_dir.name, export.__name__)
+                export(df, filename)
+                result = read(filename)
+                self.assertEqual(result["id"].tolist(), [str(df["id"][0]), "id2"])
+                self.assertEqual(str(result["year"].dtype), "Int64")
+                self.assertEqual(result["year"].isna().tolist(), [True, False])
+                self.assertEqual(str(result["nominations"].dtype), "Int64")
+                self.assertEqual(result["nominations"][1], 5)
+
+    def test_exportToParquet_row_groups(self):
+        import pyarrow.parquet as pq
+
+        df = pd.DataFrame({"id": ["a", "b", "c"], "year": [2001, 2002, 2003]})
+        filename = os.path.join(self.tmp_dir.name, "films.parquet")
+        exportToParquet(df, filename, compression="zstd", row_group_size=2)
+        metadata = pq.ParquetFile(filename).metadata
+        self.assertEqual(metadata.num_row_groups, 2)
+        self.assertEqual(metadata.row_group(0).column(0).compression, "ZSTD")
+
+
+class TestExportWriters(unittest.TestCase):
+    def test_export_writers(self):
+        rows = [("id1", "Film 1", 2021, 1, 3), ("id2", "Film, 2", None, 2, 5)]
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            csv_path = os.path.join(tmp_dir, "out.csv")
+            json_path = os.path.join(tmp_dir, "out.json")
+            with CsvExportWriter(csv_path) as csv_writer:
+                with JsonExportWriter(json_path) as json_writer:
+                    for batch in batched(rows, 1):
+                        csv_writer.write_batch(batch)
+                        json_writer.write_batch(batch)
+
+            self.assertEqual(
+                pd.read_csv(csv_path)["film"].tolist(), ["Film 1", "Film, 2"]
+            )
+            columns = ["id", "film", "year", "awards", "nominations"]
+            expected = json.dumps([dict(zip(columns, row)) for row in rows], indent=2)
+            with open(json_path) as f:
+                self.assertEqual(f.read(), expected)
+
+            with JsonExportWriter(json_path):
+                pass
+            with open(json_path) as f:
+                self.assertEqual(json.load(f), [])
+
+    def test_export_writers_atomic(self):
+        rows = [("id1", "Film 1", 2021, 1, 3)]
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            csv_path = os.path.join(tmp_dir, "out.csv")
+            with patch("wiki.utils.os.fsync", wraps=os.fsync) as mock_fsync:
+                with CsvExportWriter(csv_path) as writer:
+                    writer.write_batch(rows)
+            self.assertFalse(writer.skipped)
+            # The export, its sidecar and their directory are synced
+            self.assertEqual(mock_fsync.call_count, 4 if os.name == "posix" else 2)
+            with open(csv_path) as f:
+                content = f.read()
+
+            # A failed export keeps the previous file and leaves no temporary file
+            with self.assertRaises(RuntimeError):
+                with CsvExportWriter(csv_path) as writer:
+                    writer.write_batch([("id2", "Film 2", 2022, 2, 5)])
+                    raise RuntimeError("scrape failed")
+            with open(csv_path) as f:
+                self.assertEqual(f.read(), content)
+            self.assertEqual(sorted(os.listdir(tmp_dir)), ["out.csv", "out.csv.sha256"])
+
+            with CsvExportWriter(csv_path) as writer:
+                writer.write_batch(rows)
+            self.assertTrue(writer.skipped)
+
+
+class TestScrapeSources(unittest.TestCase):
+    @patch("wiki.sources.fetchPage")
+    def test_scrape_sources(self, mock_fetchPage):
+        box_office = ScrapeSource(
+            "box_office",
+            "https://en.wikipedia.org/wiki/List_of_highest-grossing_films",
+            columns={"film": 1, "gross": 2},
+            numeric_columns=("gross",),
+            target_table="box_office",
+            table_class="boxoffice",
+        )
+        broken = ScrapeSource("broken", "https://example.org/broken", {"film": 0})
+        pages = {OSCAR_WINNING_FILMS.url: SAMPLE_PAGE, box_office.url: BOX_OFFICE_PAGE}
+        mock_fetchPage.side_effect = lambda url, cache=None: MagicMock(
+            status_code=200, content=pages.get(url, b"<html></html>")
+        )
+
+        results = scrape_sources(
+            [OSCAR_WINNING_FILMS, box_office, broken], id_strategy="uuid5"
+        )
+        self.assertEqual(set(results), {"oscar_winning_films", "box_office"})
+        self.assertEqual(results["oscar_winning_films"][0][1:], ("Film 1", 2021, 1, 3))
+        self.assertEqual(
+            results["box_office"],
+            [(make_film_id("Avatar", None, "uuid5"), "Avatar", 2923706026)],
+        )
+        self.assertEqual(box_office.record_columns, ["id", "film", "gross"])
+
+        with self.assertRaises(ValueError):
+            register_source(
+                ScrapeSource("oscar_winning_films", "https://example.org", {})
+            )
+
+    def test_highest_grossing_films_source(self):
+        self.assertIs(SOURCES["highest_grossing_films"], HIGHEST_GROSSING_FILMS)
+        records = parse_source_page(
+            HIGHEST_GROSSING_FILMS, HIGHEST_GROSSING_PAGE, "uuid5"
+        )
+        self.assertEqual(
+            records,
+            [
+                (make_film_id("Avatar", 2009, "uuid5"), "Avatar", 2009, 2923706026),
+                (make_film_id("Titanic", 1997, "uuid5"), "Titanic", 1997, 2257844554),
+            ],
+        )
+        self.assertEqual(HIGHEST_GROSSING_FILMS.target_table, "highest_grossing_films")
+
+    def test_replace_table_rows(self):
+        test_engine = create_engine("sqlite://")
+        with test_engine.begin() as connection:
+            connection.exec_driver_sql("CREATE TABLE box_office (id, film, gross)")
+        records = [("id1", "Avatar", 2923706026)]
+        columns = ["id", "film", "gross"]
+        with patch("database.operations.Session", sessionmaker(bind=test_engine)):
+            self.assertEqual(replace_table_rows("box_office", columns, records), 1)
+            self.assertEqual(replace_table_rows("box_office", columns, records), 1)
+            with self.assertRaises(SQLAlchemyError):
+                replace_table_rows("missing", ["id"], records)
+        with test_engine.connect() as connection:
+            rows = connection.exec_driver_sql("SELECT * FROM box_office").fetchall()
+        self.assertEqual(rows, records)
+
+
+class TestFilmRecords(unittest.TestCase):
+    def test_film_batch(self):
+        records = [
+            FilmRecord("id1", "Film 1", 2021, 1, 3),
+            ("id2", "Film 2", None, 2, None),
+        ]
+        batch = FilmBatch.from_records(records)
+        self.assertEqual(len(batch), 2)
+        self.assertEqual(batch, records)
+        self.assertEqual(batch[1], FilmRecord("id2", "Film 2", awards=2))
+        self.assertIs(FilmBatch.from_records(batch), batch)
+        self.assertEqual(pickle.loads(pickle.dumps(batch)), batch)
+
+        params = batch.to_params()
+        self.assertEqual(
+            params[1],
+            {
+                "id": "id2",
+                "film": "Film 2",
+                "year": None,
+                "awards": 2,
+                "nominations": None,
+            },
+        )
+        self.assertEqual(list(batch.iter_params(chunk_size=1)), params)
+
+        df = batch.to_dataframe()
+        self.assertEqual(list(df.columns), list(FilmRecord._fields))
+        self.assertEqual(df["awards"].dtype, "int64")
+        self.assertEqual(df["year"].dtype, "Int64")
+        self.assertEqual(df["year"].isna().tolist(), [False, True])
+        self.assertTrue(
+            np.shares_memory(df["awards"].to_numpy(), batch.values["awards"])
+        )
+        # Neither the int64 nor the Int64 columns are copies of the batch arrays
+        batch.values["awards"][0] = 4
+        batch.values["year"][0] = 2020
+        self.assertEqual(df["awards"].tolist(), [4, 2])
+        self.assertEqual(df["year"].tolist(), [2020, pd.NA])
+        batch.values["awards"][0] = 1
+        batch.values["year"][0] = 2021
+
+        self.assertEqual(batch[1:], records[1:])
+        self.assertEqual(batch[::-1], records[::-1])
+        self.assertIsInstance(batch[:1], FilmBatch)
+        with self.assertRaises(TypeError):
+            batch["id1"]
+        with self.assertRaises(TypeError):
+            hash(batch)
+
+        joined = FilmBatch.concat([batch, batch])
+        self.assertEqual(len(joined), 4)
+        self.assertEqual(joined[3], batch[1])
+
+        with self.assertRaises(ValueError):
+            FilmBatch(["id1"], [], batch.values, batch.masks)
+
+    def test_parse_film_batch(self):
+        batch = parse_film_batch(SAMPLE_PAGE, id_strategy="uuid5")
+        self.assertEqual(batch[0][1:], ("Film 1", 2021, 1, 3))
+        self.assertEqual(batch.column("film"), ["Film 1", "Film 2"])
+
+        with self.assertRaises(Exception):
+            parse_film_batch(b"<html><body></body></html>")
 
 
 class TestUtils(unittest.TestCase):
+    def test_atomic_output(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            filename = os.path.join(tmp_dir, "films.csv")
+            with open(filename, "w") as f:
+                f.write("old\n")
+            with patch("wiki.utils.os.fsync", wraps=os.fsync) as mock_fsync:
+                with atomic_output(filename) as tmp_name:
+                    with open(tmp_name, "w") as f:
+                        f.write("new\n")
+                    with open(filename) as f:
+                        self.assertEqual(f.read(), "old\n")
+                write_digest(filename, "abc")
+            with open(filename) as f:
+                self.assertEqual(f.read(), "new\n")
+            with open(filename + ".sha256") as f:
+                self.assertEqual(f.read(), "abc\n")
+            # Each file and its directory are synced
+            self.assertEqual(mock_fsync.call_count, 4 if os.name == "posix" else 2)
+
+            with self.assertRaises(RuntimeError):
+                with atomic_output(filename) as tmp_name:
+                    with open(tmp_name, "w") as f:
+                        f.write("partial")
+                    raise RuntimeError("writer failed")
+            with open(filename) as f:
+                self.assertEqual(f.read(), "new\n")
+            self.assertEqual(
+                sorted(os.listdir(tmp_dir)), ["films.csv", "films.csv.sha256"]
+            )
+
     def test_uuid_to_str(self):
         test_uuid = uuid.uuid4()
         self.assertEqual(uuid_to_str(test_uuid), str(test_uuid))
@@ -103,15 +942,105 @@ class TestUtils(unittest.TestCase):
         self.assertEqual(clean_numeric("abc"), "abc")
         self.assertEqual(clean_numeric(456), 456)
 
+    def test_clean_numeric_column(self):
+        cells = ["11 (1)", "1927/28", "3[a]", "1,234", "12.7", "abc", "", None, 5]
+        cleaned, unparsed = clean_numeric_column(pd.Series(cells))
+        self.assertEqual(str(cleaned.dtype), "Int64")
+        self.assertEqual(cleaned[:5].tolist(), [11, 1927, 3, 1234, 12])
+        self.assertTrue(cleaned[5:8].isna().all())
+        self.assertEqual(cleaned[8], 5)
+        self.assertEqual(unparsed.tolist(), ["abc"])
+
+    def test_iter_film_rows(self):
+        rows = [
+            (["Wings", "1927/28", "2", "2[a]"], "/wiki/Wings"),
+            (["Short row"], None),
+            (["Film 2", "2022", "n/a", "5"], None),
+        ]
+        movies = list(iter_film_rows(rows, include_links=True, batch_size=2))
+        self.assertEqual(
+            [movie[1:] for movie in movies],
+            [
+                ("Wings", 1927, 2, 2, "https://en.wikipedia.org/wiki/Wings"),
+                ("Film 2", 2022, None, 5, None),
+            ],
+        )
+
+    def test_batched(self):
+        self.assertEqual(list(batched(range(5), 2)), [[0, 1], [2, 3], [4]])
+        self.assertEqual(list(batched([], 2)), [])
+
+    def test_fan_out(self):
+        seen = []
+        rows = fan_out(iter(range(5)), [seen.append], batch_size=2)
+        self.assertEqual(next(rows), 0)
+        self.assertEqual(seen, [[0, 1]])
+        self.assertEqual(list(rows), [1, 2, 3, 4])
+        self.assertEqual(seen, [[0, 1], [2, 3], [4]])
+
+    def test_normalize_title(self):
+        self.assertEqual(
+            normalize_title("  The  Godfather\u00a0Part II "), "the godfather part ii"
+        )
+
+    def test_make_film_id(self):
+        self.assertNotEqual(make_film_id("Film", 2020), make_film_id("Film", 2020))
+        stable_id = make_film_id("Film", 2020, "uuid5")
+        self.assertEqual(stable_id, make_film_id(" film ", 2020, "uuid5"))
+        self.assertEqual(uuid.UUID(stable_id).version, 5)
+        self.assertNotEqual(stable_id, make_film_id("Film", 2021, "uuid5"))
+        with self.assertRaises(ValueError):
+            make_film_id("Film", 2020, "sequence")
+
 
 class TestDatabaseOperations(unittest.TestCase):
-    @patch("sqlalchemy.inspect")
+    @patch("database.operations.inspect")
     def test_check_tables_exist(self, mock_inspect):
         mock_inspect.return_value.get_table_names.return_value = [
             "academy_award_winning_films",
             "TestTable",
         ]
+        invalidate_schema_cache()
+        self.addCleanup(invalidate_schema_cache)
+        self.assertTrue(check_tables_exist())
+
+    @patch("database.operations.inspect")
+    def test_check_tables_exist_cached(self, mock_inspect):
+        get_table_names = mock_inspect.return_value.get_table_names
+        get_table_names.return_value = []
+        invalidate_schema_cache()
+        self.assertFalse(check_tables_exist())
+        get_table_names.return_value = ["academy_award_winning_films", "TestTable"]
+        self.assertTrue(check_tables_exist())
         self.assertTrue(check_tables_exist())
+        self.assertEqual(get_table_names.call_count, 2)
+
+        get_table_names.return_value = []
+        self.assertFalse(check_tables_exist(refresh=True))
+        invalidate_schema_cache()
+
+    @patch("database.operations.check_tables_exist", return_value=True)
+    def test_batched_row_writer(self, mock_check_tables_exist):
+        test_engine = create_engine("sqlite://")
+        AcademyAwardWinningFilms.__table__.create(test_engine)
+        with patch("database.operations.Session", sessionmaker(bind=test_engine)):
+            with BatchedRowWriter(commit_every=2) as writer:
+                for i in range(3):
+                    writer.add(
+                        AcademyAwardWinningFilms(f"id{i}", f"Film {i}", 2020, 1, 2)
+                    )
+                self.assertEqual(writer.rows_written, 2)
+            self.assertEqual(writer.rows_written, 3)
+
+            with self.assertRaises(RuntimeError):
+                with BatchedRowWriter() as writer:
+                    writer.add(AcademyAwardWinningFilms("id9", "Film 9", 2020, 1, 2))
+                    raise RuntimeError("bad correction")
+        mock_check_tables_exist.assert_called()
+
+        session = sessionmaker(bind=test_engine)()
+        self.assertEqual(session.query(AcademyAwardWinningFilms).count(), 3)
+        session.close()
 
     # @patch('sqlalchemy.inspect')
     # def test_check_tables_not_exist(self, mock_inspect):
@@ -150,6 +1079,156 @@ class TestDatabaseOperations(unittest.TestCase):
         mock_session.add_all.assert_called_once_with(records)
         mock_session.commit.assert_called_once()
 
+    def test_insert_records_bulk(self):
+        test_engine = create_engine("sqlite://")
+        AcademyAwardWinningFilms.__table__.create(test_engine)
+        session = sessionmaker(bind=test_engine)()
+        records = [
+            ("id1", "Film 1", 2021, 1, 3),
+            {
+                "id": "id2",
+                "film": "Film 2",
+                "year": 2022,
+                "awards": 2,
+                "nominations": 5,
+            },
+            ("id3", "Film 3", 2023, 3, 7),
+        ]
+        with patch.object(session, "execute", wraps=session.execute) as spy:
+            self.assertEqual(insert_records_bulk(session, records, chunk_size=2), 3)
+            self.assertEqual(spy.call_count, 2)
+        rows = session.query(AcademyAwardWinningFilms).order_by("id").all()
+        self.assertEqual(
+            [(r.id, r.film, r.awards) for r in rows],
+            [("id1", "Film 1", 1), ("id2", "Film 2", 2), ("id3", "Film 3", 3)],
+        )
+        session.close()
+
+    def test_insert_records_bulk_invalid_chunk_size(self):
+        with self.assertRaises(ValueError):
+            insert_records_bulk(
+                MagicMock(), [("id1", "Film 1", 2021, 1, 3)], chunk_size=0
+            )
+
+    @patch("database.operations.initialize_schema")
+    @patch("database.operations.check_tables_exist")
+    @patch("database.operations.Session")
+    def test_initDB_bulk(
+        self, mock_Session, mock_check_tables_exist, mock_initialize_schema
+    ):
+        mock_check_tables_exist.return_value = True
+        mock_session = MagicMock()
+        mock_Session.return_value = mock_session
+
+        records = [("id1", "Film 1", 2021, 1, 3), ("id2", "Film 2", 2022, 2, 5)]
+        initDB(records, bulk=True)
+
+        mock_session.add_all.assert_not_called()
+        mock_session.execute.assert_called_once()
+        self.assertEqual(len(mock_session.execute.call_args[0][1]), 2)
+        mock_session.commit.assert_called_once()
+
+    def test_sync_records(self):
+        test_engine = create_engine("sqlite://")
+        AcademyAwardWinningFilms.__table__.create(test_engine)
+        session = sessionmaker(bind=test_engine)()
+        insert_records_bulk(
+            session,
+            [
+                ("id1", "Film 1", 2021, 1, 3),
+                ("id2", "Film 2", 2022, 2, 5),
+                ("id3", "Film 3", 2023, 3, 7),
+                ("id5", "Film 5", 2025, 0, 1),
+            ],
+        )
+
+        counts = sync_records(
+            session,
+            [
+                ("id1", "Film 1", 2021, 1, 3),
+                ("id2", "Film 2", 2022, 4, 6),
+                ("new3", "Film 3", 2023, 3, 7),
+                ("new4", "Film 4", 2024, 1, 1),
+            ],
+            chunk_size=2,
+        )
+
+        self.assertEqual(
+            counts, {"inserted": 1, "updated": 2, "deleted": 1, "unchanged": 1}
+        )
+        rows = session.query(AcademyAwardWinningFilms).order_by("film").all()
+        self.assertEqual(
+            [(r.id, r.film, r.awards, r.nominations) for r in rows],
+            [
+                ("id1", "Film 1", 1, 3),
+                ("id2", "Film 2", 4, 6),
+                ("new3", "Film 3", 3, 7),
+                ("new4", "Film 4", 1, 1),
+            ],
+        )
+        session.close()
+
+    def test_sync_records_rerun_keeps_non_string_ids(self):
+        test_engine = create_engine("sqlite://")
+        AcademyAwardWinningFilms.__table__.create(test_engine)
+        session = sessionmaker(bind=test_engine)()
+        records = [(1, "Film 1", 2021, 1, 3), (2, "Film 2", 2022, 2, 5)]
+
+        self.assertEqual(sync_records(session, records)["inserted"], 2)
+        counts = sync_records(session, records)
+
+        self.assertEqual(
+            counts, {"inserted": 0, "updated": 0, "deleted": 0, "unchanged": 2}
+        )
+        self.assertEqual(session.query(AcademyAwardWinningFilms).count(), 2)
+        session.close()
+
+    @patch("database.operations.initialize_schema")
+    @patch("database.operations.check_tables_exist")
+    @patch("database.operations.truncate_tables")
+    @patch("database.operations.sync_records")
+    @patch("database.operations.Session")
+    def test_initDB_sync(
+        self,
+        mock_Session,
+        mock_sync_records,
+        mock_truncate_tables,
+        mock_check_tables_exist,
+        mock_initialize_schema,
+    ):
+        mock_check_tables_exist.return_value = True
+        mock_session = MagicMock()
+        mock_Session.return_value = mock_session
+        mock_sync_records.return_value = {"inserted": 2}
+
+        records = [("id1", "Film 1", 2021, 1, 3), ("id2", "Film 2", 2022, 2, 5)]
+        self.assertEqual(initDB(records, sync=True), {"inserted": 2})
+
+        mock_truncate_tables.assert_not_called()
+        mock_sync_records.assert_called_once()
+        mock_session.commit.assert_called_once()
+
+    def test_save_film_articles(self):
+        test_engine = create_engine("sqlite://")
+        FilmArticle.__table__.create(test_engine)
+        articles = [
+            {
+                "film_id": "id1",
+                "url": "https://en.wikipedia.org/wiki/Film_1",
+                "directed_by": "Jane Doe",
+                "running_time": 128,
+                "country": "France",
+                "language": "English",
+            }
+        ]
+        with patch("database.operations.Session", sessionmaker(bind=test_engine)):
+            self.assertEqual(save_film_articles(articles), 1)
+            self.assertEqual(save_film_articles(articles), 1)
+        session = sessionmaker(bind=test_engine)()
+        rows = session.query(FilmArticle).all()
+        self.assertEqual([(r.film_id, r.running_time) for r in rows], [("id1", 128)])
+        session.close()
+
     @patch("database.operations.initialize_schema")
     @patch("database.operations.check_tables_exist")
     @patch("database.operations.Session")
@@ -200,20 +1279,20 @@ class TestDatabaseOperations(unittest.TestCase):
 
     @patch("database.operations.MetaData")
     @patch("database.operations.Table")
-    @patch("database.operations.engine")
-    def test_initialize_schema(self, mock_engine, mock_Table, mock_MetaData):
+    @patch("database.operations.get_engine")
+    def test_initialize_schema(self, mock_get_engine, mock_Table, mock_MetaData):
         mock_metadata = MagicMock()
         mock_MetaData.return_value = mock_metadata
 
         initialize_schema()
 
         mock_MetaData.assert_called_once()
-        self.assertEqual(mock_Table.call_count, 2)  # Called for both tables
-        mock_metadata.create_all.assert_called_once_with(mock_engine)
+        self.assertEqual(mock_Table.call_count, 3)  # Called for all three tables
+        mock_metadata.create_all.assert_called_once_with(mock_get_engine.return_value)
 
     @patch("database.operations.MetaData")
-    @patch("database.operations.engine")
-    def test_initialize_schema_exception(self, mock_engine, mock_MetaData):
+    @patch("database.operations.get_engine")
+    def test_initialize_schema_exception(self, mock_get_engine, mock_MetaData):
         mock_metadata = MagicMock()
         mock_MetaData.return_value = mock_metadata
         mock_metadata.create_all.side_effect = SQLAlchemyError()
@@ -221,6 +1300,201 @@ class TestDatabaseOperations(unittest.TestCase):
         with self.assertRaises(SQLAlchemyError):
             initialize_schema()
 
+    def test_apply_sqlite_profile(self):
+        for profile, journal_mode, synchronous in [
+            ("safe", "delete", 2),
+            ("fast", "wal", 1),
+        ]:
+            with tempfile.TemporaryDirectory() as tmp_dir:
+                engine = create_engine(f"sqlite:///{os.path.join(tmp_dir, 'films.db')}")
+                apply_sqlite_profile(engine, profile)
+                with engine.connect() as connection:
+                    pragmas = {
+                        name: connection.exec_driver_sql(f"PRAGMA {name}").scalar()
+                        for name in ("journal_mode", "synchronous", "busy_timeout")
+                    }
+                self.assertEqual(
+                    pragmas,
+                    {
+                        "journal_mode": journal_mode,
+                        "synchronous": synchronous,
+                        "busy_timeout": 5000,
+                    },
+                )
+                engine.dispose()
+
+        with self.assertRaises(ValueError):
+            apply_sqlite_profile(engine, "reckless")
+
+    def test_apply_sqlite_profile_safe_after_fast(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            url = f"sqlite:///{os.path.join(tmp_dir, 'films.db')}"
+            for profile, journal_mode in [("fast", "wal"), ("safe", "delete")]:
+                engine = create_engine(url)
+                apply_sqlite_profile(engine, profile)
+                with engine.connect() as connection:
+                    self.assertEqual(
+                        connection.exec_driver_sql("PRAGMA journal_mode").scalar(),
+                        journal_mode,
+                    )
+                engine.dispose()
+
+
+class TestDatabaseQueries(unittest.TestCase):
+    def test_queries(self):
+        test_engine = create_engine("sqlite://")
+        AcademyAwardWinningFilms.__table__.create(test_engine)
+        TestSession = sessionmaker(bind=test_engine)
+        session = TestSession()
+        session.add_all(
+            [
+                AcademyAwardWinningFilms("id1", "Titanic", 1998, 11, 14),
+                AcademyAwardWinningFilms("id2", "Ben-Hur", 1960, 11, 12),
+                AcademyAwardWinningFilms("id3", "The Return of the King", 2004, 11, 11),
+                AcademyAwardWinningFilms("id4", "Wings", 1929, 2, 2),
+                AcademyAwardWinningFilms("id5", "Amélie", None, None, 5),
+                AcademyAwardWinningFilms("id6", "Été 85", None, None, 1),
+                AcademyAwardWinningFilms("id7", "Film \U0001f3ac", None, None, 1),
+            ]
+        )
+        session.commit()
+        session.close()
+
+        with patch("database.queries.Session", TestSession):
+            self.assertEqual([f.film for f in films_by_year(1998)], ["Titanic"])
+            self.assertEqual([f.film for f in top_by_awards(2)], ["Titanic", "Ben-Hur"])
+            self.assertEqual([f.film for f in search_title("TIT")], ["Titanic"])
+            self.assertEqual(search_title("king"), [])  # Prefix match without FTS
+            # Only ASCII letters are folded, like SQLite's lower() does
+            self.assertEqual([f.film for f in search_title("amél")], ["Amélie"])
+            self.assertEqual([f.film for f in search_title("Été")], ["Été 85"])
+            self.assertEqual(search_title("ÉTÉ"), [])
+            self.assertEqual(
+                [f.film for f in search_title("film ")], ["Film \U0001f3ac"]
+            )
+
+            self.assertTrue(create_title_search(test_engine))
+            self.assertEqual(
+                [f.film for f in search_title("king retu")],
+                ["The Return of the King"],
+            )
+            session = TestSession()
+            session.get(AcademyAwardWinningFilms, "id4").film = "Wings (1927)"
+            session.commit()
+            session.close()
+            self.assertEqual([f.film for f in search_title("1927")], ["Wings (1927)"])
+
+        with test_engine.connect() as connection:
+            plan = connection.exec_driver_sql(
+                "EXPLAIN QUERY PLAN SELECT * FROM academy_award_winning_films "
+                "WHERE lower(film) = 'wings'"
+            ).fetchall()
+        self.assertIn("ix_academy_award_winning_films_title", plan[0][-1])
+
+    def test_load_films_dataframe(self):
+        test_engine = create_engine("sqlite://")
+        AcademyAwardWinningFilms.__table__.create(test_engine)
+        TestSession = sessionmaker(bind=test_engine)
+        session = TestSession()
+        session.add_all(
+            [
+                AcademyAwardWinningFilms("id1", "Titanic", 1998, 11, 14),
+                AcademyAwardWinningFilms("id2", "Wings", 1929, None, 2),
+                AcademyAwardWinningFilms("id3", "Cimarron", None, None, 7),
+            ]
+        )
+        session.commit()
+        session.close()
+
+        with patch("database.queries.Session", TestSession):
+            df = load_films_dataframe()
+            self.assertEqual(list(df.columns), list(FilmRecord._fields))
+            self.assertEqual(df["film"].tolist(), ["Titanic", "Wings", "Cimarron"])
+            self.assertEqual(df["awards"].dtype, "Int64")
+            self.assertEqual(df["awards"].isna().tolist(), [False, True, True])
+
+            df = load_films_dataframe(["film", "year"], dtype_backend="pyarrow")
+            self.assertEqual(list(df.columns), ["film", "year"])
+            self.assertEqual(str(df["year"].dtype), "int64[pyarrow]")
+
+            chunks = list(load_films_dataframe(["awards"], chunksize=2))
+            self.assertEqual([len(chunk) for chunk in chunks], [2, 1])
+            # A chunk of missing values keeps the column dtype
+            self.assertEqual(chunks[1]["awards"].dtype, "Int64")
+
+            for kwargs in (
+                {"columns": ["budget"]},
+                {"columns": []},
+                {"chunksize": 0},
+                {"dtype_backend": "polars"},
+            ):
+                with self.assertRaises(ValueError):
+                    load_films_dataframe(**kwargs)
+
+
+class TestDatabaseBackends(unittest.TestCase):
+    def test_engine_options(self):
+        self.assertEqual(engine_options("sqlite:///films.db"), {})
+        options = engine_options("postgresql+psycopg://user@localhost/wiki_films")
+        self.assertIs(options["pool_pre_ping"], True)
+        self.assertGreater(options["pool_size"], 0)
+        self.assertGreater(options["pool_recycle"], 0)
+
+    def test_postgresql_schema_and_upsert(self):
+        table = AcademyAwardWinningFilms.__table__
+        ddl = str(CreateTable(table).compile(dialect=postgresql.dialect()))
+        self.assertIn("id UUID NOT NULL", ddl)
+        title_index = next(
+            index for index in table.indexes if index.name.endswith("_title")
+        )
+        ddl = str(CreateIndex(title_index).compile(dialect=postgresql.dialect()))
+        self.assertIn("(lower(film) text_pattern_ops)", ddl)
+
+        session = MagicMock()
+        session.get_bind.return_value.dialect.name = "postgresql"
+        statement = upsert_insert(session, table).on_conflict_do_nothing()
+        self.assertIn(
+            "ON CONFLICT DO NOTHING",
+            str(statement.compile(dialect=postgresql.dialect())),
+        )
+        session.get_bind.return_value.dialect.name = "mysql"
+        with self.assertRaises(NotImplementedError):
+            upsert_insert(session, table)
+
+    @patch("database.queries.Session")
+    def test_search_title_postgresql(self, mock_Session):
+        session = mock_Session.return_value.__enter__.return_value
+        session.get_bind.return_value.dialect.name = "postgresql"
+        session.scalars.return_value = []
+
+        search_title("The G_")
+
+        compiled = session.scalars.call_args[0][0].compile(dialect=postgresql.dialect())
+        # A LIKE, as locale collations put e.g. "thegn" between "the g" and "the h"
+        self.assertIn("lower(academy_award_winning_films.film) LIKE", str(compiled))
+        self.assertIn("ESCAPE '/'", str(compiled))
+        self.assertEqual(list(compiled.params.values())[0], "the g/_")
+
+    def test_copy_rows(self):
+        rows = [{"id": "id1", "film": "Film, 1", "year": None}]
+        connection = MagicMock()
+        cursor = connection.cursor.return_value
+        del cursor.copy  # psycopg2 cursors only have copy_expert()
+        cursor.copy_expert.side_effect = lambda sql, f: setattr(
+            cursor, "payload", f.read()
+        )
+        copy_rows(connection, "films", ["id", "film", "year"], rows)
+        self.assertEqual(
+            cursor.copy_expert.call_args[0][0],
+            'COPY "films" ("id", "film", "year") FROM STDIN WITH (FORMAT csv)',
+        )
+        self.assertEqual(cursor.payload, 'id1,"Film, 1",\r\n')
+
+        connection = MagicMock()  # psycopg 3
+        copy_rows(connection, "films", ["id", "film", "year"], rows)
+        copy = connection.cursor.return_value.copy.return_value.__enter__.return_value
+        copy.write_row.assert_called_once_with(["id1", "Film, 1", None])
+
 
 class TestDatabaseSchema(unittest.TestCase):
     def test_AcademyAwardWinningFilms(self):
@@ -259,6 +1533,51 @@ class TestWikipediaUUID(unittest.TestCase):
         self.assertEqual(len(results), 1373)
         self.assertEqual(len(results[0]), 5)  # id, film, year, awards, nominations
 
+    @patch("scripts.wikipedia_uuid.fetchPage")
+    def test_scrape_oscar_winning_films_stable_ids(self, mock_fetchPage):
+        mock_fetchPage.return_value = MagicMock(content=SAMPLE_PAGE)
+        recorder = configure_metrics()
+        first = scrape_oscar_winning_films(id_strategy="uuid5")
+        second = scrape_oscar_winning_films(id_strategy="uuid5")
+        self.assertEqual(first, second)
+        self.assertEqual(
+            first[0], (make_film_id("Film 1", 2021, "uuid5"), "Film 1", 2021, 1, 3)
+        )
+        summary = recorder.summary()
+        configure_metrics()
+        self.assertEqual(summary["fetch"]["bytes_fetched"], 2 * len(SAMPLE_PAGE))
+        self.assertEqual(summary["parse"]["rows_parsed"], 4)
+
+    @patch("scripts.wikipedia_uuid.fetchPage")
+    def test_scrape_oscar_winning_films_include_links(self, mock_fetchPage):
+        mock_fetchPage.return_value = MagicMock(content=SAMPLE_PAGE)
+        results = scrape_oscar_winning_films(include_links=True)
+        self.assertEqual(len(results[0]), 6)
+        self.assertEqual(results[0][5], "https://en.wikipedia.org/wiki/Film_1")
+
+    @patch("scripts.wikipedia_uuid.fetchPage")
+    def test_scrape_oscar_winning_films_skip_unchanged(self, mock_fetchPage):
+        mock_fetchPage.return_value = MagicMock(status_code=304, content=SAMPLE_PAGE)
+        self.assertIsNone(scrape_oscar_winning_films(skip_unchanged=True))
+        self.assertEqual(len(scrape_oscar_winning_films()), 2)
+
+    @patch("scripts.wikipedia_uuid.fetchPage")
+    def test_stream_oscar_winning_films(self, mock_fetchPage):
+        mock_response = MagicMock(status_code=200, content=SAMPLE_PAGE)
+        mock_response.iter_content.return_value = iter(
+            [SAMPLE_PAGE[:150], SAMPLE_PAGE[150:]]
+        )
+        mock_fetchPage.return_value = mock_response
+
+        rows = stream_oscar_winning_films(id_strategy="uuid5")
+        self.assertIs(mock_fetchPage.call_args.kwargs["stream"], True)
+        mock_response.close.assert_not_called()
+        self.assertEqual(list(rows), scrape_oscar_winning_films(id_strategy="uuid5"))
+        mock_response.close.assert_called_once()
+
+        mock_fetchPage.return_value = MagicMock(status_code=304)
+        self.assertIsNone(stream_oscar_winning_films(skip_unchanged=True))
+
     @patch("scripts.wikipedia_uuid.fetchPage")
     def test_scrape_oscar_winning_films_exception(self, mock_fetchPage):
         mock_fetchPage.return_value = None
@@ -272,8 +1591,12 @@ class TestWikipediaUUID(unittest.TestCase):
     @patch("scripts.wikipedia_uuid.insertRow")
     @patch("scripts.wikipedia_uuid.exportToCsv")
     @patch("scripts.wikipedia_uuid.exportToJson")
+    @patch("scripts.wikipedia_uuid.exportToParquet")
+    @patch("scripts.wikipedia_uuid.exportToFeather")
     def test_main(
         self,
+        mock_exportToFeather,
+        mock_exportToParquet,
         mock_exportToJson,
         mock_exportToCsv,
         mock_insertRow,
@@ -284,12 +1607,194 @@ class TestWikipediaUUID(unittest.TestCase):
             ("id1", "Film 1", 2021, 1, 3),
             ("id2", "Film 2", 2022, 2, 5),
         ]
+        mock_initDB.return_value = {
+            "inserted": 1,
+            "updated": 0,
+            "deleted": 0,
+            "unchanged": 1,
+        }
+        recorder = configure_metrics()
         main()
+        summary = recorder.summary()
+        configure_metrics()
         mock_scrape.assert_called_once()
         mock_initDB.assert_called_once()
+        # Only the rows the sync wrote count, not the unchanged one
+        self.assertEqual(summary["load"]["rows_written"], 1)
         self.assertEqual(mock_insertRow.call_count, 2)
         mock_exportToCsv.assert_called_once()
         mock_exportToJson.assert_called_once()
+        mock_exportToParquet.assert_called_once()
+        mock_exportToFeather.assert_called_once()
+
+    @patch("scripts.wikipedia_uuid.stream_oscar_winning_films")
+    @patch("scripts.wikipedia_uuid.initDB")
+    @patch("scripts.wikipedia_uuid.insertRow")
+    @patch("scripts.wikipedia_uuid.CsvExportWriter")
+    @patch("scripts.wikipedia_uuid.JsonExportWriter")
+    @patch("scripts.wikipedia_uuid.exportToCsv")
+    def test_main_stream(
+        self,
+        mock_exportToCsv,
+        mock_JsonExportWriter,
+        mock_CsvExportWriter,
+        mock_insertRow,
+        mock_initDB,
+        mock_stream,
+    ):
+        rows = [("id1", "Film 1", 2021, 1, 3), ("id2", "Film 2", 2022, 2, 5)]
+        mock_stream.return_value = iter(rows)
+        loaded = []
+        mock_initDB.side_effect = lambda records, **kwargs: loaded.extend(records)
+
+        main(stream=True, batch_size=1)
+
+        self.assertEqual(loaded, rows)
+        csv_writer = mock_CsvExportWriter.return_value.__enter__.return_value
+        self.assertEqual(csv_writer.write_batch.call_count, 2)
+        json_writer = mock_JsonExportWriter.return_value.__enter__.return_value
+        self.assertEqual(json_writer.write_batch.call_count, 2)
+        mock_exportToCsv.assert_not_called()
+
+    @patch("scripts.wikipedia_uuid.scrape_oscar_winning_films")
+    @patch("scripts.wikipedia_uuid.initDB")
+    @patch("scripts.wikipedia_uuid.insertRow")
+    @patch("scripts.wikipedia_uuid.exportToCsv")
+    @patch("scripts.wikipedia_uuid.exportToJson")
+    @patch("scripts.wikipedia_uuid.exportToParquet")
+    @patch("scripts.wikipedia_uuid.exportToFeather")
+    def test_main_resumes_after_database_error(
+        self,
+        mock_exportToFeather,
+        mock_exportToParquet,
+        mock_exportToJson,
+        mock_exportToCsv,
+        mock_insertRow,
+        mock_initDB,
+        mock_scrape,
+    ):
+        mock_scrape.return_value = [("id1", "Film 1", 2021, 1, 3)]
+        mock_initDB.side_effect = [SQLAlchemyError("database is locked"), None]
+        with tempfile.TemporaryDirectory() as checkpoint_dir:
+            main(checkpoint_dir=checkpoint_dir)
+            mock_insertRow.assert_not_called()
+            main(checkpoint_dir=checkpoint_dir)
+        # The second run reuses the scraped films instead of refetching the page
+        mock_scrape.assert_called_once()
+        self.assertEqual(mock_initDB.call_count, 2)
+        self.assertEqual(mock_insertRow.call_count, 2)
+        mock_exportToCsv.assert_called_once()
+
+    @patch("scripts.wikipedia_uuid.scrape_oscar_winning_films")
+    @patch("scripts.wikipedia_uuid.initDB")
+    @patch("scripts.wikipedia_uuid.exportToCsv")
+    def test_main_page_unchanged(self, mock_exportToCsv, mock_initDB, mock_scrape):
+        mock_scrape.return_value = None
+        main(use_cache=True)
+        mock_initDB.assert_not_called()
+        mock_exportToCsv.assert_not_called()
+
+    def test_run_sources(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            test_engine = create_engine(
+                f"sqlite:///{os.path.join(tmp_dir, 'films.db')}"
+            )
+            extra_films = ScrapeSource(
+                "extra_films",
+                "https://example.org/extra_films",
+                columns={"film": 0, "year": 1, "awards": 2, "nominations": 3},
+                numeric_columns=("year", "awards", "nominations"),
+            )
+            box_office = ScrapeSource(
+                "box_office",
+                "https://example.org/box_office",
+                columns={"film": 1, "gross": 2},
+                numeric_columns=("gross",),
+                target_table="box_office",
+            )
+            sources = [OSCAR_WINNING_FILMS, extra_films, box_office]
+            results = {
+                "oscar_winning_films": [("id1", "Titanic", 1998, 11, 14)],
+                "extra_films": [("id2", "Wings", 1929, 2, 2)],
+                "box_office": [("id3", "Avatar", 2923706026)],
+            }
+            try:
+                with patch(
+                    "database.operations.get_engine", return_value=test_engine
+                ), patch(
+                    "database.operations.Session", sessionmaker(bind=test_engine)
+                ), patch(
+                    "scripts.wikipedia_uuid.scrape_sources"
+                ) as mock_scrape_sources:
+                    mock_scrape_sources.return_value = results
+                    self.assertEqual(
+                        run_sources(sources),
+                        {"oscar_winning_films": 1, "extra_films": 1, "box_office": 1},
+                    )
+                    # A failed films source must not get its rows deleted by the sync
+                    mock_scrape_sources.return_value = {
+                        "extra_films": results["extra_films"]
+                    }
+                    self.assertEqual(run_sources(sources), {})
+            finally:
+                invalidate_schema_cache()
+            with test_engine.connect() as connection:
+                films = connection.exec_driver_sql(
+                    "SELECT film FROM academy_award_winning_films ORDER BY film"
+                ).fetchall()
+                box_office_rows = connection.exec_driver_sql(
+                    "SELECT * FROM box_office"
+                ).fetchall()
+            test_engine.dispose()
+        self.assertEqual([film for film, in films], ["Titanic", "Wings"])
+        self.assertEqual(box_office_rows, results["box_office"])
+
+
+class TestBenchmarks(unittest.TestCase):
+    def test_generate_wikitable(self):
+        self.assertEqual(parse_size("100k"), 100_000)
+        self.assertEqual(parse_size("250"), 250)
+        for value in ("0", "big"):
+            with self.assertRaises(ValueError):
+                parse_size(value)
+
+        page = generate_wikitable(10, seed=1)
+        self.assertEqual(page, generate_wikitable(10, seed=1))
+        self.assertNotEqual(page, generate_wikitable(10, seed=2))
+        self.assertEqual(len(parse_wikitable_rows(page)), 10)
+
+    def test_compare_results(self):
+        baseline = {
+            "sizes": {
+                "1000": {"stages": {"scrape": {"seconds": 1.0, "peak_bytes": 100}}}
+            }
+        }
+        current = {
+            "sizes": {
+                "1000": {"stages": {"scrape": {"seconds": 1.05, "peak_bytes": 150}}}
+            }
+        }
+        regressions = compare_results(baseline, current, threshold=0.1)
+        self.assertEqual(len(regressions), 1)
+        self.assertEqual(regressions[0]["metric"], "peak_bytes")
+        self.assertEqual(regressions[0]["change"], 0.5)
+        self.assertEqual(compare_results(baseline, current, threshold=0.6), [])
+
+    def test_run_size(self):
+        with tempfile.TemporaryDirectory() as work_dir:
+            test_engine = create_engine(f"sqlite:///{work_dir}/benchmark.db")
+            try:
+                with patch(
+                    "database.operations.get_engine", return_value=test_engine
+                ), patch("database.operations.Session", sessionmaker(bind=test_engine)):
+                    result = run_size(25, work_dir, trace_memory=False)
+            finally:
+                invalidate_schema_cache()
+                test_engine.dispose()
+        self.assertEqual(tuple(result["stages"]), STAGES)
+        for metrics in result["stages"].values():
+            self.assertEqual(metrics["rows"], 25)
+            self.assertIsNone(metrics["peak_bytes"])
 
 
 if __name__ == "__main__":
@@ -1,10 +1,13 @@
 """
 Wiki module initialization.
 
-This module sets up logging and imports necessary components for web scraping
-and data processing operations.
+This module exposes the components used for web scraping and data processing
+operations. Third-party packages (pandas, requests, bs4) and the modules
+that need them are only imported when one of their names is first used, so
+importing wiki stays cheap.
 """
 
+import importlib
 import json
 import logging
 
@@ -12,37 +15,111 @@ import logging
 import os
 import uuid
 
-# Third-party imports
-import pandas as pd
-import requests
-from bs4 import BeautifulSoup
-
-from .export_functions import exportToCsv, exportToJson
-
 # Local imports
+from .cache import ResponseCache
+from .metrics import configure_metrics, get_recorder
+from .snapshots import SnapshotStore, configure_snapshots
 from .utils import create_data_folder, uuid_to_str
 
-# Setup logging
-logging.basicConfig(
-    level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
-)
+# Names imported on first access, mapped to (module, attribute or None for the module)
+_LAZY_IMPORTS = {
+    "pd": ("pandas", None),
+    "requests": ("requests", None),
+    "BeautifulSoup": ("bs4", "BeautifulSoup"),
+    "exportToCsv": (".export_functions", "exportToCsv"),
+    "exportToJson": (".export_functions", "exportToJson"),
+    "exportToParquet": (".export_functions", "exportToParquet"),
+    "exportToFeather": (".export_functions", "exportToFeather"),
+    "configure_session": (".http", "configure_session"),
+    "get_session": (".http", "get_session"),
+}
+
 
+def __getattr__(name):
+    if name not in _LAZY_IMPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    module_name, attribute = _LAZY_IMPORTS[name]
+    value = importlib.import_module(module_name, __name__)
+    if attribute is not None:
+        value = getattr(value, attribute)
+    globals()[name] = value
+    return value
 
-def fetchPage(url):
+
+def fetchPage(url, cache=None, stream=False):
     """
     Fetch a web page and return the response.
 
+    The request goes through the shared pooled session from wiki.http, so
+    connections are reused and a stalled socket fails after the configured
+    timeout instead of hanging. With a cache, the request is made conditional
+    on the stored validators. A 304 Not Modified response keeps its status
+    code but gets the cached body as its content, so callers can either skip
+    unchanged pages or use the body as usual. If the cached body is gone by
+    the time the 304 arrives, the page is fetched again unconditionally.
+
+    When wiki.snapshots is in replay mode, the page is served from the
+    snapshot store with no request made; in record mode, every page fetched
+    successfully, including cached copies of unchanged pages, is also saved
+    to the store.
+
     Args:
         url (str): The URL of the page to fetch.
+        cache (ResponseCache, optional): Cache used for conditional requests.
+        stream (bool): Whether to defer downloading the body, so it can be read
+                       incrementally with response.iter_content(). Responses
+                       that get cached are still read in full.
 
     Returns:
         requests.Response: The response object from the request.
 
     Raises:
-        Exception: If the page cannot be fetched due to network issues.
+        Exception: If the page cannot be fetched due to network issues, or
+                   if replaying and the URL has no snapshot.
     """
+    import requests
+
+    from .http import get_session, get_timeout
+    from .snapshots import get_snapshots
+
+    snapshots, snapshot_mode = get_snapshots()
+    if snapshot_mode == "replay":
+        content = snapshots.load(url)
+        if content is None:
+            logging.error(f"No snapshot of {url} to replay.")
+            raise Exception(f"No snapshot of {url} to replay.")
+        res = requests.Response()
+        res.status_code = 200
+        res.url = url
+        res.headers["Content-Type"] = "text/html; charset=UTF-8"
+        res._content = content
+        res._content_consumed = True
+        logging.info("Replayed the page from its snapshot")
+        return res
+
     try:
-        res = requests.get(url)
+        headers = cache.conditional_headers(url) if cache is not None else {}
+        res = get_session().get(
+            url, headers=headers, timeout=get_timeout(), stream=stream
+        )
+        if cache is not None:
+            if res.status_code == 304:
+                entry = cache.get(url)
+                if entry is None:
+                    # The cached copy was removed after the request was made
+                    logging.warning(f"Cached copy of {url} is missing, refetching it")
+                    res = get_session().get(url, timeout=get_timeout(), stream=stream)
+                else:
+                    res._content = entry["content"]
+                    res._content_consumed = True
+                    if snapshot_mode == "record":
+                        snapshots.save(url, res.content)
+                    logging.info("Page not modified, using the cached copy")
+                    return res
+            if res.status_code == 200:
+                cache.store(url, res)
+        if snapshot_mode == "record" and res.status_code == 200:
+            snapshots.save(url, res.content)
         logging.info("Successfully fetched the page")
         return res
     except requests.RequestException:
@@ -59,7 +136,16 @@ __all__ = [
     "uuid",
     "exportToCsv",
     "exportToJson",
+    "exportToParquet",
+    "exportToFeather",
+    "ResponseCache",
+    "SnapshotStore",
+    "configure_snapshots",
+    "configure_metrics",
+    "get_recorder",
     "create_data_folder",
     "uuid_to_str",
     "fetchPage",
+    "configure_session",
+    "get_session",
 ]
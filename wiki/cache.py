@@ -0,0 +1,128 @@
+"""
+HTTP response cache for the Wiki module.
+
+This module stores fetched page bodies together with their ETag and
+Last-Modified validators, so that later fetches of the same URL can be
+made conditional and an unchanged page is served from disk.
+"""
+
+import hashlib
+import json
+import logging
+import os
+
+from .utils import create_data_folder
+
+DEFAULT_CACHE_DIR = "./data/http_cache"
+
+
+class ResponseCache:
+    """
+    On-disk cache of page bodies and validators keyed by URL.
+
+    Each entry is stored as two files named after the SHA-256 of the URL:
+    `<key>.body` with the raw response content and `<key>.json` with the
+    URL and its ETag/Last-Modified validators.
+    """
+
+    def __init__(self, directory=DEFAULT_CACHE_DIR):
+        """
+        Initialize a ResponseCache instance.
+
+        Args:
+            directory (str, optional): Directory holding the cache entries.
+                                       Defaults to './data/http_cache'.
+        """
+        self.directory = directory
+
+    def _paths(self, url):
+        """
+        Return the body and metadata paths of the entry for a URL.
+
+        Args:
+            url (str): The cached URL.
+
+        Returns:
+            tuple: The (body_path, meta_path) pair.
+        """
+        key = hashlib.sha256(url.encode("utf-8")).hexdigest()
+        base = os.path.join(self.directory, key)
+        return f"{base}.body", f"{base}.json"
+
+    def get(self, url):
+        """
+        Load the cached entry for a URL.
+
+        Args:
+            url (str): The cached URL.
+
+        Returns:
+            dict or None: The entry metadata with the body under "content",
+                          or None if the URL is not cached.
+        """
+        body_path, meta_path = self._paths(url)
+        try:
+            with open(meta_path) as f:
+                entry = json.load(f)
+            with open(body_path, "rb") as f:
+                entry["content"] = f.read()
+        except (OSError, ValueError):
+            return None
+        return entry
+
+    def conditional_headers(self, url):
+        """
+        Build the conditional request headers for a URL.
+
+        Args:
+            url (str): The URL about to be fetched.
+
+        Returns:
+            dict: If-None-Match/If-Modified-Since headers, empty if the URL is not cached.
+        """
+        entry = self.get(url)
+        if entry is None:
+            return {}
+        headers = {}
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def store(self, url, response):
+        """
+        Store a response body and its validators.
+
+        Responses without an ETag or Last-Modified header are not cached,
+        since they could never be revalidated.
+
+        Args:
+            url (str): The requested URL.
+            response (requests.Response): The successful response to cache.
+        """
+        etag = response.headers.get("ETag")
+        last_modified = response.headers.get("Last-Modified")
+        if not etag and not last_modified:
+            return
+
+        body_path, meta_path = self._paths(url)
+        create_data_folder(body_path)
+        with open(f"{body_path}.tmp", "wb") as f:
+            f.write(response.content)
+        os.replace(f"{body_path}.tmp", body_path)
+        with open(f"{meta_path}.tmp", "w") as f:
+            json.dump({"url": url, "etag": etag, "last_modified": last_modified}, f)
+        os.replace(f"{meta_path}.tmp", meta_path)
+        logging.info(f"Cached response for {url}")
+
+    def invalidate(self, url):
+        """
+        Remove the cached entry for a URL, forcing the next fetch to be unconditional.
+
+        Args:
+            url (str): The cached URL.
+        """
+        for path in self._paths(url):
+            if os.path.exists(path):
+                os.remove(path)
@@ -1,18 +1,115 @@
 """
 Export functions for the Wiki module.
 
-This module provides functions to export data to CSV and JSON formats.
+This module provides functions to export data to CSV and JSON formats,
+either from a whole DataFrame or incrementally, batch by batch, with the
+CsvExportWriter and JsonExportWriter context managers, and to the columnar
+Parquet and Feather formats (which require pyarrow).
+
+Every export is written to a temporary file that replaces the target only
+once it is complete, so readers never see a partially written file. Unless
+skip_unchanged is turned off, a hash of the exported content is kept in a
+`<filename>.sha256` sidecar and an export whose content has not changed
+leaves the existing file untouched.
 """
 
+import csv
+import hashlib
 import json
 import logging
+import os
+import uuid
 
 import pandas as pd
 
-from .utils import create_data_folder, uuid_to_str
+from .utils import (
+    atomic_output,
+    batched,
+    create_data_folder,
+    fsync_path,
+    read_digest,
+    temporary_path,
+    uuid_to_str,
+    write_digest,
+)
+
+# Columns of the film rows produced by the scraper
+FILM_COLUMNS = ["id", "film", "year", "awards", "nominations"]
+
+# Column types written to the columnar formats
+FILM_DTYPES = {
+    "id": "string",
+    "film": "string",
+    "year": "Int64",
+    "awards": "Int64",
+    "nominations": "Int64",
+}
+
+
+def dataset_hash(df, *options):
+    """
+    Hash the content of a DataFrame together with the export options.
+
+    The hash covers the column names, dtypes and values but not the index,
+    so it can be computed without serializing the DataFrame.
+
+    Args:
+        df (pandas.DataFrame): The DataFrame to hash.
+        *options: Export settings that change the output, such as the format.
+
+    Returns:
+        str: The hexadecimal SHA-256 digest.
+    """
+    digest = hashlib.sha256()
+    digest.update(repr((list(df.columns), list(map(str, df.dtypes)), options)).encode())
+    digest.update(pd.util.hash_pandas_object(df, index=False).values.tobytes())
+    return digest.hexdigest()
+
+
+def _is_unchanged(filename, digest):
+    """
+    Check whether a file already holds the content with the given hash.
+
+    Args:
+        filename (str): The export target.
+        digest (str or None): The hash of the content about to be written.
+
+    Returns:
+        bool: True if the write can be skipped.
+    """
+    if digest is None or digest != read_digest(filename):
+        return False
+    logging.info(f"{filename} is unchanged, skipping the export.")
+    return True
+
+
+def _write_dataframe(df, filename, skip_unchanged, write, *options):
+    """
+    Write a DataFrame export atomically, unless its content has not changed.
+
+    Args:
+        df (pandas.DataFrame): The DataFrame to export.
+        filename (str): The export target.
+        skip_unchanged (bool): Whether to skip the write when the sidecar hash matches.
+        write (callable): Called with the temporary path to write the file to.
+        *options: Export settings included in the hash.
+
+    Returns:
+        bool: True if the file was written, False if the write was skipped.
+    """
+    digest = dataset_hash(df, *options) if skip_unchanged else None
+    if _is_unchanged(filename, digest):
+        return False
+    with atomic_output(filename) as tmp_path:
+        write(tmp_path)
+        # Drop the old hash first so it can never describe the new file
+        write_digest(filename, None)
+    write_digest(filename, digest)
+    logging.info(f"Data exported to {filename}")
+    return True
 
 
-def exportToCsv(df, filename="./data/output.csv"):
+def exportToCsv(df, filename="./data/output.csv", skip_unchanged=True):
     """
     Export a DataFrame to a CSV file.
 
@@ -20,26 +117,399 @@ def exportToCsv(df, filename="./data/output.csv"):
         df (pandas.DataFrame): The DataFrame to export.
         filename (str, optional): The path to the output CSV file.
                                   Defaults to './data/output.csv'.
+        skip_unchanged (bool): Whether to leave the file untouched if its content
+                               would not change.
+
+    Returns:
+        bool: True if the file was written, False if the write was skipped.
     """
-    create_data_folder(filename)
-    df.to_csv(filename, index=False)
-    logging.info(f"Data exported to {filename}")
+    return _write_dataframe(
+        df,
+        filename,
+        skip_unchanged,
+        lambda path: df.to_csv(path, index=False),
+        "csv",
+    )
 
 
-def exportToJson(df, filename="./data/output.json"):
+def exportToJson(
+    df,
+    filename="./data/output.json",
+    compact=False,
+    ndjson=False,
+    batch_size=1000,
+    skip_unchanged=True,
+):
     """
     Export a DataFrame to a JSON file, handling UUID conversion.
 
+    Records are encoded and written one batch at a time straight from the
+    DataFrame rows, so no intermediate list of dicts is built. UUID values
+    are converted by the encoder's fallback hook, which is only invoked for
+    values JSON cannot encode natively.
+
     Args:
         df (pandas.DataFrame): The DataFrame to export.
         filename (str, optional): The path to the output JSON file.
                                   Defaults to './data/output.json'.
+        compact (bool): Whether to write one record per line without indentation
+                        or spaces, instead of an indented array.
+        ndjson (bool): Whether to write newline-delimited JSON records
+                       instead of an array.
+        batch_size (int): Number of rows encoded per write.
+        skip_unchanged (bool): Whether to leave the file untouched if its content
+                               would not change.
+
+    Returns:
+        bool: True if the file was written, False if the write was skipped.
     """
-    create_data_folder(filename)
-    # Convert DataFrame to dict, handling UUID conversion
-    json_data = df.to_dict(orient="records")
-    json_data = [{k: uuid_to_str(v) for k, v in record.items()} for record in json_data]
+    digest = dataset_hash(df, "json", compact, ndjson) if skip_unchanged else None
+    if _is_unchanged(filename, digest):
+        return False
+    rows = df.itertuples(index=False, name=None)
+    columns = list(df.columns)
+    with JsonExportWriter(filename, columns, compact, ndjson, False) as writer:
+        for batch in batched(rows, batch_size):
+            writer.write_batch(batch)
+    write_digest(filename, digest)
+    return True
 
-    with open(filename, "w") as f:
-        json.dump(json_data, f, indent=2)
-    logging.info(f"Data exported to {filename}")
+
+def _require_pyarrow(format_name):
+    """
+    Check that pyarrow is available for a columnar export.
+
+    Args:
+        format_name (str): Name of the format, used in the error message.
+
+    Raises:
+        ImportError: If pyarrow is not installed.
+    """
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError as e:
+        raise ImportError(f"Exporting to {format_name} requires pyarrow.") from e
+
+
+def _typed_frame(df, dtypes):
+    """
+    Cast DataFrame columns to explicit types before a columnar export.
+
+    Integer columns are converted with pd.to_numeric, so values that are not
+    numbers (such as a "1927/28" year) become missing values instead of
+    forcing the whole column to strings.
+
+    Args:
+        df (pandas.DataFrame): The DataFrame to cast.
+        dtypes (dict): Target dtypes keyed by column name; other columns are kept.
+
+    Returns:
+        pandas.DataFrame: A typed copy of the DataFrame with a default index.
+    """
+    typed = df.reset_index(drop=True)
+    for column, dtype in dtypes.items():
+        if column not in typed.columns:
+            continue
+        values = typed[column]
+        if dtype == "string":
+            values = values.map(uuid_to_str, na_action="ignore").astype("string")
+        else:
+            values = pd.to_numeric(values, errors="coerce").astype(dtype)
+        typed[column] = values
+    return typed
+
+
+def exportToParquet(
+    df,
+    filename="./data/output.parquet",
+    compression="snappy",
+    row_group_size=None,
+    dtypes=FILM_DTYPES,
+    skip_unchanged=True,
+):
+    """
+    Export a DataFrame to a Parquet file with explicit column types.
+
+    Args:
+        df (pandas.DataFrame): The DataFrame to export.
+        filename (str, optional): The path to the output Parquet file.
+                                  Defaults to './data/output.parquet'.
+        compression (str, optional): Codec such as "snappy", "zstd", "gzip" or None.
+        row_group_size (int, optional): Maximum number of rows per row group.
+        dtypes (dict, optional): Column dtypes, nullable Int64 for the counts by default.
+        skip_unchanged (bool): Whether to leave the file untouched if its content
+                               would not change.
+
+    Returns:
+        bool: True if the file was written, False if the write was skipped.
+
+    Raises:
+        ImportError: If pyarrow is not installed.
+    """
+    _require_pyarrow("Parquet")
+    typed = _typed_frame(df, dtypes)
+    return _write_dataframe(
+        typed,
+        filename,
+        skip_unchanged,
+        lambda path: typed.to_parquet(
+            path,
+            engine="pyarrow",
+            index=False,
+            compression=compression,
+            row_group_size=row_group_size,
+        ),
+        "parquet",
+        compression,
+        row_group_size,
+    )
+
+
+def exportToFeather(
+    df,
+    filename="./data/output.feather",
+    compression="zstd",
+    compression_level=None,
+    chunksize=None,
+    dtypes=FILM_DTYPES,
+    skip_unchanged=True,
+):
+    """
+    Export a DataFrame to a Feather (Arrow IPC) file with explicit column types.
+
+    Args:
+        df (pandas.DataFrame): The DataFrame to export.
+        filename (str, optional): The path to the output Feather file.
+                                  Defaults to './data/output.feather'.
+        compression (str, optional): "zstd", "lz4" or "uncompressed".
+        compression_level (int, optional): Level passed to the codec.
+        chunksize (int, optional): Maximum number of rows per record batch.
+        dtypes (dict, optional): Column dtypes, nullable Int64 for the counts by default.
+        skip_unchanged (bool): Whether to leave the file untouched if its content
+                               would not change.
+
+    Returns:
+        bool: True if the file was written, False if the write was skipped.
+
+    Raises:
+        ImportError: If pyarrow is not installed.
+    """
+    _require_pyarrow("Feather")
+    typed = _typed_frame(df, dtypes)
+    return _write_dataframe(
+        typed,
+        filename,
+        skip_unchanged,
+        lambda path: typed.to_feather(
+            path,
+            compression=compression,
+            compression_level=compression_level,
+            chunksize=chunksize,
+        ),
+        "feather",
+        compression,
+        compression_level,
+        chunksize,
+    )
+
+
+def _json_default(obj):
+    """
+    Convert values the JSON encoder cannot handle natively.
+
+    Args:
+        obj: The value to convert.
+
+    Returns:
+        The JSON-compatible value.
+
+    Raises:
+        TypeError: If the value cannot be converted.
+    """
+    if isinstance(obj, uuid.UUID):
+        return uuid_to_str(obj)
+    if obj is pd.NA:
+        return None
+    if hasattr(obj, "item"):  # NumPy scalars
+        return obj.item()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+class _AtomicExportWriter:
+    """
+    Base class of the batch writers, writing to a temporary file that replaces
+    the target when the context exits cleanly. As with atomic_output, the
+    file is synced to disk before the rename and its directory after.
+
+    With skip_unchanged, the written text is hashed as it goes; if the hash
+    matches the target's sidecar the temporary file is discarded and
+    `skipped` is set. If the context exits with an exception the temporary
+    file is removed and the target is left untouched.
+    """
+
+    def __init__(self, filename, skip_unchanged=True):
+        """
+        Initialize an _AtomicExportWriter instance.
+
+        Args:
+            filename (str): The path to the output file.
+            skip_unchanged (bool): Whether to keep the existing file if the
+                                   written content is the same.
+        """
+        self.filename = filename
+        self.skip_unchanged = skip_unchanged
+        self.skipped = False
+        self.rows_written = 0
+        self._hash = None
+        self._tmp_path = None
+        self._file = None
+
+    def _open(self, newline=None):
+        create_data_folder(self.filename)
+        self._hash = hashlib.sha256() if self.skip_unchanged else None
+        self._tmp_path = temporary_path(self.filename)
+        self._file = open(self._tmp_path, "w", encoding="utf-8", newline=newline)
+
+    def write(self, text):
+        """
+        Write text to the temporary file.
+
+        Args:
+            text (str): The text to write.
+        """
+        if self._hash is not None:
+            self._hash.update(text.encode("utf-8"))
+        self._file.write(text)
+
+    def _close(self, exc_type):
+        self._file.close()
+        if exc_type is not None:
+            os.remove(self._tmp_path)
+            return
+        digest = self._hash.hexdigest() if self._hash is not None else None
+        if _is_unchanged(self.filename, digest):
+            os.remove(self._tmp_path)
+            self.skipped = True
+            return
+        write_digest(self.filename, None)
+        fsync_path(self._tmp_path)
+        os.replace(self._tmp_path, self.filename)
+        fsync_path(os.path.dirname(self.filename) or os.curdir)
+        write_digest(self.filename, digest)
+        logging.info(f"{self.rows_written} rows exported to {self.filename}")
+
+
+class CsvExportWriter(_AtomicExportWriter):
+    """
+    Context manager writing rows to a CSV file batch by batch.
+    """
+
+    def __init__(
+        self, filename="./data/output.csv", columns=FILM_COLUMNS, skip_unchanged=True
+    ):
+        """
+        Initialize a CsvExportWriter instance.
+
+        Args:
+            filename (str, optional): The path to the output CSV file.
+                                      Defaults to './data/output.csv'.
+            columns (list, optional): The column names, in row order.
+            skip_unchanged (bool): Whether to keep the existing file if the
+                                   written content is the same.
+        """
+        super().__init__(filename, skip_unchanged)
+        self.columns = columns
+        self._writer = None
+
+    def __enter__(self):
+        self._open(newline="")
+        self._writer = csv.writer(self)
+        self._writer.writerow(self.columns)
+        return self
+
+    def write_batch(self, rows):
+        """
+        Append rows to the file.
+
+        Args:
+            rows (list): Tuples of values in column order.
+        """
+        self._writer.writerows(rows)
+        self.rows_written += len(rows)
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self._close(exc_type)
+
+
+class JsonExportWriter(_AtomicExportWriter):
+    """
+    Context manager writing rows to a JSON file batch by batch.
+
+    By default the output is the same as json.dump(records, f, indent=2).
+    compact writes the array with one unindented record per line, which lets
+    the C encoder do the work, and ndjson writes one record per line with no
+    surrounding array.
+    """
+
+    def __init__(
+        self,
+        filename="./data/output.json",
+        columns=FILM_COLUMNS,
+        compact=False,
+        ndjson=False,
+        skip_unchanged=True,
+    ):
+        """
+        Initialize a JsonExportWriter instance.
+
+        Args:
+            filename (str, optional): The path to the output JSON file.
+                                      Defaults to './data/output.json'.
+            columns (list, optional): The column names, in row order.
+            compact (bool): Whether to drop indentation and optional spaces.
+            ndjson (bool): Whether to write newline-delimited JSON records.
+            skip_unchanged (bool): Whether to keep the existing file if the
+                                   written content is the same.
+        """
+        super().__init__(filename, skip_unchanged)
+        self.columns = columns
+        self.ndjson = ndjson
+        self._indented = not (compact or ndjson)
+        self._encode = json.JSONEncoder(
+            indent=2 if self._indented else None,
+            separators=(",", ":") if compact else None,
+            default=_json_default,
+        ).encode
+
+    def __enter__(self):
+        self._open()
+        if not self.ndjson:
+            self.write("[")
+        return self
+
+    def write_batch(self, rows):
+        """
+        Append rows to the file.
+
+        Args:
+            rows (list): Tuples of values in column order.
+        """
+        columns = self.columns
+        encoded = [self._encode(dict(zip(columns, row))) for row in rows]
+        if not encoded:
+            return
+        if self.ndjson:
+            self.write("\n".join(encoded) + "\n")
+        else:
+            indent = ""
+            if self._indented:
+                indent = "  "
+                encoded = [record.replace("\n", "\n  ") for record in encoded]
+            prefix = ",\n" if self.rows_written else "\n"
+            self.write(prefix + indent + f",\n{indent}".join(encoded))
+        self.rows_written += len(encoded)
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if not self.ndjson:
+            self.write("\n]" if self.rows_written else "]")
+        self._close(exc_type)
@@ -0,0 +1,114 @@
+"""
+HTTP session management for the Wiki module.
+
+This module owns the pooled requests.Session shared by fetchPage and any
+scraper that needs to fetch pages, together with its timeouts and retry policy.
+"""
+
+import logging
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+DEFAULT_POOL_SIZE = 10
+DEFAULT_TIMEOUT = (5, 30)  # (connect, read) in seconds
+DEFAULT_RETRIES = 3
+DEFAULT_BACKOFF_FACTOR = 0.5
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+USER_AGENT = (
+    "wikipedia_film_data_acquirer "
+    "(+https://github.com/mpshmakov/wikipedia_film_data_acquirer)"
+)
+
+_session = None
+_timeout = DEFAULT_TIMEOUT
+
+
+def create_session(
+    pool_size=DEFAULT_POOL_SIZE,
+    retries=DEFAULT_RETRIES,
+    backoff_factor=DEFAULT_BACKOFF_FACTOR,
+):
+    """
+    Create a requests.Session with a connection pool and a retry policy.
+
+    Idempotent requests answered with 429 or 5xx are retried with exponential
+    backoff, waiting for the Retry-After header when the server sends one.
+
+    Args:
+        pool_size (int): Number of keep-alive connections kept per host.
+        retries (int): Maximum number of retries per request.
+        backoff_factor (float): Base of the exponential backoff in seconds.
+
+    Returns:
+        requests.Session: The configured session.
+    """
+    retry = Retry(
+        total=retries,
+        backoff_factor=backoff_factor,
+        status_forcelist=RETRY_STATUSES,
+        allowed_methods=frozenset({"GET", "HEAD"}),
+        respect_retry_after_header=True,
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(
+        pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry
+    )
+    session = requests.Session()
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    session.headers["User-Agent"] = USER_AGENT
+    return session
+
+
+def configure_session(
+    pool_size=DEFAULT_POOL_SIZE,
+    retries=DEFAULT_RETRIES,
+    backoff_factor=DEFAULT_BACKOFF_FACTOR,
+    timeout=DEFAULT_TIMEOUT,
+):
+    """
+    Replace the shared session with one using the given settings.
+
+    Args:
+        pool_size (int): Number of keep-alive connections kept per host.
+        retries (int): Maximum number of retries per request.
+        backoff_factor (float): Base of the exponential backoff in seconds.
+        timeout (float or tuple): Timeout, or (connect, read) timeouts, in seconds.
+
+    Returns:
+        requests.Session: The new shared session.
+    """
+    global _session, _timeout
+    if _session is not None:
+        _session.close()
+    _session = create_session(pool_size, retries, backoff_factor)
+    _timeout = timeout
+    logging.info(
+        f"Configured HTTP session (pool_size={pool_size}, retries={retries}, timeout={timeout})"
+    )
+    return _session
+
+
+def get_session():
+    """
+    Return the shared session, creating it with the default settings on first use.
+
+    Returns:
+        requests.Session: The shared session.
+    """
+    global _session
+    if _session is None:
+        _session = create_session()
+    return _session
+
+
+def get_timeout():
+    """
+    Return the timeout applied to requests made with the shared session.
+
+    Returns:
+        float or tuple: Timeout, or (connect, read) timeouts, in seconds.
+    """
+    return _timeout
@@ -0,0 +1,369 @@
+"""
+Run metrics for the Wiki module.
+
+Stages of a run are wrapped in spans, with the span() context manager or
+the timed() decorator. Each span records its duration and the bytes
+fetched, rows parsed and rows written during the stage. It also records
+the peak RSS of the process so far when the stage ends. That is a
+process-wide high-water mark, so a stage that ends after a larger one
+reports the larger one's peak. Finished spans are logged, appended to a JSON lines
+file when one is configured, and can be summarized in a Prometheus
+textfile for the node exporter's textfile collector.
+"""
+
+import json
+import logging
+import sys
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from functools import wraps
+
+from .utils import atomic_output, create_data_folder
+
+try:
+    import resource
+except ImportError:  # Not available on Windows
+    resource = None
+
+DEFAULT_METRICS_PATH = "./data/metrics.jsonl"
+
+# Counters every span carries, all starting at zero
+COUNTERS = ("bytes_fetched", "rows_parsed", "rows_written")
+
+# Prefix of the metric names in the Prometheus textfile
+METRIC_PREFIX = "wiki_stage"
+
+_recorder = None
+
+
+def peak_rss_bytes():
+    """
+    Return the peak resident set size of the process so far.
+
+    Returns:
+        int or None: The high-water mark in bytes, or None where the
+                     resource module is not available.
+    """
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # macOS reports bytes, Linux and the BSDs kilobytes
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+class Span:
+    """
+    Measurements of one stage of a run.
+    """
+
+    def __init__(self, name):
+        """
+        Initialize a Span instance.
+
+        Args:
+            name (str): Name of the stage.
+        """
+        self.name = name
+        self.counters = dict.fromkeys(COUNTERS, 0)
+        self.status = "ok"
+        self.started_at = None
+        self.duration = None
+        self.process_peak_rss = None
+
+    def add(self, **counts):
+        """
+        Increase counters of the span.
+
+        Args:
+            **counts: Amounts keyed by counter name, one of COUNTERS.
+
+        Raises:
+            ValueError: If a counter name is unknown.
+        """
+        for counter, amount in counts.items():
+            if counter not in self.counters:
+                raise ValueError(
+                    f"Unknown counter {counter!r}, expected one of {COUNTERS}."
+                )
+            self.counters[counter] += amount
+
+    def count(self, iterable, counter="rows_parsed", size=None):
+        """
+        Count the items of an iterable as they are consumed.
+
+        Args:
+            iterable (iterable): The items, e.g. rows or chunks streamed from the page.
+            counter (str): The counter increased, one of COUNTERS.
+            size (callable, optional): Amount added per item, e.g. len for
+                                       byte chunks; 1 by default.
+
+        Yields:
+            The items of the iterable.
+        """
+        for item in iterable:
+            self.add(**{counter: size(item) if size else 1})
+            yield item
+
+    def to_dict(self):
+        """
+        Return the span as a JSON-serializable dict.
+
+        Returns:
+            dict: The stage name, status, start time, duration, counters and
+                  process peak RSS.
+        """
+        return {
+            "stage": self.name,
+            "status": self.status,
+            "started_at": datetime.fromtimestamp(
+                self.started_at, timezone.utc
+            ).isoformat(),
+            "duration_seconds": round(self.duration, 6),
+            **self.counters,
+            "process_peak_rss_bytes": self.process_peak_rss,
+        }
+
+
+class MetricsRecorder:
+    """
+    Collector of the spans of one run.
+    """
+
+    def __init__(self, jsonl_path=None, prometheus_path=None):
+        """
+        Initialize a MetricsRecorder instance.
+
+        Args:
+            jsonl_path (str, optional): File each finished span is appended to
+                                        as a JSON line.
+            prometheus_path (str, optional): Textfile rewritten by write_prometheus().
+        """
+        self.jsonl_path = jsonl_path
+        self.prometheus_path = prometheus_path
+        self.run_id = uuid.uuid4().hex
+        self.spans = []
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def span(self, name):
+        """
+        Measure the stage run inside the with block.
+
+        A stage that raises is recorded with the "error" status.
+
+        Args:
+            name (str): Name of the stage.
+
+        Yields:
+            Span: The span, whose counters the block can increase.
+        """
+        span = Span(name)
+        span.started_at = time.time()
+        start = time.perf_counter()
+        try:
+            yield span
+        except GeneratorExit:
+            # A generator holding the span was closed early, not failed
+            raise
+        except BaseException:
+            span.status = "error"
+            raise
+        finally:
+            span.duration = time.perf_counter() - start
+            span.process_peak_rss = peak_rss_bytes()
+            self.record(span)
+
+    def reset(self):
+        """
+        Forget the spans recorded so far and start a new run id.
+        """
+        with self._lock:
+            self.run_id = uuid.uuid4().hex
+            self.spans = []
+
+    @contextmanager
+    def run(self, name="run"):
+        """
+        Measure a whole run, then write the Prometheus textfile.
+
+        The recorder is reset first, so a recorder reused across runs only
+        summarizes the current one. The textfile is written however the run
+        ends, so a run that fails or exits early still reports the stages it
+        went through.
+
+        Args:
+            name (str): Name of the span covering the run.
+
+        Yields:
+            Span: The span of the run.
+        """
+        self.reset()
+        try:
+            with self.span(name) as span:
+                yield span
+        finally:
+            self.write_prometheus()
+
+    def record(self, span):
+        """
+        Store a finished span and emit it.
+
+        Args:
+            span (Span): The finished span.
+        """
+        entry = {"run_id": self.run_id, **span.to_dict()}
+        with self._lock:
+            self.spans.append(span)
+            if self.jsonl_path:
+                create_data_folder(self.jsonl_path)
+                with open(self.jsonl_path, "a") as f:
+                    f.write(json.dumps(entry) + "\n")
+        logging.info(
+            f"Stage {span.name} finished ({span.status}) in {span.duration:.3f}s"
+        )
+
+    def summary(self):
+        """
+        Aggregate the spans by stage.
+
+        Stages run more than once in the run have their durations and
+        counters summed, their process peak RSS maximized, and count as
+        failed if any of them failed.
+
+        Returns:
+            dict: Aggregated span dicts keyed by stage name, in first-run order.
+        """
+        stages = {}
+        with self._lock:
+            spans = list(self.spans)
+        for span in spans:
+            stage = stages.setdefault(
+                span.name,
+                {"duration_seconds": 0.0, **dict.fromkeys(COUNTERS, 0)},
+            )
+            stage["duration_seconds"] += span.duration
+            for counter in COUNTERS:
+                stage[counter] += span.counters[counter]
+            if span.process_peak_rss is not None:
+                stage["process_peak_rss_bytes"] = max(
+                    stage.get("process_peak_rss_bytes", 0), span.process_peak_rss
+                )
+            stage["success"] = stage.get("success", 1) and int(span.status == "ok")
+        return stages
+
+    def prometheus_text(self):
+        """
+        Render the stage summary in the Prometheus text exposition format.
+
+        Returns:
+            str: One gauge family per metric, labelled by stage.
+        """
+        families = [
+            ("duration_seconds", "Time spent in the stage during the last run."),
+            ("bytes_fetched", "Bytes fetched by the stage during the last run."),
+            ("rows_parsed", "Rows parsed by the stage during the last run."),
+            ("rows_written", "Rows written by the stage during the last run."),
+            (
+                "process_peak_rss_bytes",
+                "Peak RSS of the whole process so far when the stage ended.",
+            ),
+            ("success", "Whether the stage succeeded during the last run."),
+        ]
+        stages = self.summary()
+        lines = []
+        for metric, description in families:
+            name = f"{METRIC_PREFIX}_{metric}"
+            lines.append(f"# HELP {name} {description}")
+            lines.append(f"# TYPE {name} gauge")
+            for stage, values in stages.items():
+                if values.get(metric) is not None:
+                    lines.append(f'{name}{{stage="{stage}"}} {values[metric]}')
+        lines.append("# HELP wiki_run_timestamp_seconds End time of the last run.")
+        lines.append("# TYPE wiki_run_timestamp_seconds gauge")
+        lines.append(f"wiki_run_timestamp_seconds {time.time():.3f}")
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self):
+        """
+        Rewrite the Prometheus textfile, if one is configured.
+
+        The file is replaced atomically, so the collector never reads a
+        partial file.
+
+        Returns:
+            bool: True if the file was written.
+        """
+        if not self.prometheus_path:
+            return False
+        with atomic_output(self.prometheus_path) as tmp_path:
+            with open(tmp_path, "w") as f:
+                f.write(self.prometheus_text())
+        logging.info(f"Wrote Prometheus metrics to {self.prometheus_path}")
+        return True
+
+
+def configure_metrics(jsonl_path=None, prometheus_path=None):
+    """
+    Replace the shared recorder with one writing to the given files.
+
+    Args:
+        jsonl_path (str, optional): File each finished span is appended to.
+        prometheus_path (str, optional): Prometheus textfile of the run.
+
+    Returns:
+        MetricsRecorder: The new shared recorder.
+    """
+    global _recorder
+    _recorder = MetricsRecorder(jsonl_path, prometheus_path)
+    return _recorder
+
+
+def get_recorder():
+    """
+    Return the shared recorder, creating one that only keeps spans in memory on first use.
+
+    Returns:
+        MetricsRecorder: The shared recorder.
+    """
+    global _recorder
+    if _recorder is None:
+        _recorder = MetricsRecorder()
+    return _recorder
+
+
+def span(name):
+    """
+    Measure a stage with the shared recorder.
+
+    Args:
+        name (str): Name of the stage.
+
+    Returns:
+        contextmanager: The span context of MetricsRecorder.span().
+    """
+    return get_recorder().span(name)
+
+
+def timed(name=None):
+    """
+    Decorate a function so that each call is measured as a stage.
+
+    Args:
+        name (str, optional): Name of the stage, the function name by default.
+
+    Returns:
+        callable: The decorator.
+    """
+
+    def decorator(function):
+        @wraps(function)
+        def wrapper(*args, **kwargs):
+            with span(name or function.__name__):
+                return function(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,381 @@
+"""
+HTML parsing backends for the Wiki module.
+
+This module extracts the rows of the first wikitable on a page, or of the
+first table with another CSS class. The cells of a row are its <td>
+elements and its row headers (<th scope="row">), which lists such as the
+highest-grossing films use for the title. The backend only changes how the
+HTML is parsed, every backend returns the same rows:
+
+- "html.parser": BeautifulSoup over the whole page (the original behaviour).
+- "strainer": BeautifulSoup with a SoupStrainer, so only wikitables are built.
+- "lxml": lxml.html directly, without a BeautifulSoup tree. Requires lxml.
+- "stream": an incremental html.parser.HTMLParser that yields rows as soon
+  as they are closed and stops reading after the wikitable (see
+  iter_wikitable_rows). Text inside tables nested in a cell is kept as part
+  of that cell rather than reported as extra cells.
+
+parse_pages() parses many pages on a process pool, since parsing is
+CPU-bound and threads would serialize on the GIL.
+"""
+
+import codecs
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from html.parser import HTMLParser
+
+from bs4 import BeautifulSoup, SoupStrainer
+
+PARSER_BACKENDS = ("html.parser", "strainer", "lxml", "stream")
+DEFAULT_PARSER = "html.parser"
+
+DEFAULT_TABLE_CLASS = "wikitable"
+
+_TABLE_XPATH = "//table[contains(concat(' ', normalize-space(@class), ' '), ' {} ')]"
+
+
+def table_strainer(css_class):
+    """
+    Build a SoupStrainer keeping only the tables with the given CSS class.
+
+    SoupStrainer matches the raw class attribute, so a plain class_ filter
+    would miss tables such as class="wikitable sortable".
+
+    Args:
+        css_class (str): The CSS class to keep.
+
+    Returns:
+        bs4.SoupStrainer: The strainer.
+    """
+    pattern = re.compile(rf"(^|\s){re.escape(css_class)}(\s|$)")
+    return SoupStrainer("table", class_=pattern)
+
+
+def _is_cell(tag):
+    """
+    Tell whether a BeautifulSoup tag is a cell of a data row.
+
+    Args:
+        tag (bs4.Tag): The tag to check.
+
+    Returns:
+        bool: True for <td> elements and row headers.
+    """
+    return tag.name == "td" or (tag.name == "th" and tag.get("scope") == "row")
+
+
+def _rows_from_soup(table):
+    """
+    Extract the data rows of a BeautifulSoup wikitable.
+
+    Args:
+        table (bs4.Tag): The wikitable element.
+
+    Returns:
+        list: A (cells, href) tuple per row after the header row.
+    """
+    rows = []
+    for tr in table.find("tbody").find_all("tr")[1:]:
+        tds = tr.find_all(_is_cell)
+        link = tds[0].find("a", href=True) if tds else None
+        rows.append(([td.text.strip() for td in tds], link["href"] if link else None))
+    return rows
+
+
+def _rows_from_lxml(content, table_class=DEFAULT_TABLE_CLASS):
+    """
+    Extract the data rows of the first wikitable with lxml.
+
+    Args:
+        content (bytes or str): The page HTML.
+        table_class (str): CSS class of the table.
+
+    Returns:
+        list or None: A (cells, href) tuple per row after the header row,
+                      or None if the page has no wikitable.
+
+    Raises:
+        ImportError: If lxml is not installed.
+    """
+    try:
+        import lxml.html
+    except ImportError as e:
+        raise ImportError("The 'lxml' parser backend requires the lxml package.") from e
+
+    tables = lxml.html.fromstring(content).xpath(_TABLE_XPATH.format(table_class))
+    if not tables:
+        return None
+    # BeautifulSoup leaves style and script contents out of .text
+    for element in tables[0].xpath(".//style|.//script"):
+        element.drop_tree()
+
+    rows = []
+    for tr in tables[0].find(".//tbody").iterfind(".//tr"):
+        tds = tr.xpath(".//td|.//th[@scope='row']")
+        links = tds[0].xpath(".//a[@href]") if tds else []
+        rows.append(
+            (
+                [td.text_content().strip() for td in tds],
+                links[0].get("href") if links else None,
+            )
+        )
+    return rows[1:]
+
+
+class WikitableRowParser(HTMLParser):
+    """
+    Incremental parser collecting the rows of the first wikitable fed to it.
+
+    Completed rows are buffered until taken with pop_rows(); `found` and
+    `done` report whether the wikitable has started and ended.
+    """
+
+    def __init__(self, table_class=DEFAULT_TABLE_CLASS):
+        """
+        Initialize a WikitableRowParser instance.
+
+        Args:
+            table_class (str): CSS class of the table to collect.
+        """
+        super().__init__(convert_charrefs=True)
+        self.table_class = table_class
+        self.found = False
+        self.done = False
+        self._rows = []
+        self._depth = 0  # Table nesting depth inside the wikitable
+        self._tbody = None  # None before, True inside, False after the first tbody
+        self._skip = 0  # Depth of style/script elements being ignored
+        self._row_count = 0
+        self._cells = None
+        self._cell = None
+        self._href = None
+
+    def handle_starttag(self, tag, attrs):
+        if self.done:
+            return
+        if tag == "table":
+            if self._depth:
+                self._depth += 1
+            elif self.table_class in (dict(attrs).get("class") or "").split():
+                self.found = True
+                self._depth = 1
+            return
+        if not self._depth:
+            return
+        if tag in ("style", "script"):
+            self._skip += 1
+        elif tag == "a" and self._cell is not None and self._href is None:
+            if not self._cells:
+                self._href = dict(attrs).get("href")
+        elif self._depth == 1:
+            if tag == "tbody" and self._tbody is None:
+                self._tbody = True
+            elif tag == "tr" and self._tbody:
+                self._end_row()
+                self._cells = []
+            elif self._cells is not None and (
+                tag == "td" or (tag == "th" and dict(attrs).get("scope") == "row")
+            ):
+                self._end_cell()
+                self._cell = []
+
+    def handle_endtag(self, tag):
+        if not self._depth:
+            return
+        if tag == "table":
+            self._depth -= 1
+            if not self._depth:
+                self._end_row()
+                self.done = True
+        elif tag in ("style", "script"):
+            self._skip = max(self._skip - 1, 0)
+        elif self._depth == 1:
+            if tag in ("td", "th"):
+                self._end_cell()
+            elif tag == "tr":
+                self._end_row()
+            elif tag == "tbody" and self._tbody:
+                self._end_row()
+                self._tbody = False
+
+    def handle_data(self, data):
+        if self._cell is not None and not self._skip:
+            self._cell.append(data)
+
+    def _end_cell(self):
+        if self._cell is not None:
+            self._cells.append("".join(self._cell).strip())
+            self._cell = None
+
+    def _end_row(self):
+        if self._cells is None:
+            return
+        self._end_cell()
+        if self._row_count:  # Skip the header row
+            self._rows.append((self._cells, self._href))
+        self._row_count += 1
+        self._cells = None
+        self._href = None
+
+    def pop_rows(self):
+        """
+        Take the rows completed since the previous call.
+
+        Returns:
+            list: A (cells, href) tuple per completed row.
+        """
+        rows, self._rows = self._rows, []
+        return rows
+
+
+def iter_wikitable_rows(chunks, encoding="utf-8", table_class=DEFAULT_TABLE_CLASS):
+    """
+    Yield the rows of the first wikitable while the page is still being read.
+
+    Reading stops as soon as the wikitable is closed, so the rest of the page
+    is never downloaded or parsed.
+
+    Args:
+        chunks (iterable): The page HTML as bytes or str chunks, e.g.
+                           response.iter_content(chunk_size).
+        encoding (str): Encoding used to decode bytes chunks.
+        table_class (str): CSS class of the table.
+
+    Yields:
+        tuple: A (cells, href) tuple per row after the header row, as
+               returned by parse_wikitable_rows.
+
+    Raises:
+        Exception: If the page has no wikitable.
+    """
+    decoder = codecs.getincrementaldecoder(encoding)(errors="replace")
+    parser = WikitableRowParser(table_class)
+    for chunk in chunks:
+        parser.feed(decoder.decode(chunk) if isinstance(chunk, bytes) else chunk)
+        yield from parser.pop_rows()
+        if parser.done:
+            break
+    else:
+        parser.feed(decoder.decode(b"", final=True))
+        parser.close()
+        yield from parser.pop_rows()
+
+    if not parser.found:
+        raise Exception("Unable to find the wikitable on the page.")
+
+
+def parse_wikitable_rows(
+    content, backend=DEFAULT_PARSER, table_class=DEFAULT_TABLE_CLASS
+):
+    """
+    Extract the rows of the first wikitable on a page.
+
+    Args:
+        content (bytes or str): The page HTML.
+        backend (str): One of PARSER_BACKENDS.
+        table_class (str): CSS class of the table, "wikitable" by default.
+
+    Returns:
+        list: A (cells, href) tuple per row after the header row, where cells
+              is the list of stripped <td> texts and href is the first link
+              in the first cell, or None.
+
+    Raises:
+        ValueError: If the backend is not one of PARSER_BACKENDS.
+        Exception: If the page has no wikitable.
+    """
+    if backend not in PARSER_BACKENDS:
+        raise ValueError(
+            f"Unknown parser backend {backend!r}, expected one of {PARSER_BACKENDS}."
+        )
+
+    if backend == "stream":
+        return list(iter_wikitable_rows([content], table_class=table_class))
+    if backend == "lxml":
+        rows = _rows_from_lxml(content, table_class)
+    else:
+        parse_only = table_strainer(table_class) if backend == "strainer" else None
+        soup = BeautifulSoup(content, features="html.parser", parse_only=parse_only)
+        table = soup.find("table", class_=table_class)
+        rows = _rows_from_soup(table) if table else None
+
+    if rows is None:
+        raise Exception("Unable to find the wikitable on the page.")
+    return rows
+
+
+def _parse_page(job):
+    """
+    Parse one page in a worker process.
+
+    Args:
+        job (tuple): The (content, backend, table_class) to parse.
+
+    Returns:
+        list: A (cells, href) tuple per row, with cells as a tuple.
+    """
+    content, backend, table_class = job
+    return [
+        (tuple(cells), href)
+        for cells, href in parse_wikitable_rows(content, backend, table_class)
+    ]
+
+
+def parse_pages(
+    pages,
+    workers=None,
+    backend=DEFAULT_PARSER,
+    table_class=DEFAULT_TABLE_CLASS,
+    return_exceptions=False,
+):
+    """
+    Extract the table rows of many pages on a process pool.
+
+    Only the raw page bytes are sent to the workers and only the row tuples
+    come back, so little besides the parsing itself crosses process
+    boundaries. With a single worker or page, the pages are parsed in the
+    calling process.
+
+    Args:
+        pages (iterable): The pages HTML, as bytes or str.
+        workers (int, optional): Number of worker processes, os.cpu_count() by default.
+        backend (str): One of PARSER_BACKENDS.
+        table_class (str or list): CSS class of the table, or one per page.
+        return_exceptions (bool): Whether to return the exception raised for a
+                                  page in its place instead of raising it.
+
+    Returns:
+        list: The rows of each page, in page order, as returned by
+              parse_wikitable_rows but with the cells as tuples.
+
+    Raises:
+        Exception: If a page has no table and return_exceptions is not set.
+    """
+    pages = list(pages)
+    if isinstance(table_class, str):
+        table_class = [table_class] * len(pages)
+    jobs = [(page, backend, css_class) for page, css_class in zip(pages, table_class)]
+    workers = min(workers or os.cpu_count() or 1, len(jobs))
+
+    results = []
+    if workers <= 1:
+        for job in jobs:
+            try:
+                results.append(_parse_page(job))
+            except Exception as e:
+                if not return_exceptions:
+                    raise
+                results.append(e)
+        return results
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(_parse_page, job) for job in jobs]
+        for future in futures:
+            try:
+                results.append(future.result())
+            except Exception as e:
+                if not return_exceptions:
+                    raise
+                results.append(e)
+    return results
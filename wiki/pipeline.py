@@ -0,0 +1,267 @@
+"""
+Stage runner for the Wiki module.
+
+A Pipeline is a dependency graph of stages. Every stage whose dependencies
+have finished is started on a thread pool, so independent stages, such as
+the database load and the file exports, run concurrently. With a checkpoint
+directory, the output of each finished stage is pickled; if the run fails,
+the next run with the same key loads those outputs instead of running the
+stages again and resumes from the stages that did not finish. Checkpoints
+are cleared once a run completes.
+"""
+
+import json
+import logging
+import os
+import pickle
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from .utils import atomic_output
+
+DEFAULT_CHECKPOINT_DIR = "./data/checkpoints"
+DEFAULT_MAX_WORKERS = 4
+
+
+class StopPipeline(Exception):
+    """
+    Raised by a stage to end the run early without failing it, e.g. when
+    there is nothing to do.
+    """
+
+
+class Stage:
+    """
+    One step of a Pipeline.
+    """
+
+    def __init__(self, name, function, requires=(), checkpoint=True):
+        """
+        Initialize a Stage instance.
+
+        Args:
+            name (str): Unique name of the stage in its pipeline.
+            function (callable): Called with the outputs of the required
+                                 stages, in the order of `requires`.
+            requires (tuple): Names of the stages that must finish first.
+            checkpoint (bool): Whether the output is saved so a resumed run
+                               skips the stage. Stages with unpicklable outputs,
+                               or that are cheap and must always run, opt out.
+        """
+        self.name = name
+        self.function = function
+        self.requires = tuple(requires)
+        self.checkpoint = checkpoint
+
+    def __repr__(self):
+        return f"Stage({self.name!r}, requires={self.requires!r})"
+
+
+class Pipeline:
+    """
+    Dependency graph of stages run concurrently, with optional checkpoints.
+    """
+
+    def __init__(
+        self, stages, checkpoint_dir=None, key=None, max_workers=DEFAULT_MAX_WORKERS
+    ):
+        """
+        Initialize a Pipeline instance.
+
+        Args:
+            stages (iterable): The Stage objects.
+            checkpoint_dir (str, optional): Directory holding the checkpoints;
+                                            None disables them.
+            key (str, optional): Identifies the settings of the run. Checkpoints
+                                 saved under another key are discarded.
+            max_workers (int): Maximum number of stages running at once.
+
+        Raises:
+            ValueError: If stage names repeat, a requirement is unknown, or
+                        the requirements form a cycle.
+        """
+        self.stages = {}
+        for stage in stages:
+            if stage.name in self.stages:
+                raise ValueError(f"Duplicate stage {stage.name!r}.")
+            self.stages[stage.name] = stage
+        for stage in self.stages.values():
+            for name in stage.requires:
+                if name not in self.stages:
+                    raise ValueError(f"Stage {stage.name!r} requires unknown {name!r}.")
+        self._check_acyclic()
+
+        self.checkpoint_dir = checkpoint_dir
+        self.key = key
+        self.max_workers = max_workers
+        self.stopped = False
+
+    def _check_acyclic(self):
+        """
+        Check that the requirements have no cycle.
+
+        Raises:
+            ValueError: If a stage depends on itself, directly or not.
+        """
+        resolved = set()
+        remaining = dict(self.stages)
+        while remaining:
+            ready = [
+                name
+                for name, stage in remaining.items()
+                if resolved.issuperset(stage.requires)
+            ]
+            if not ready:
+                raise ValueError(
+                    f"The requirements of {sorted(remaining)} form a cycle."
+                )
+            for name in ready:
+                resolved.add(name)
+                del remaining[name]
+
+    @property
+    def _manifest_path(self):
+        return os.path.join(self.checkpoint_dir, "manifest.json")
+
+    def _checkpoint_path(self, name):
+        return os.path.join(self.checkpoint_dir, f"{name}.pickle")
+
+    def _read_manifest(self):
+        """
+        Load the checkpoint manifest.
+
+        Returns:
+            dict: The "key" of the checkpointed run and its finished "stages",
+                  empty if there is no checkpoint.
+        """
+        try:
+            with open(self._manifest_path) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def load_checkpoints(self):
+        """
+        Load the outputs checkpointed by an earlier run with the same key.
+
+        Returns:
+            dict: Outputs keyed by stage name.
+        """
+        if self.checkpoint_dir is None:
+            return {}
+        manifest = self._read_manifest()
+        if not manifest:
+            return {}
+        if manifest.get("key") != self.key:
+            logging.info("Discarding checkpoints saved with other settings.")
+            self.clear_checkpoints()
+            return {}
+
+        outputs = {}
+        for name in manifest.get("stages", []):
+            stage = self.stages.get(name)
+            if stage is None or not stage.checkpoint:
+                continue
+            try:
+                with open(self._checkpoint_path(name), "rb") as f:
+                    outputs[name] = pickle.load(f)
+            except (OSError, pickle.UnpicklingError, EOFError):
+                continue
+            logging.info(f"Resuming with the checkpointed output of {name}.")
+        return outputs
+
+    def save_checkpoint(self, name, output):
+        """
+        Save the output of a finished stage and add it to the manifest.
+
+        Args:
+            name (str): Name of the stage.
+            output: The stage output, which must be picklable.
+        """
+        if self.checkpoint_dir is None or not self.stages[name].checkpoint:
+            return
+        try:
+            with atomic_output(self._checkpoint_path(name)) as tmp_path:
+                with open(tmp_path, "wb") as f:
+                    pickle.dump(output, f, protocol=pickle.HIGHEST_PROTOCOL)
+        except (pickle.PicklingError, TypeError, AttributeError) as e:
+            # The stage simply runs again on resume
+            logging.warning(f"Could not checkpoint the output of {name}: {str(e)}")
+            return
+
+        manifest = self._read_manifest()
+        finished = manifest.get("stages", []) if manifest.get("key") == self.key else []
+        with atomic_output(self._manifest_path) as tmp_path:
+            with open(tmp_path, "w") as f:
+                json.dump({"key": self.key, "stages": [*finished, name]}, f)
+
+    def clear_checkpoints(self):
+        """
+        Remove every checkpoint file of the pipeline.
+        """
+        if self.checkpoint_dir is None:
+            return
+        paths = [self._manifest_path]
+        paths += [self._checkpoint_path(name) for name in self.stages]
+        for path in paths:
+            if os.path.exists(path):
+                os.remove(path)
+
+    def run(self):
+        """
+        Run every stage once its requirements have finished.
+
+        When a stage fails, no new stage is started; the running ones are
+        allowed to finish and are checkpointed, then the first error is
+        raised. A stage raising StopPipeline ends the run the same way
+        without an error and sets `stopped`.
+
+        Returns:
+            dict: Outputs keyed by stage name, including checkpointed ones.
+
+        Raises:
+            Exception: The first error raised by a stage.
+        """
+        outputs = self.load_checkpoints()
+        pending = {
+            name: stage
+            for name, stage in self.stages.items()
+            if name not in outputs or not stage.checkpoint
+        }
+        for name in pending:
+            outputs.pop(name, None)
+
+        self.stopped = False
+        failure = None
+        running = {}
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            while True:
+                if failure is None and not self.stopped:
+                    for name, stage in list(pending.items()):
+                        if all(required in outputs for required in stage.requires):
+                            del pending[name]
+                            inputs = [outputs[required] for required in stage.requires]
+                            running[executor.submit(stage.function, *inputs)] = stage
+                if not running:
+                    break
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    stage = running.pop(future)
+                    try:
+                        output = future.result()
+                    except StopPipeline as e:
+                        logging.info(f"Pipeline stopped by {stage.name}: {str(e)}")
+                        self.stopped = True
+                        continue
+                    except Exception as e:
+                        logging.error(f"Stage {stage.name} failed: {str(e)}")
+                        failure = failure or e
+                        continue
+                    outputs[stage.name] = output
+                    self.save_checkpoint(stage.name, output)
+
+        if failure is not None:
+            raise failure
+        # The run is complete, so there is nothing left to resume
+        self.clear_checkpoints()
+        return outputs
@@ -0,0 +1,274 @@
+"""
+Film record types for the Wiki module.
+
+FilmRecord is the row type of the films table. It is a NamedTuple, so it
+takes no more memory than a plain tuple and works wherever tuples in
+(id, film, year, awards, nominations) order are expected. FilmBatch holds
+many films column by column: the ids and titles as lists, and year, awards
+and nominations as int64 NumPy arrays with a boolean mask of the missing
+values. A batch turns into a DataFrame without copying the numeric columns
+and into database parameters without building ORM objects.
+"""
+
+import operator
+from typing import NamedTuple, Optional, Union
+
+# Columns held as int64 arrays with a missing-value mask
+NUMERIC_FIELDS = ("year", "awards", "nominations")
+
+# Number of records converted at a time by FilmBatch.iter_params
+DEFAULT_CHUNK_SIZE = 1000
+
+
+class FilmRecord(NamedTuple):
+    """
+    One row of the academy_award_winning_films table.
+    """
+
+    id: Union[str, int]
+    film: str
+    year: Optional[int] = None
+    awards: Optional[int] = None
+    nominations: Optional[int] = None
+
+
+def _masked_array(values):
+    """
+    Convert a column of integers with missing values to an array and a mask.
+
+    Args:
+        values (iterable): Integers and None/NaN/NA, e.g. a nullable Int64 Series.
+
+    Returns:
+        tuple: The int64 values (0 where missing) and the boolean mask, True
+               where a value is missing.
+    """
+    import numpy as np
+    import pandas as pd
+
+    array = pd.array(values, dtype="Int64")
+    mask = np.asarray(array.isna(), dtype=bool)
+    return array.to_numpy(dtype="int64", na_value=0), mask
+
+
+class FilmBatch:
+    """
+    Columnar container of film records.
+
+    Iterating a batch yields FilmRecord tuples, so it can be passed to
+    initDB and the export writers like a list of records. Like a list, it
+    can be indexed and sliced, compares equal to the same records, and is
+    unhashable.
+    """
+
+    __hash__ = None
+
+    def __init__(self, ids, films, values, masks):
+        """
+        Initialize a FilmBatch instance.
+
+        Args:
+            ids (list): Film ids.
+            films (list): Film titles.
+            values (dict): int64 NumPy arrays keyed by NUMERIC_FIELDS name.
+            masks (dict): Boolean NumPy arrays keyed by NUMERIC_FIELDS name,
+                          True where the value is missing.
+
+        Raises:
+            ValueError: If the columns differ in length.
+        """
+        self.ids = list(ids)
+        self.films = list(films)
+        self.values = values
+        self.masks = masks
+        lengths = {len(self.ids), len(self.films)}
+        for field in NUMERIC_FIELDS:
+            lengths |= {len(values[field]), len(masks[field])}
+        if len(lengths) > 1:
+            raise ValueError(
+                "All the columns of a FilmBatch must have the same length."
+            )
+
+    @classmethod
+    def from_columns(cls, columns):
+        """
+        Build a batch from columns of values.
+
+        Args:
+            columns (dict): Lists or arrays keyed by FilmRecord field name. The
+                            numeric ones may hold None or NaN for missing values,
+                            or be nullable Int64 Series as returned by
+                            wiki.utils.clean_numeric_column. Missing numeric
+                            columns are all missing.
+
+        Returns:
+            FilmBatch: The batch.
+        """
+        ids = list(columns["id"])
+        values, masks = {}, {}
+        for field in NUMERIC_FIELDS:
+            column = columns.get(field)
+            if column is None:
+                column = [None] * len(ids)
+            values[field], masks[field] = _masked_array(column)
+        return cls(ids, columns["film"], values, masks)
+
+    @classmethod
+    def from_records(cls, records):
+        """
+        Build a batch from records.
+
+        Args:
+            records (iterable): FilmRecord or plain tuples in FilmRecord field
+                                order, or a FilmBatch, which is returned as is.
+
+        Returns:
+            FilmBatch: The batch.
+        """
+        if isinstance(records, cls):
+            return records
+        records = list(records)
+        columns = {
+            field: [record[i] for record in records]
+            for i, field in enumerate(FilmRecord._fields)
+        }
+        return cls.from_columns(columns)
+
+    @classmethod
+    def concat(cls, batches):
+        """
+        Join batches into one.
+
+        Args:
+            batches (iterable): The FilmBatch objects, in order.
+
+        Returns:
+            FilmBatch: A batch with the films of every batch.
+        """
+        import numpy as np
+
+        batches = list(batches)
+        if len(batches) == 1:
+            return batches[0]
+        if not batches:
+            return cls.from_columns({"id": [], "film": []})
+        return cls(
+            [film_id for batch in batches for film_id in batch.ids],
+            [film for batch in batches for film in batch.films],
+            {f: np.concatenate([b.values[f] for b in batches]) for f in NUMERIC_FIELDS},
+            {f: np.concatenate([b.masks[f] for b in batches]) for f in NUMERIC_FIELDS},
+        )
+
+    def column(self, field, start=0, stop=None):
+        """
+        Return one column, or a slice of it, as plain Python values.
+
+        Args:
+            field (str): A FilmRecord field name.
+            start (int): Index of the first value.
+            stop (int, optional): Index after the last value, the end by default.
+
+        Returns:
+            list: The values, with None where a numeric value is missing.
+        """
+        if field == "id":
+            return self.ids[start:stop]
+        if field == "film":
+            return self.films[start:stop]
+        values = self.values[field][start:stop].tolist()
+        for i in self.masks[field][start:stop].nonzero()[0].tolist():
+            values[i] = None
+        return values
+
+    def __len__(self):
+        return len(self.ids)
+
+    def __iter__(self):
+        columns = [self.column(field) for field in FilmRecord._fields]
+        return map(FilmRecord._make, zip(*columns))
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            # NumPy slices are views, so the arrays are not copied
+            return FilmBatch(
+                self.ids[index],
+                self.films[index],
+                {f: self.values[f][index] for f in NUMERIC_FIELDS},
+                {f: self.masks[f][index] for f in NUMERIC_FIELDS},
+            )
+        try:
+            index = operator.index(index)
+        except TypeError:
+            raise TypeError(
+                f"FilmBatch indices must be integers or slices, not {type(index).__name__}."
+            ) from None
+        return FilmRecord(
+            self.ids[index],
+            self.films[index],
+            *(
+                None if self.masks[f][index] else int(self.values[f][index])
+                for f in NUMERIC_FIELDS
+            ),
+        )
+
+    def __eq__(self, other):
+        # Equal to another batch or a list holding the same records
+        if isinstance(other, FilmBatch):
+            other = list(other)
+        elif not isinstance(other, list):
+            return NotImplemented
+        return list(self) == other
+
+    def __repr__(self):
+        return f"FilmBatch({len(self)} films)"
+
+    def to_params(self, start=0, stop=None):
+        """
+        Return the records, or a slice of them, as database parameters.
+
+        Args:
+            start (int): Index of the first record.
+            stop (int, optional): Index after the last record, the end by default.
+
+        Returns:
+            list: One dict of column values per film, as accepted by
+                  Session.execute() for an executemany INSERT.
+        """
+        columns = [self.column(field, start, stop) for field in FilmRecord._fields]
+        return [dict(zip(FilmRecord._fields, row)) for row in zip(*columns)]
+
+    def iter_params(self, chunk_size=DEFAULT_CHUNK_SIZE):
+        """
+        Iterate over the database parameters, converting a chunk at a time.
+
+        Only one chunk of parameter dicts is held in memory at once.
+
+        Args:
+            chunk_size (int): Number of records converted together.
+
+        Yields:
+            dict: Column values of one film.
+        """
+        for start in range(0, len(self), chunk_size):
+            yield from self.to_params(start, start + chunk_size)
+
+    def to_dataframe(self):
+        """
+        Return the batch as a DataFrame.
+
+        The numeric columns are backed by the batch arrays, without a copy:
+        int64 columns, or nullable Int64 ones when values are missing.
+
+        Returns:
+            pd.DataFrame: One row per film, in FilmRecord field order.
+        """
+        import pandas as pd
+
+        data = {"id": self.ids, "film": self.films}
+        for field in NUMERIC_FIELDS:
+            values, mask = self.values[field], self.masks[field]
+            # Columns without gaps stay plain int64, which exports faster than Int64
+            if mask.any():
+                values = pd.arrays.IntegerArray(values, mask, copy=False)
+            data[field] = values
+        return pd.DataFrame(data, columns=list(FilmRecord._fields), copy=False)
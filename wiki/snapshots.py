@@ -0,0 +1,166 @@
+"""
+HTML snapshot archive for the Wiki module.
+
+This module keeps a local archive of fetched pages so that a run can be
+replayed without the network. Page bodies are gzip-compressed and stored
+once per distinct content under their SHA-256, and an index maps each URL
+to the digest of its latest snapshot. configure_snapshots() switches
+fetchPage between recording fetched pages into a store and replaying
+them from it.
+"""
+
+import gzip
+import hashlib
+import json
+import logging
+import os
+import threading
+from datetime import datetime, timezone
+
+from .utils import atomic_output
+
+DEFAULT_SNAPSHOT_DIR = "./data/snapshots"
+
+# Supported modes for configure_snapshots
+SNAPSHOT_MODES = ("record", "replay")
+
+_store = None
+_mode = None
+
+
+class SnapshotStore:
+    """
+    Content-addressed archive of page bodies keyed by URL.
+
+    Bodies are stored as `objects/<sha256>.html.gz`, so identical pages
+    fetched from several URLs or on several runs are kept once. `index.json`
+    maps each URL to the digest and fetch time of its latest snapshot.
+    """
+
+    def __init__(self, directory=DEFAULT_SNAPSHOT_DIR):
+        """
+        Initialize a SnapshotStore instance.
+
+        Args:
+            directory (str, optional): Directory holding the archive.
+                                       Defaults to './data/snapshots'.
+        """
+        self.directory = directory
+        self.index_path = os.path.join(directory, "index.json")
+        self._lock = threading.Lock()
+
+    def object_path(self, digest):
+        """
+        Return the path of the compressed body with the given digest.
+
+        Args:
+            digest (str): SHA-256 hex digest of the uncompressed body.
+
+        Returns:
+            str: The path of the object file.
+        """
+        return os.path.join(self.directory, "objects", f"{digest}.html.gz")
+
+    def read_index(self):
+        """
+        Load the URL index.
+
+        Returns:
+            dict: Entries with the "sha256" and "fetched_at" of each URL's
+                  snapshot, empty if nothing was recorded yet.
+        """
+        try:
+            with open(self.index_path) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def save(self, url, content):
+        """
+        Store the body of a page and point its URL at it.
+
+        The body is only written when no snapshot with the same content exists.
+
+        Args:
+            url (str): The fetched URL.
+            content (bytes): The page body.
+
+        Returns:
+            str: SHA-256 hex digest of the body.
+        """
+        digest = hashlib.sha256(content).hexdigest()
+        path = self.object_path(digest)
+        if not os.path.exists(path):
+            with atomic_output(path) as tmp_path:
+                # A fixed mtime keeps the archive byte-for-byte reproducible
+                with gzip.GzipFile(tmp_path, "wb", mtime=0) as f:
+                    f.write(content)
+
+        with self._lock:
+            index = self.read_index()
+            index[url] = {
+                "sha256": digest,
+                "fetched_at": datetime.now(timezone.utc).isoformat(),
+            }
+            with atomic_output(self.index_path) as tmp_path:
+                with open(tmp_path, "w") as f:
+                    json.dump(index, f, indent=2, sort_keys=True)
+        logging.info(f"Saved snapshot of {url}")
+        return digest
+
+    def load(self, url):
+        """
+        Load the latest snapshot of a URL.
+
+        Args:
+            url (str): The recorded URL.
+
+        Returns:
+            bytes or None: The page body, or None if the URL was never recorded.
+        """
+        entry = self.read_index().get(url)
+        if entry is None:
+            return None
+        try:
+            with gzip.open(self.object_path(entry["sha256"]), "rb") as f:
+                return f.read()
+        except OSError:
+            return None
+
+    def __contains__(self, url):
+        return url in self.read_index()
+
+
+def configure_snapshots(store=None, mode=None):
+    """
+    Make fetchPage record pages into a snapshot store or replay them from it.
+
+    Args:
+        store (SnapshotStore, optional): The archive to use.
+        mode (str, optional): "record" to save every page fetched from the
+                              network, "replay" to serve pages from the store
+                              without any request, or None to disable snapshots.
+
+    Raises:
+        ValueError: If the mode is unknown or no store is given for it.
+    """
+    global _store, _mode
+    if mode is not None and mode not in SNAPSHOT_MODES:
+        raise ValueError(
+            f"Unknown snapshot mode {mode!r}, expected one of {SNAPSHOT_MODES}."
+        )
+    if mode is not None and store is None:
+        raise ValueError(f"The {mode} snapshot mode needs a SnapshotStore.")
+    _store, _mode = store, mode
+    if mode is not None:
+        logging.info(f"Snapshot {mode} mode enabled ({store.directory})")
+
+
+def get_snapshots():
+    """
+    Return the snapshot store and mode used by fetchPage.
+
+    Returns:
+        tuple: The (store, mode) pair, (None, None) when snapshots are disabled.
+    """
+    return _store, _mode
@@ -0,0 +1,446 @@
+"""
+Scrape sources for the Wiki module.
+
+A ScrapeSource declares where a Wikipedia film table lives and how its cells
+map to the columns of a database table, so a new list only needs a new
+entry in the registry rather than a new scrape function. The Oscar-winning
+films list and the highest-grossing films list are registered here.
+scrape_sources() runs any number of sources in parallel, fetching on threads
+and parsing on processes.
+"""
+
+import logging
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from urllib.parse import urljoin
+
+from . import fetchPage
+from .parsing import (
+    DEFAULT_PARSER,
+    DEFAULT_TABLE_CLASS,
+    parse_pages,
+    parse_wikitable_rows,
+)
+from .records import FilmBatch
+from .utils import DEFAULT_BATCH_SIZE, batched, clean_numeric_column, make_film_id
+
+DEFAULT_MAX_WORKERS = 4
+
+
+class ScrapeSource:
+    """
+    Declaration of one Wikipedia table to scrape.
+    """
+
+    def __init__(
+        self,
+        name,
+        url,
+        columns,
+        numeric_columns=(),
+        target_table="academy_award_winning_films",
+        table_class=DEFAULT_TABLE_CLASS,
+        title_column="film",
+        year_column="year",
+    ):
+        """
+        Initialize a ScrapeSource instance.
+
+        Args:
+            name (str): Unique name of the source in the registry.
+            url (str): URL of the page holding the table.
+            columns (dict): Cell index in each row keyed by output column name,
+                            in output order.
+            numeric_columns (tuple): Columns cleaned to integers with
+                                     wiki.utils.clean_numeric_column.
+            target_table (str): Database table the records are loaded into.
+            table_class (str): CSS class selecting the first matching table.
+            title_column (str): Column holding the film title, used for the ids.
+            year_column (str): Column holding the year, used for the ids; it
+                               may be missing from columns.
+        """
+        self.name = name
+        self.url = url
+        self.columns = dict(columns)
+        self.numeric_columns = tuple(numeric_columns)
+        self.target_table = target_table
+        self.table_class = table_class
+        self.title_column = title_column
+        self.year_column = year_column
+
+    @property
+    def min_cells(self):
+        """
+        int: Number of cells a row needs to fill every column.
+        """
+        return max(self.columns.values()) + 1
+
+    @property
+    def record_columns(self):
+        """
+        list: Names of the values in each record, the id first.
+        """
+        return ["id", *self.columns]
+
+    def __repr__(self):
+        return f"ScrapeSource({self.name!r}, {self.url!r})"
+
+
+OSCAR_FILMS_URL = (
+    "https://en.wikipedia.org/wiki/List_of_Academy_Award%E2%80%93winning_films"
+)
+
+OSCAR_WINNING_FILMS = ScrapeSource(
+    "oscar_winning_films",
+    OSCAR_FILMS_URL,
+    columns={"film": 0, "year": 1, "awards": 2, "nominations": 3},
+    numeric_columns=("year", "awards", "nominations"),
+)
+
+HIGHEST_GROSSING_FILMS_URL = (
+    "https://en.wikipedia.org/wiki/List_of_highest-grossing_films"
+)
+
+# Rank, peak, title (a row header), worldwide gross, year and references
+HIGHEST_GROSSING_FILMS = ScrapeSource(
+    "highest_grossing_films",
+    HIGHEST_GROSSING_FILMS_URL,
+    columns={"film": 2, "year": 4, "gross": 3},
+    numeric_columns=("year", "gross"),
+    target_table="highest_grossing_films",
+)
+
+# Registered sources keyed by name
+SOURCES = {}
+
+
+def register_source(source):
+    """
+    Add a source to the registry.
+
+    Args:
+        source (ScrapeSource): The source to register.
+
+    Returns:
+        ScrapeSource: The registered source.
+
+    Raises:
+        ValueError: If another source is registered under the same name.
+    """
+    if SOURCES.get(source.name, source) is not source:
+        raise ValueError(f"A source named {source.name!r} is already registered.")
+    SOURCES[source.name] = source
+    return source
+
+
+register_source(OSCAR_WINNING_FILMS)
+register_source(HIGHEST_GROSSING_FILMS)
+
+
+def _column_values(cleaned):
+    """
+    Convert a cleaned numeric column to plain Python values.
+
+    Args:
+        cleaned (pd.Series): Nullable Int64 values from clean_numeric_column.
+
+    Returns:
+        list: Integers, or None for cells without a number.
+    """
+    return cleaned.astype(object).where(cleaned.notna(), None).tolist()
+
+
+def iter_source_columns(
+    source,
+    rows,
+    id_strategy="uuid4",
+    include_links=False,
+    batch_size=DEFAULT_BATCH_SIZE,
+):
+    """
+    Turn parsed table rows into columns of values for a source, a batch at a time.
+
+    Args:
+        source (ScrapeSource): The source the rows were scraped from.
+        rows (iterable): (cells, href) tuples as returned by wiki.parsing.
+        id_strategy (str): How row ids are generated, one of wiki.utils.ID_STRATEGIES.
+        include_links (bool): Whether to add a "url" column with the absolute URL
+                              of the linked article (None when the row has no link).
+        batch_size (int): Number of rows cleaned together.
+
+    Yields:
+        dict: Columns keyed by name in record order: "id", then source.columns,
+              plus "url" if include_links. Numeric columns are nullable Int64
+              Series from wiki.utils.clean_numeric_column, the others lists.
+    """
+    min_cells = source.min_cells
+    for batch in batched(rows, batch_size):
+        complete = []
+        for tds, href in batch:
+            if len(tds) >= min_cells:  # Ensure the row has enough columns
+                complete.append((tds, href))
+            else:
+                logging.warning(
+                    f"Didn't manage to find {min_cells} necessary columns in the row."
+                )
+        if not complete:
+            continue
+
+        columns = {"id": None}
+        for column, index in source.columns.items():
+            cells = [tds[index] for tds, _ in complete]
+            if column in source.numeric_columns:
+                cells, _ = clean_numeric_column(cells, column)
+            columns[column] = cells
+
+        years = columns.get(source.year_column)
+        if years is None:
+            years = [None] * len(complete)
+        elif source.year_column in source.numeric_columns:
+            years = _column_values(years)
+        titles = columns[source.title_column]
+        columns["id"] = [
+            make_film_id(title, year, id_strategy) for title, year in zip(titles, years)
+        ]
+        if include_links:
+            columns["url"] = [
+                urljoin(source.url, href) if href else None for _, href in complete
+            ]
+        yield columns
+
+
+def iter_source_records(
+    source,
+    rows,
+    id_strategy="uuid4",
+    include_links=False,
+    batch_size=DEFAULT_BATCH_SIZE,
+):
+    """
+    Turn parsed table rows into record tuples for a source.
+
+    Numeric columns are cleaned a batch of rows at a time, so they only ever
+    hold integers or None.
+
+    Args:
+        source (ScrapeSource): The source the rows were scraped from.
+        rows (iterable): (cells, href) tuples as returned by wiki.parsing.
+        id_strategy (str): How row ids are generated, one of wiki.utils.ID_STRATEGIES.
+        include_links (bool): Whether to append the absolute URL of the linked
+                              article (None when the row has no link) to the tuples.
+        batch_size (int): Number of rows cleaned together.
+
+    Yields:
+        tuple: The id followed by the values of source.columns, plus the URL
+               if include_links.
+    """
+    for columns in iter_source_columns(
+        source, rows, id_strategy, include_links, batch_size
+    ):
+        values = [
+            _column_values(cells) if column in source.numeric_columns else cells
+            for column, cells in columns.items()
+        ]
+        yield from zip(*values)
+
+
+def parse_source_page(
+    source, content, id_strategy="uuid4", include_links=False, parser=DEFAULT_PARSER
+):
+    """
+    Extract the records of a source from its fetched page.
+
+    Args:
+        source (ScrapeSource): The source the page belongs to.
+        content (bytes or str): The page HTML.
+        id_strategy (str): How row ids are generated, one of wiki.utils.ID_STRATEGIES.
+        include_links (bool): Whether to append the linked article URL to the tuples.
+        parser (str): HTML parser backend, one of wiki.parsing.PARSER_BACKENDS.
+
+    Returns:
+        list: Record tuples as produced by iter_source_records.
+
+    Raises:
+        Exception: If the table cannot be found or holds no record.
+    """
+    rows = parse_wikitable_rows(content, backend=parser, table_class=source.table_class)
+    logging.info(f"Parsed the {source.name} table with the {parser} backend.")
+
+    records = list(iter_source_records(source, rows, id_strategy, include_links))
+    if not records:
+        raise Exception("No movie data was scraped from the page.")
+    return records
+
+
+def parse_film_batch(
+    content,
+    id_strategy="uuid4",
+    parser=DEFAULT_PARSER,
+    source=OSCAR_WINNING_FILMS,
+    batch_size=DEFAULT_BATCH_SIZE,
+):
+    """
+    Extract the films of a page into a columnar FilmBatch.
+
+    The cleaned numeric columns go straight into the batch arrays, without
+    building a tuple per row.
+
+    Args:
+        content (bytes or str): The page HTML.
+        id_strategy (str): How row ids are generated, one of wiki.utils.ID_STRATEGIES.
+        parser (str): HTML parser backend, one of wiki.parsing.PARSER_BACKENDS.
+        source (ScrapeSource): A source whose columns are the FilmRecord fields.
+        batch_size (int): Number of rows cleaned together.
+
+    Returns:
+        FilmBatch: The films of the page.
+
+    Raises:
+        Exception: If the table cannot be found or holds no record.
+    """
+    rows = parse_wikitable_rows(content, backend=parser, table_class=source.table_class)
+    logging.info(f"Parsed the {source.name} table with the {parser} backend.")
+
+    films = FilmBatch.concat(
+        FilmBatch.from_columns(columns)
+        for columns in iter_source_columns(
+            source, rows, id_strategy, batch_size=batch_size
+        )
+    )
+    if not len(films):
+        raise Exception("No movie data was scraped from the page.")
+    return films
+
+
+def _fetch_source(source, cache=None, skip_unchanged=False):
+    """
+    Fetch the page of a source.
+
+    Args:
+        source (ScrapeSource): The source to fetch.
+        cache (ResponseCache, optional): Cache used to make the page request conditional.
+        skip_unchanged (bool): Whether to report an unmodified page as None.
+
+    Returns:
+        bytes or None: The page HTML, or None if skip_unchanged is set and the
+                       page has not changed since it was cached.
+
+    Raises:
+        Exception: If the page cannot be fetched.
+    """
+    response = fetchPage(source.url, cache=cache)
+    if response is None:
+        raise Exception("Failed to fetch the Wikipedia page")
+    if skip_unchanged and response.status_code == 304:
+        logging.info(f"The {source.name} page has not changed since the last run.")
+        return None
+    return response.content
+
+
+def scrape_source(
+    source,
+    id_strategy="uuid4",
+    cache=None,
+    skip_unchanged=False,
+    include_links=False,
+    parser=DEFAULT_PARSER,
+):
+    """
+    Scrape the records of a source.
+
+    Args:
+        source (ScrapeSource): The source to scrape.
+        id_strategy (str): How row ids are generated, one of wiki.utils.ID_STRATEGIES.
+        cache (ResponseCache, optional): Cache used to make the page request conditional.
+        skip_unchanged (bool): Whether to stop without parsing when the page is
+                               not modified.
+        include_links (bool): Whether to append the linked article URL to the tuples.
+        parser (str): HTML parser backend, one of wiki.parsing.PARSER_BACKENDS.
+
+    Returns:
+        list: Record tuples as produced by iter_source_records, or None if
+              skip_unchanged is set and the page has not changed since it was cached.
+
+    Raises:
+        Exception: If the page cannot be fetched or no record can be scraped.
+    """
+    content = _fetch_source(source, cache, skip_unchanged)
+    if content is None:
+        return None
+    return parse_source_page(source, content, id_strategy, include_links, parser)
+
+
+def scrape_sources(
+    sources=None,
+    max_workers=DEFAULT_MAX_WORKERS,
+    parse_workers=None,
+    id_strategy="uuid4",
+    cache=None,
+    skip_unchanged=False,
+    include_links=False,
+    parser=DEFAULT_PARSER,
+):
+    """
+    Scrape several sources in parallel.
+
+    Pages are fetched on a thread pool, then parsed on a process pool with
+    wiki.parsing.parse_pages, since parsing is CPU-bound. Sources that fail
+    are logged and left out of the result.
+
+    Args:
+        sources (iterable, optional): ScrapeSource objects, all registered
+                                      sources by default.
+        max_workers (int): Maximum number of pages fetched at once.
+        parse_workers (int, optional): Number of parsing processes,
+                                       os.cpu_count() by default.
+        id_strategy (str): How row ids are generated, one of wiki.utils.ID_STRATEGIES.
+        cache (ResponseCache, optional): Cache used to make the page requests conditional.
+        skip_unchanged (bool): Whether to leave out sources whose page is not modified.
+        include_links (bool): Whether to append the linked article URL to the tuples.
+        parser (str): HTML parser backend, one of wiki.parsing.PARSER_BACKENDS.
+
+    Returns:
+        dict: Records keyed by source name.
+    """
+    sources = list(SOURCES.values() if sources is None else sources)
+    pages = {}
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {
+            executor.submit(_fetch_source, source, cache, skip_unchanged): source
+            for source in sources
+        }
+        for future in as_completed(futures):
+            source = futures[future]
+            try:
+                content = future.result()
+            except Exception as e:
+                logging.warning(f"Failed to scrape {source.name}: {str(e)}")
+                continue
+            if content is not None:
+                pages[source.name] = content
+
+    fetched = [source for source in sources if source.name in pages]
+    parsed = parse_pages(
+        [pages[source.name] for source in fetched],
+        workers=parse_workers,
+        backend=parser,
+        table_class=[source.table_class for source in fetched],
+        return_exceptions=True,
+    )
+
+    results = {}
+    for source, rows in zip(fetched, parsed):
+        try:
+            if isinstance(rows, Exception):
+                raise rows
+            records = list(
+                iter_source_records(source, rows, id_strategy, include_links)
+            )
+            if not records:
+                raise Exception("No movie data was scraped from the page.")
+        except Exception as e:
+            logging.warning(f"Failed to scrape {source.name}: {str(e)}")
+            continue
+        results[source.name] = records
+
+    logging.info(f"Scraped {len(results)} of {len(sources)} sources.")
+    return results
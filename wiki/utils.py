@@ -2,12 +2,29 @@
 Utility functions for the Wiki module.
 
 This module provides helper functions for file operations, UUID handling,
-and data cleaning.
+and data cleaning, including vectorized cleaning of numeric columns.
 """
 
 import logging
 import os
+import unicodedata
 import uuid
+from contextlib import contextmanager
+
+# Namespace for the content-derived (uuid5) film identifiers
+FILM_ID_NAMESPACE = uuid.uuid5(
+    uuid.NAMESPACE_URL,
+    "https://en.wikipedia.org/wiki/List_of_Academy_Award%E2%80%93winning_films",
+)
+
+# Supported strategies for make_film_id
+ID_STRATEGIES = ("uuid4", "uuid5")
+
+# Leading number of a cell, e.g. 11 in "11 (1)", 1927 in "1927/28" or 3 in "3[a]"
+NUMERIC_PATTERN = r"^\D*?(\d+(?:\.\d+)?)"
+
+# Number of rows handed to each sink at a time by fan_out
+DEFAULT_BATCH_SIZE = 500
 
 
 def create_data_folder(filename):
@@ -23,6 +40,115 @@ def create_data_folder(filename):
         logging.info(f"Created directory: {data_dir}")
 
 
+def temporary_path(filename):
+    """
+    Build a unique temporary path next to a file.
+
+    Keeping the temporary file in the same directory lets os.replace() swap
+    it in atomically.
+
+    Args:
+        filename (str): The final path of the file.
+
+    Returns:
+        str: The temporary path.
+    """
+    return f"{filename}.{os.getpid()}.{uuid.uuid4().hex}.tmp"
+
+
+def fsync_path(path):
+    """
+    Flush a file, or a directory entry list, to disk.
+
+    The writers handed a temporary path open and close the file themselves,
+    so its data is synced through a new descriptor once they are done.
+    Directories can only be opened and synced on POSIX systems; elsewhere
+    they are skipped.
+
+    Args:
+        path (str): The file or directory to sync.
+    """
+    if os.path.isdir(path):
+        if os.name != "posix":
+            return
+        fd = os.open(path, os.O_RDONLY)
+    else:
+        fd = os.open(path, os.O_RDWR)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+@contextmanager
+def atomic_output(filename):
+    """
+    Provide a temporary path that replaces `filename` once written successfully.
+
+    Readers see either the previous file or the complete new one, never a
+    partially written file. The temporary file is synced to disk before it
+    is renamed, and the directory after, so a crash or power loss cannot
+    leave an empty or truncated file under the final name. If the block
+    raises, the temporary file is removed and the existing file is left
+    untouched.
+
+    Args:
+        filename (str): The final path of the file.
+
+    Yields:
+        str: The temporary path to write to.
+    """
+    create_data_folder(filename)
+    tmp_path = temporary_path(filename)
+    try:
+        yield tmp_path
+        fsync_path(tmp_path)
+        os.replace(tmp_path, filename)
+        fsync_path(os.path.dirname(filename) or os.curdir)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def read_digest(filename):
+    """
+    Read the content hash stored in the sidecar of a file.
+
+    Args:
+        filename (str): The file whose sidecar to read.
+
+    Returns:
+        str or None: The stored hash, or None if the file or its sidecar is missing.
+    """
+    if not os.path.exists(filename):
+        return None
+    try:
+        with open(f"{filename}.sha256") as f:
+            return f.read().strip()
+    except OSError:
+        return None
+
+
+def write_digest(filename, digest):
+    """
+    Store the content hash of a file in its `<filename>.sha256` sidecar.
+
+    The sidecar is replaced atomically, like the file it describes.
+
+    Args:
+        filename (str): The file the hash describes.
+        digest (str or None): The hash to store; None removes the sidecar.
+    """
+    sidecar = f"{filename}.sha256"
+    if digest is None:
+        if os.path.exists(sidecar):
+            os.remove(sidecar)
+        return
+    with atomic_output(sidecar) as tmp_path:
+        with open(tmp_path, "w") as f:
+            f.write(digest + "\n")
+
+
 def uuid_to_str(obj):
     """
     Convert UUID objects to strings.
@@ -56,3 +182,119 @@ def clean_numeric(value):
         elif value.replace(".", "", 1).isdigit() and value.count(".") <= 1:
             return int(float(value))
     return value
+
+
+def clean_numeric_column(values, name="values"):
+    """
+    Convert a whole column of scraped cells to nullable integers.
+
+    The first number in each cell is kept, thousands separators are ignored
+    and decimals are truncated, so "11 (1)" gives 11, "1927/28" gives 1927
+    and "1,234" gives 1234. Cells without a number become missing values
+    and are reported rather than passed through as strings.
+
+    Args:
+        values (iterable): The cells, as a pandas Series, NumPy array or list.
+        name (str): Name of the column, used in the log message.
+
+    Returns:
+        tuple: The cleaned pandas Series with the Int64 dtype, and a Series
+               of the original values that could not be parsed.
+    """
+    import numpy as np
+    import pandas as pd
+
+    cells = values if isinstance(values, pd.Series) else pd.Series(values, dtype=object)
+    text = cells.astype("string").str.replace(",", "", regex=False).str.strip()
+    numbers = pd.to_numeric(
+        text.str.extract(NUMERIC_PATTERN, expand=False), errors="coerce"
+    )
+    cleaned = np.trunc(numbers.astype("float64")).astype("Int64")
+    unparsed = cells[cleaned.isna() & text.fillna("").ne("")]
+    if len(unparsed):
+        logging.warning(
+            f"Could not parse {len(unparsed)} {name}: {unparsed.unique().tolist()[:10]}"
+        )
+    return cleaned, unparsed
+
+
+def normalize_title(title):
+    """
+    Normalize a film title for use in content-derived keys.
+
+    Args:
+        title (str): The film title as scraped.
+
+    Returns:
+        str: The NFKC-normalized, case-folded title with collapsed whitespace.
+    """
+    return " ".join(unicodedata.normalize("NFKC", title).split()).casefold()
+
+
+def make_film_id(film, year, strategy="uuid4"):
+    """
+    Create an identifier for a film row.
+
+    Args:
+        film (str): Name of the film.
+        year: Year of the award.
+        strategy (str): "uuid4" for a random UUID string, or "uuid5" for a UUID
+                        string derived from the normalized title and year.
+
+    Returns:
+        str: The film identifier.
+
+    Raises:
+        ValueError: If the strategy is not one of ID_STRATEGIES.
+    """
+    if strategy == "uuid4":
+        return str(uuid.uuid4())
+    if strategy not in ID_STRATEGIES:
+        raise ValueError(
+            f"Unknown id strategy {strategy!r}, expected one of {ID_STRATEGIES}."
+        )
+
+    return str(uuid.uuid5(FILM_ID_NAMESPACE, f"{normalize_title(film)}|{year}"))
+
+
+def batched(iterable, size):
+    """
+    Split an iterable into lists of at most `size` items.
+
+    Args:
+        iterable: The items to split.
+        size (int): Maximum number of items per batch.
+
+    Yields:
+        list: The next batch of items.
+    """
+    batch = []
+    for item in iterable:
+        batch.append(item)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def fan_out(rows, sinks, batch_size=DEFAULT_BATCH_SIZE):
+    """
+    Pass rows through in batches, handing every batch to each sink first.
+
+    This lets one consumer (e.g. the database loader) drive the pipeline
+    while other writers receive the same rows, without the whole dataset
+    ever being held in memory.
+
+    Args:
+        rows (iterable): The rows to pass through.
+        sinks (list): Callables receiving each batch as a list.
+        batch_size (int): Number of rows per batch.
+
+    Yields:
+        The input rows, unchanged and in order.
+    """
+    for batch in batched(rows, batch_size):
+        for sink in sinks:
+            sink(batch)
+        yield from batch